@@ -23,6 +23,7 @@
 
 """PyTurboGrid is a Python wrapper for Ansys TurboGrid."""
 
+import importlib
 import os
 
 # When this is defined, hardcode a tg container spinup for the purpose of auto documentation.
@@ -46,17 +47,38 @@ if socket_port is not None:
     )
     atexit.register(tg_container.__del__)
 
-from ansys.turbogrid.core.launcher.launcher import launch_turbogrid
+# The launcher pulls in the TurboGrid API and its dependencies, which are slow to import,
+# and reading the package metadata is not free either. Both are done on first use,
+# so that the parsers can be used without paying for them.
+_lazy_attributes = {
+    "launch_turbogrid": "ansys.turbogrid.core.launcher.launcher",
+}
 
-try:
-    import importlib.metadata as importlib_metadata
-except ModuleNotFoundError:  # pragma: no cover
-    import importlib_metadata
 
-# Read from the pyproject.toml
-# major, minor, patch
-__version__ = "0.0.0"
-try:
-    __version__ = importlib_metadata.version("ansys-turbogrid-core")
-except importlib_metadata.PackageNotFoundError:
-    pass
+def _get_version() -> str:
+    try:
+        import importlib.metadata as importlib_metadata
+    except ModuleNotFoundError:  # pragma: no cover
+        import importlib_metadata
+
+    # Read from the pyproject.toml
+    # major, minor, patch
+    try:
+        return importlib_metadata.version("ansys-turbogrid-core")
+    except importlib_metadata.PackageNotFoundError:
+        return "0.0.0"
+
+
+def __getattr__(name):
+    if name == "__version__":
+        value = _get_version()
+    elif name in _lazy_attributes:
+        value = getattr(importlib.import_module(_lazy_attributes[name]), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_attributes) | {"__version__"})
@@ -0,0 +1,364 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-FileCopyrightText: 2023 ANSYS, Inc. All rights reserved
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Module for admitting TurboGrid session launches only when the host has room for them."""
+
+import json
+import os
+import tempfile
+import time
+from typing import Any, Optional
+
+from ansys.turbogrid.api.pyturbogrid_core import PyTurboGrid
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+def parse_meminfo(meminfo: str) -> Optional[int]:
+    """Get the available memory, in bytes, from the contents of /proc/meminfo."""
+    for line in meminfo.splitlines():
+        if line.startswith("MemAvailable:"):
+            # The value is given in kB
+            return int(line.split()[1]) * 1024
+    return None
+
+
+def get_available_memory() -> Optional[int]:
+    """
+    Get the memory available for new processes, in bytes.
+
+    The memory is read from /proc, so on other systems ``None`` is returned.
+    """
+    try:
+        with open("/proc/meminfo") as f:
+            return parse_meminfo(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def get_idle_cores() -> Optional[float]:
+    """
+    Get the number of cores not in use, from the one minute load average.
+
+    ``None`` is returned on systems without a load average.
+    """
+    try:
+        load = os.getloadavg()[0]
+    except (AttributeError, OSError):
+        return None
+    return max(0.0, (os.cpu_count() or 1) - load)
+
+
+def try_lock_file(f) -> bool:
+    """Take the exclusive lock of an open file without waiting. Returns ``False`` if it is held."""
+    try:
+        if os.name == "nt":
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def unlock_file(f):
+    """Release the lock of an open file taken with ``try_lock_file``."""
+    if os.name == "nt":
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class admission_ticket:
+    """
+    A launch slot held on the host, given by ``admission_controller.acquire``.
+
+    The slot is held until ``release`` is called. As it is a file lock, it is also released
+    by the operating system if the process holding it dies.
+    """
+
+    slot: int
+    waited: float
+
+    def __init__(self, slot: int, slot_file, waited: float):
+        self.slot = slot
+        self.waited = waited
+        self._slot_file = slot_file
+
+    @property
+    def released(self) -> bool:
+        """Whether the slot was released."""
+        return self._slot_file is None
+
+    def release(self):
+        """Release the slot, so that another launch can be admitted. Releasing twice does nothing."""
+        slot_file, self._slot_file = self._slot_file, None
+        if slot_file is None:
+            return
+        try:
+            slot_file.seek(0)
+            slot_file.truncate()
+            slot_file.flush()
+            unlock_file(slot_file)
+        except OSError:
+            pass
+        slot_file.close()
+
+    def __del__(self):
+        self.release()
+
+    def __repr__(self):
+        state = "released" if self.released else "held"
+        return f"admission_ticket(slot={self.slot}, {state}, waited={self.waited:.3f} s)"
+
+
+class admission_controller:
+    """
+    Admit TurboGrid session launches only when the host has room for them, and queue them otherwise.
+
+    A launch is admitted when one of ``max_sessions`` slots is free, and the available memory
+    and idle cores cover what a session needs on top of what the launches admitted in the last
+    ``warmup_time`` seconds will take (since they are not using it yet). The slots are locked
+    files in ``lock_directory``, so every process of the host using the same directory (which is
+    the case by default) shares them.
+    """
+
+    max_sessions: int
+    memory_per_session: int
+    cores_per_session: float
+    lock_directory: str
+    warmup_time: float
+    poll_interval: float
+    timeout: Optional[float]
+
+    def __init__(
+        self,
+        max_sessions: int = None,
+        memory_per_session: int = 2 * 1024**3,
+        cores_per_session: float = 1.0,
+        lock_directory: str = None,
+        warmup_time: float = 30.0,
+        poll_interval: float = 0.5,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Parameters
+        ----------
+        max_sessions : int, default: ``None``
+            Number of sessions that can run at the same time on the host. The default is
+            ``None``, in which case the number of cores of the host is used.
+        memory_per_session : int, default: ``2 * 1024**3``
+            Bytes of memory a session is expected to use. 0 disables the memory check.
+        cores_per_session : float, default: ``1.0``
+            Cores a session is expected to keep busy. 0 disables the cores check.
+        lock_directory : str, default: ``None``
+            Directory of the slot files. The default is ``None``, in which case the
+            ``PYTURBOGRID_ADMISSION_DIR`` environment variable is used if it is set,
+            and the ``pyturbogrid_admission`` directory of the temporary directory otherwise.
+        warmup_time : float, default: ``30.0``
+            Seconds after its admission during which a session is assumed not to use its
+            memory and cores yet.
+        poll_interval : float, default: ``0.5``
+            Seconds between checks while a launch is queued. The wait doubles after each
+            check that does not admit it, up to 8 times this value.
+        timeout : float, default: ``None``
+            Maximum number of seconds a launch is queued, by default. The default is ``None``,
+            in which case launches wait as long as it takes.
+        """
+        self.max_sessions = max(1, max_sessions or os.cpu_count() or 1)
+        self.memory_per_session = memory_per_session
+        self.cores_per_session = cores_per_session
+        self.lock_directory = lock_directory or os.environ.get(
+            "PYTURBOGRID_ADMISSION_DIR",
+            os.path.join(tempfile.gettempdir(), "pyturbogrid_admission"),
+        )
+        self.warmup_time = warmup_time
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+    def acquire(self, timeout: float = None) -> admission_ticket:
+        """
+        Wait until a launch is admitted.
+
+        Parameters
+        ----------
+        timeout : float, default: ``None``
+            Maximum number of seconds to wait. The default is ``None``, in which case
+            the ``timeout`` of the controller is used.
+
+        Returns
+        -------
+        admission_ticket
+            The slot to release once the session is quit.
+
+        Raises
+        ------
+        TimeoutError
+            If the launch was not admitted within the timeout.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        interval = self.poll_interval
+        while True:
+            ticket = self.try_acquire()
+            if ticket is not None:
+                ticket.waited = time.perf_counter() - start
+                return ticket
+            waited = time.perf_counter() - start
+            if timeout is not None and waited >= timeout:
+                raise TimeoutError(
+                    f"No TurboGrid launch slot became available within {timeout} s "
+                    f"({self.get_usage()})"
+                )
+            time.sleep(interval if timeout is None else min(interval, timeout - waited))
+            interval = min(2 * interval, 8 * self.poll_interval)
+
+    def try_acquire(self) -> Optional[admission_ticket]:
+        """Admit a launch if the host has room for it now. Returns ``None`` otherwise."""
+        os.makedirs(self.lock_directory, exist_ok=True)
+        # The check and the taking of a slot are made under a host-wide lock, so that two
+        # launches cannot both see the same free memory and cores.
+        with open(os.path.join(self.lock_directory, "admission.lock"), "a+") as gate:
+            while not try_lock_file(gate):
+                time.sleep(0.01)
+            try:
+                return self.__admit__()
+            finally:
+                unlock_file(gate)
+
+    def get_usage(self) -> dict[str, Any]:
+        """
+        Get the held slots, and the memory and cores available, as seen by this controller.
+
+        Memory and cores are ``None`` when they cannot be measured on this system.
+        """
+        held = [self.__read_slot__(slot) for slot in range(self.max_sessions)]
+        held = [holder for holder in held if holder is not None]
+        return {
+            "sessions": len(held),
+            "max_sessions": self.max_sessions,
+            "available_memory": get_available_memory(),
+            "idle_cores": get_idle_cores(),
+        }
+
+    def __admit__(self) -> Optional[admission_ticket]:
+        """
+        :meta private:
+        """
+        free_slot = None
+        warming_up = 0
+        for slot in range(self.max_sessions):
+            slot_file = open(self.__slot_path__(slot), "a+")
+            if try_lock_file(slot_file):
+                if free_slot is None:
+                    free_slot = (slot, slot_file)
+                    continue
+                unlock_file(slot_file)
+            else:
+                holder = self.__read_held_slot__(slot_file)
+                if holder and time.time() - holder.get("time", 0) < self.warmup_time:
+                    warming_up += 1
+            slot_file.close()
+        if free_slot is None:
+            return None
+        slot, slot_file = free_slot
+        if not self.__has_room__(warming_up):
+            unlock_file(slot_file)
+            slot_file.close()
+            return None
+        slot_file.seek(0)
+        slot_file.truncate()
+        json.dump({"pid": os.getpid(), "time": time.time()}, slot_file)
+        slot_file.flush()
+        return admission_ticket(slot, slot_file, 0.0)
+
+    def __has_room__(self, warming_up: int) -> bool:
+        """
+        :meta private:
+        """
+        if self.memory_per_session:
+            available_memory = get_available_memory()
+            needed = (warming_up + 1) * self.memory_per_session
+            if available_memory is not None and available_memory < needed:
+                return False
+        if self.cores_per_session:
+            idle_cores = get_idle_cores()
+            needed = (warming_up + 1) * self.cores_per_session
+            if idle_cores is not None and idle_cores < needed:
+                return False
+        return True
+
+    def __slot_path__(self, slot: int) -> str:
+        """
+        :meta private:
+        """
+        return os.path.join(self.lock_directory, f"slot_{slot}.lock")
+
+    def __read_slot__(self, slot: int) -> Optional[dict]:
+        """
+        :meta private:
+        """
+        with open(self.__slot_path__(slot), "a+") as slot_file:
+            if try_lock_file(slot_file):
+                unlock_file(slot_file)
+                return None
+            return self.__read_held_slot__(slot_file) or {}
+
+    def __read_held_slot__(self, slot_file) -> Optional[dict]:
+        """
+        :meta private:
+        """
+        # The holder is identified by what it wrote, which it may not have written yet
+        try:
+            slot_file.seek(0)
+            return json.loads(slot_file.read() or "{}")
+        except (OSError, ValueError):
+            return None
+
+
+def attach_session_resource(pytg: PyTurboGrid, resource):
+    """
+    Make a session hold a resource (such as an ``admission_ticket``) until it is shut down.
+
+    The resources are released by ``release_session_resources``, which ``shutdown_session`` calls.
+    """
+    if not hasattr(pytg, "session_resources") or pytg.session_resources is None:
+        pytg.session_resources = []
+    pytg.session_resources.append(resource)
+
+
+def release_session_resources(pytg: PyTurboGrid):
+    """Release the resources held by a session, in the reverse order they were attached."""
+    resources = getattr(pytg, "session_resources", None) or []
+    pytg.session_resources = None
+    for resource in reversed(resources):
+        try:
+            resource.release()
+        except Exception as e:
+            print(f"{pytg} exception on release of {resource}: {e}")
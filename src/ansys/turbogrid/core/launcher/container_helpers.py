@@ -20,28 +20,368 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-import socket
+import atexit
+from contextlib import contextmanager
+import gzip
+import hashlib
+import os
+import shlex
+import tarfile
+import threading
 import time
+from typing import Optional
+import warnings
+import zlib
 
 from fabric import Connection
 
+from ansys.turbogrid.core.launcher.port_helpers import get_port_allocator, port_reservation
+
+
+def reserve_open_port() -> port_reservation:
+    """
+    Reserve a free port in the process-wide allocator, so that it is not handed out twice.
+
+    The port is not bound by this process anymore, so that its user (for example TurboGrid)
+    can bind it. Call ``release`` on the reservation once the port is bound, or not used.
+    """
+    reservation = get_port_allocator().reserve(1)
+    reservation.release_sockets()
+    return reservation
+
 
 def get_open_port():
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        # using '0' will tell the OS to pick a random port that is available.
-        s.bind(("", 0))
-        s.listen(1)
-        port = s.getsockname()[1]
-        # Shutdown is not needed because the socket is not connected.
-        # Also, this will throw and error in windows
-        # s.shutdown(socket.SHUT_RDWR)
-        s.close()
-    # Wait a second to let the OS do things
-    time.sleep(1)
+    """
+    Get a free port.
+
+    .. deprecated::
+       Use ``reserve_open_port``, which keeps the port from being handed out again until
+       it is bound.
+    """
+    warnings.warn(
+        "get_open_port is deprecated, use reserve_open_port instead",
+        DeprecationWarning,
+        stacklevel=2,
+    )
+    reservation = reserve_open_port()
+    port = reservation.ports[0]
+    reservation.release()
     return port
 
 
+class container_connection_pool:
+    """
+    Keep the SSH connections to containers, and their SFTP sessions, open between transfers.
+
+    Connections are keyed by host, port and key file, so that all the transfers to a container
+    share one connection, and one SFTP session, instead of each paying for the handshakes.
+    Connections that are not used for ``idle_timeout`` seconds are closed in the background,
+    and connections that were dropped (for example by a container that stopped) are replaced.
+
+    The pool also keeps a manifest of the files uploaded to each container, with their content
+    hash and size, so that unchanged files are not uploaded again (see ``get_manifest``).
+    """
+
+    idle_timeout: float
+
+    def __init__(self, idle_timeout: float = 60.0):
+        """
+        Parameters
+        ----------
+        idle_timeout : float, default: ``60.0``
+            Seconds a connection is kept open without being used.
+        """
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        # [connection, last use, transfers in progress] by (host, port, key file)
+        self._connections: dict[tuple[str, int, str], list] = {}
+        # (content hash, size) by remote path, by (host, port, key file)
+        self._manifests: dict[tuple[str, int, str], dict[str, tuple[str, int]]] = {}
+        self._reaper = None
+
+    def get(self, ftp_port: int, ssh_key_filename: str, host_name="localhost") -> Connection:
+        """Get the connection to a container, opening it on first use."""
+        key = (host_name, int(ftp_port), ssh_key_filename)
+        stale = None
+        with self._lock:
+            entry = self._connections.get(key)
+            # A connection whose transport is gone cannot be reopened with its old SFTP session
+            if entry and entry[0].transport is not None and not entry[0].is_connected:
+                stale = entry[0]
+                entry = None
+                # The container may be gone, and its files with it
+                self._manifests.pop(key, None)
+            if entry is None:
+                entry = self._connections[key] = [
+                    Connection(
+                        host=host_name,
+                        user="root",
+                        port=ftp_port,
+                        connect_kwargs={"key_filename": ssh_key_filename},
+                    ),
+                    time.monotonic(),
+                    0,
+                ]
+            entry[1] = time.monotonic()
+            if self._reaper is None or not self._reaper.is_alive():
+                self._reaper = threading.Thread(target=self.__reap__, daemon=True)
+                self._reaper.start()
+        if stale is not None:
+            self.__close__(stale)
+        return entry[0]
+
+    @contextmanager
+    def using(self, connection: Connection):
+        """Keep a connection from being closed as idle for the body of a ``with`` statement."""
+        entry = self.__entry__(connection)
+        if entry is not None:
+            with self._lock:
+                entry[2] += 1
+        try:
+            yield connection
+        finally:
+            if entry is not None:
+                with self._lock:
+                    entry[2] -= 1
+                    entry[1] = time.monotonic()
+
+    def get_manifest(self, connection: Connection) -> Optional[dict[str, tuple[str, int]]]:
+        """
+        Get the manifest of the files uploaded through a pooled connection, as (content hash,
+        size) by remote path, or ``None`` if the connection is not from the pool.
+
+        Manifests outlive the connections closed as idle, but not those that were dropped.
+        """
+        with self._lock:
+            for key, entry in self._connections.items():
+                if entry[0] is connection:
+                    return self._manifests.setdefault(key, {})
+        return None
+
+    def close_idle(self) -> int:
+        """Close the connections that were not used for ``idle_timeout`` seconds. Returns how many."""
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                key
+                for key, (_, last_use, users) in self._connections.items()
+                if not users and now - last_use >= self.idle_timeout
+            ]
+            connections = [self._connections.pop(key)[0] for key in idle]
+        for connection in connections:
+            self.__close__(connection)
+        return len(connections)
+
+    def close(self):
+        """Close all the connections, and forget their manifests."""
+        with self._lock:
+            connections = [entry[0] for entry in self._connections.values()]
+            self._connections.clear()
+            self._manifests.clear()
+        for connection in connections:
+            self.__close__(connection)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._connections)
+
+    def __entry__(self, connection: Connection):
+        """
+        :meta private:
+        """
+        with self._lock:
+            for entry in self._connections.values():
+                if entry[0] is connection:
+                    return entry
+        return None
+
+    def __close__(self, connection: Connection):
+        """
+        :meta private:
+        """
+        try:
+            connection.close()
+        except Exception as e:
+            print(f"{connection} exception on close: {e}")
+
+    def __reap__(self):
+        """
+        :meta private:
+        """
+        # Runs until there is nothing left to close, and is started again by the next get
+        while True:
+            time.sleep(max(self.idle_timeout / 2, 0.01))
+            self.close_idle()
+            with self._lock:
+                if not self._connections:
+                    self._reaper = None
+                    return
+
+
+_connection_pool = None
+_connection_pool_lock = threading.Lock()
+
+
+def get_container_connection_pool() -> container_connection_pool:
+    """Get the connection pool shared by the container transfers of this process."""
+    global _connection_pool
+    with _connection_pool_lock:
+        if _connection_pool is None:
+            _connection_pool = container_connection_pool()
+            atexit.register(_connection_pool.close)
+        return _connection_pool
+
+
+class _counting_writer:
+    """
+    :meta private:
+    """
+
+    def __init__(self, output):
+        self.output = output
+        self.bytes_written = 0
+
+    def write(self, data):
+        self.output.write(data)
+        self.bytes_written += len(data)
+        return len(data)
+
+
+def write_file_archive(filepaths: list[str], output, compression_level: int = 0) -> int:
+    """
+    Stream files into a tar archive, under their base names, gzipped if ``compression_level``
+    is not 0.
+
+    The archive is written to ``output`` as it is built, so that it is never held in memory
+    or on disk. Returns the size of the archive in bytes, as written.
+    """
+    writer = _counting_writer(output)
+    target = (
+        gzip.GzipFile(fileobj=writer, mode="wb", compresslevel=compression_level)
+        if compression_level
+        else writer
+    )
+    with tarfile.open(fileobj=target, mode="w|") as archive:
+        for filepath in filepaths:
+            archive.add(filepath, arcname=os.path.basename(filepath))
+    if compression_level:
+        # Writes the gzip trailer, leaving the output open
+        target.close()
+    return writer.bytes_written
+
+
+#: File types that compress well: CAD geometry, and TurboGrid inputs, states and meshes.
+COMPRESSIBLE_EXTENSIONS = (
+    ".x_b",
+    ".x_t",
+    ".tin",
+    ".tginit",
+    ".ndf",
+    ".inf",
+    ".crv",
+    ".tst",
+    ".def",
+)
+
+
+class transfer_compression:
+    """
+    Which files are gzipped on their way to and from containers, and how much.
+
+    Files are compressed on the fly by the sender, and decompressed by the receiver, so that
+    fewer bytes go over the connection. Small files are not worth it, nor are file types that
+    do not compress well.
+    """
+
+    level: int
+    min_size: int
+    extensions: tuple[str, ...]
+
+    def __init__(
+        self,
+        level: int = None,
+        min_size: int = 1 << 20,
+        extensions: tuple[str, ...] = COMPRESSIBLE_EXTENSIONS,
+    ):
+        """
+        Parameters
+        ----------
+        level : int, default: ``None``
+            Compression level, from 1 (fastest) to 9 (smallest), or 0 to not compress.
+            The default is ``None``, in which case the ``PYTURBOGRID_TRANSFER_COMPRESSION``
+            environment variable is used if set, otherwise 6.
+        min_size : int, default: ``1 << 20``
+            Size in bytes from which files are compressed.
+        extensions : tuple[str, ...], default: ``COMPRESSIBLE_EXTENSIONS``
+            Extensions of the files that are compressed.
+        """
+        if level is None:
+            level = int(os.environ.get("PYTURBOGRID_TRANSFER_COMPRESSION", 6))
+        if not 0 <= level <= 9:
+            raise ValueError(f"The compression level must be from 0 to 9, not {level}")
+        self.level = level
+        self.min_size = min_size
+        self.extensions = tuple(extension.lower() for extension in extensions)
+
+    def should_compress(self, filename: str, size: Optional[int]) -> bool:
+        """Check whether a file of a given size is to be compressed."""
+        return (
+            self.level > 0
+            and size is not None
+            and size >= self.min_size
+            and os.path.splitext(filename)[1].lower() in self.extensions
+        )
+
+
+_transfer_compression = None
+
+
+def get_transfer_compression() -> transfer_compression:
+    """Get the compression settings of the container transfers of this process."""
+    global _transfer_compression
+    if _transfer_compression is None:
+        _transfer_compression = transfer_compression()
+    return _transfer_compression
+
+
+def set_transfer_compression(compression: transfer_compression):
+    """Set the compression settings of the container transfers of this process."""
+    global _transfer_compression
+    _transfer_compression = compression
+
+
+_file_hashes: dict[str, tuple[int, int, str]] = {}
+_file_hashes_lock = threading.Lock()
+
+
+def get_file_hash(filepath: str) -> str:
+    """
+    Get the SHA-256 hash of the content of a file.
+
+    Hashes are cached by path, and only computed again when the size or the modification time
+    of the file changes, so that large CAD files are not read for every transfer.
+    """
+    filepath = os.path.abspath(filepath)
+    stat = os.stat(filepath)
+    with _file_hashes_lock:
+        cached = _file_hashes.get(filepath)
+    if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    with _file_hashes_lock:
+        _file_hashes[filepath] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def format_transfer_rate(transferred_bytes: int, seconds: float) -> str:
+    """Describe a transfer, such as ``"12.5 MB in 0.40 s (31.2 MB/s)"``."""
+    rate = transferred_bytes / seconds if seconds > 0 else float("inf")
+    return f"{transferred_bytes / 1e6:.1f} MB in {seconds:.2f} s ({rate / 1e6:.1f} MB/s)"
+
+
 class container_helpers:
     pytestconfig: None
 
@@ -50,46 +390,351 @@ class container_helpers:
 
     @staticmethod
     def get_container_connection(ftp_port: int, ssh_key_filename: str, host_name="localhost"):
-        container_connection = Connection(
-            host=host_name,
-            user="root",
-            port=ftp_port,
-            connect_kwargs={"key_filename": ssh_key_filename},
-        )
-        return container_connection
+        # Pooled, so that the transfers to a container reuse its connection and SFTP session
+        return get_container_connection_pool().get(ftp_port, ssh_key_filename, host_name)
 
     @staticmethod
-    def transfer_file_to_container(container_connection: Connection, local_filepath: str):
-        print(f"To container-> {local_filepath}")
-        container_connection.put(
-            remote="/",
-            local=local_filepath,
-        )
+    def transfer_file_to_container(
+        container_connection: Connection, local_filepath: str, dedup: bool = True
+    ):
+        with get_container_connection_pool().using(container_connection):
+            if dedup and not container_helpers.__pending_uploads__(
+                container_connection, [local_filepath]
+            ):
+                return
+            print(f"To container-> {local_filepath}")
+            compression = get_transfer_compression()
+            uploaded = False
+            if compression.should_compress(local_filepath, os.path.getsize(local_filepath)):
+                try:
+                    container_helpers.__put_compressed__(
+                        container_connection, local_filepath, compression.level
+                    )
+                    uploaded = True
+                except Exception as e:
+                    print(f"{container_connection} exception on __put_compressed__: {e}")
+            if not uploaded:
+                container_connection.put(
+                    remote="/",
+                    local=local_filepath,
+                )
+            container_helpers.__record_uploads__(container_connection, [local_filepath])
         print(f"... Transferred {local_filepath}")
 
     @staticmethod
     def transfer_files_to_container(
-        container_connection: Connection, local_folder_path: str, local_filenames: list
+        container_connection: Connection,
+        local_folder_path: str,
+        local_filenames: list,
+        bulk: bool = True,
+        dedup: bool = True,
+    ):
+        filepaths = [
+            filename if not local_folder_path else f"{local_folder_path}/{filename}"
+            for filename in local_filenames
+        ]
+        with get_container_connection_pool().using(container_connection):
+            # Files already in the container, with the same content, are not uploaded again
+            if dedup:
+                filepaths = container_helpers.__pending_uploads__(container_connection, filepaths)
+            # Several files go in one archive, unpacked in the container by a single command
+            # (one for the files worth compressing, and one for the others)
+            if bulk and len(filepaths) > 1:
+                compression = get_transfer_compression()
+                compressed = [
+                    filepath
+                    for filepath in filepaths
+                    if compression.should_compress(filepath, os.path.getsize(filepath))
+                ]
+                try:
+                    for archived, level in (
+                        ([path for path in filepaths if path not in compressed], 0),
+                        (compressed, compression.level),
+                    ):
+                        if archived:
+                            container_helpers.transfer_archive_to_container(
+                                container_connection, archived, compression_level=level
+                            )
+                            container_helpers.__record_uploads__(container_connection, archived)
+                            filepaths = [path for path in filepaths if path not in archived]
+                    return
+                except Exception as e:
+                    print(f"{container_connection} exception on transfer_archive_to_container: {e}")
+            for filepath in filepaths:
+                container_helpers.transfer_file_to_container(
+                    container_connection, filepath, dedup=False
+                )
+
+    # Returns the files that are not in the container with the same content, according to the
+    # manifest of the connection and to the size of the file in the container
+    @staticmethod
+    def __pending_uploads__(container_connection: Connection, local_filepaths: list) -> list:
+        """
+        :meta private:
+        """
+        manifest = get_container_connection_pool().get_manifest(container_connection)
+        if manifest is None:
+            return list(local_filepaths)
+        pending = []
+        uploaded = {}
+        for filepath in local_filepaths:
+            remote_path = "/" + os.path.basename(filepath)
+            if manifest.get(remote_path) == (get_file_hash(filepath), os.path.getsize(filepath)):
+                uploaded[filepath] = remote_path
+            else:
+                pending.append(filepath)
+        # The manifest may be about another container that got the same port since
+        remote_sizes = container_helpers.__get_remote_sizes__(
+            container_connection, list(uploaded.values())
+        )
+        for filepath, remote_path in uploaded.items():
+            if remote_sizes.get(remote_path) != manifest[remote_path][1]:
+                pending.append(filepath)
+            else:
+                print(f"Already in container-> {filepath}")
+        for filepath in pending:
+            manifest.pop("/" + os.path.basename(filepath), None)
+        return pending
+
+    # Gets the sizes of files in the container in one round trip, leaving out missing files
+    @staticmethod
+    def __get_remote_sizes__(container_connection: Connection, remote_paths: list) -> dict:
+        """
+        :meta private:
+        """
+        if not remote_paths:
+            return {}
+        # One line per file, in order, so that file names never need to be parsed back
+        command = (
+            f"for f in {' '.join(shlex.quote(path) for path in remote_paths)}; "
+            'do stat -c %s "$f" 2>/dev/null || echo missing; done'
+        )
+        try:
+            container_connection.open()
+            stdin, stdout, stderr = container_connection.client.exec_command(command)
+            output = stdout.read().decode(errors="replace").splitlines()
+            stdout.channel.recv_exit_status()
+        except Exception as e:
+            print(f"{container_connection} exception on __get_remote_sizes__: {e}")
+            return {}
+        return {
+            path: int(size) for path, size in zip(remote_paths, output) if size.strip().isdigit()
+        }
+
+    @staticmethod
+    def __record_uploads__(container_connection: Connection, local_filepaths: list):
+        """
+        :meta private:
+        """
+        manifest = get_container_connection_pool().get_manifest(container_connection)
+        if manifest is None:
+            return
+        for filepath in local_filepaths:
+            manifest["/" + os.path.basename(filepath)] = (
+                get_file_hash(filepath),
+                os.path.getsize(filepath),
+            )
+
+    @staticmethod
+    def transfer_archive_to_container(
+        container_connection: Connection,
+        local_filepaths: list,
+        remote_folder_path: str = "/",
+        compression_level: int = 0,
+    ) -> int:
+        """
+        Upload files in one round trip, as a tar archive streamed to ``tar`` in the container,
+        gzipped on the fly if ``compression_level`` is not 0.
+
+        Returns the size of the archive in bytes.
+        """
+        start = time.perf_counter()
+        container_connection.open()
+        stdin, stdout, stderr = container_connection.client.exec_command(
+            f"tar -x{'z' if compression_level else ''}f - -C {remote_folder_path}"
+        )
+        write_error = None
+        try:
+            transferred_bytes = write_file_archive(local_filepaths, stdin, compression_level)
+        except OSError as e:
+            # A tar that failed stops reading, and its status says why
+            write_error = e
+        finally:
+            stdin.channel.shutdown_write()
+        container_helpers.__check_status__(
+            stdout, stderr, f"Unpacking {len(local_filepaths)} files"
+        )
+        if write_error:
+            raise write_error
+        print(
+            f"To container-> {len(local_filepaths)} files, "
+            f"{'compressed ' if compression_level else ''}"
+            f"{format_transfer_rate(transferred_bytes, time.perf_counter() - start)}"
+        )
+        return transferred_bytes
+
+    # Uploads a file gzipped, to be decompressed by gzip in the container as it arrives
+    @staticmethod
+    def __put_compressed__(container_connection: Connection, local_filepath: str, level: int):
+        """
+        :meta private:
+        """
+        start = time.perf_counter()
+        container_connection.open()
+        stdin, stdout, stderr = container_connection.client.exec_command(
+            f"gzip -dc > /{os.path.basename(local_filepath)}"
+        )
+        writer = _counting_writer(stdin)
+        write_error = None
+        try:
+            with open(local_filepath, "rb") as f, gzip.GzipFile(
+                fileobj=writer, mode="wb", compresslevel=level
+            ) as compressor:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    compressor.write(chunk)
+        except OSError as e:
+            write_error = e
+        finally:
+            stdin.channel.shutdown_write()
+        container_helpers.__check_status__(stdout, stderr, f"Decompressing {local_filepath}")
+        if write_error:
+            raise write_error
+        print(
+            f"... compressed to "
+            f"{format_transfer_rate(writer.bytes_written, time.perf_counter() - start)}"
+        )
+
+    # Downloads a file gzipped by gzip in the container, decompressing it as it arrives
+    @staticmethod
+    def __get_compressed__(
+        container_connection: Connection, remote_filename: str, local_filepath: str, level: int
     ):
-        for filename in local_filenames:
-            filepath = filename if not local_folder_path else f"{local_folder_path}/{filename}"
-            container_helpers.transfer_file_to_container(container_connection, filepath)
+        """
+        :meta private:
+        """
+        start = time.perf_counter()
+        container_connection.open()
+        stdin, stdout, stderr = container_connection.client.exec_command(
+            f"gzip -c -{level} /{remote_filename}"
+        )
+        stdin.channel.shutdown_write()
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        received_bytes = 0
+        try:
+            with open(local_filepath, "wb") as f:
+                for chunk in iter(lambda: stdout.read(1 << 16), b""):
+                    received_bytes += len(chunk)
+                    f.write(decompressor.decompress(chunk))
+                f.write(decompressor.flush())
+            container_helpers.__check_status__(stdout, stderr, f"Compressing {remote_filename}")
+            if not decompressor.eof:
+                raise RuntimeError(f"The compressed {remote_filename} was cut short")
+        except BaseException:
+            # A partial file must not pass for the result
+            if os.path.isfile(local_filepath):
+                os.remove(local_filepath)
+            raise
+        print(
+            f"... compressed to "
+            f"{format_transfer_rate(received_bytes, time.perf_counter() - start)}"
+        )
+
+    @staticmethod
+    def __check_status__(stdout, stderr, action: str):
+        """
+        :meta private:
+        """
+        status = stdout.channel.recv_exit_status()
+        if status != 0:
+            raise RuntimeError(
+                f"{action} in the container failed with status {status}: "
+                f"{stderr.read().decode(errors='replace').strip()}"
+            )
+
+    @staticmethod
+    def wait_for_file_in_container(
+        container_connection: Connection,
+        remote_filename: str,
+        max_checks: int = 20,
+        initial_delay: float = 0.05,
+        max_delay: float = 2.0,
+        min_stable_interval: float = 0.5,
+    ) -> int:
+        """
+        Wait for a file in the container to be fully written, that is, to exist, not be
+        empty, and keep the same size for at least ``min_stable_interval`` seconds.
+
+        The checks are ``stat`` calls over the SFTP session of the connection, made after
+        delays growing exponentially from ``initial_delay`` up to ``max_delay``. Once the size
+        stops changing, the next check waits out the rest of ``min_stable_interval``, so that
+        a writer that only pauses briefly is not taken for done.
+        Returns the size of the file, or raises ``TimeoutError`` after ``max_checks`` checks.
+        """
+        remote_path = f"/{remote_filename}"
+        delay = initial_delay
+        last_size = None
+        stable_since = None
+        with get_container_connection_pool().using(container_connection):
+            sftp = container_connection.sftp()
+            for _ in range(max_checks):
+                try:
+                    size = sftp.stat(remote_path).st_size
+                except FileNotFoundError:
+                    size = None
+                now = time.monotonic()
+                if not size or size != last_size:
+                    stable_since = now
+                elif now - stable_since >= min_stable_interval:
+                    return size
+                last_size = size
+                wait = delay
+                if size:
+                    wait = max(wait, stable_since + min_stable_interval - now)
+                time.sleep(wait)
+                delay = min(delay * 2, max_delay)
+        if last_size is None:
+            state = "does not exist"
+        elif last_size == 0:
+            state = "was still empty"
+        else:
+            state = f"was still growing ({last_size} bytes)"
+        raise TimeoutError(
+            f"{remote_path} in the container {state} after {max_checks} checks, "
+            f"so it was not transferred"
+        )
 
     @staticmethod
     def transfer_file_from_container(
         container_connection: Connection, remote_filename: str, local_path_only: str
     ):
         print(f"From container-> {local_path_only}/{remote_filename}")
-        container_connection.get(
-            remote=f"/{remote_filename}",
-            local=f"{local_path_only}/{remote_filename}",
-        )
+        local_filepath = f"{local_path_only}/{remote_filename}"
+        with get_container_connection_pool().using(container_connection):
+            compression = get_transfer_compression()
+            if compression.level > 0:
+                try:
+                    size = container_connection.sftp().stat(f"/{remote_filename}").st_size
+                except OSError:
+                    size = None
+                if compression.should_compress(remote_filename, size):
+                    try:
+                        container_helpers.__get_compressed__(
+                            container_connection, remote_filename, local_filepath, compression.level
+                        )
+                        return
+                    except Exception as e:
+                        print(f"{container_connection} exception on __get_compressed__: {e}")
+            container_connection.get(
+                remote=f"/{remote_filename}",
+                local=local_filepath,
+            )
 
     @staticmethod
     def transfer_files_from_container(
         container_connection: Connection, local_folder_path: str, remote_filenames: list
     ):
-        for filename in remote_filenames:
-            container_helpers.transfer_file_from_container(
-                container_connection, filename, local_folder_path
-            )
+        with get_container_connection_pool().using(container_connection):
+            for filename in remote_filenames:
+                container_helpers.transfer_file_from_container(
+                    container_connection, filename, local_folder_path
+                )
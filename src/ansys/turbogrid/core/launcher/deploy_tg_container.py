@@ -20,10 +20,120 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import hashlib
+import json
+import os
 import platform
 import subprocess
 import time
 
+from ansys.turbogrid.core.launcher.port_helpers import (
+    get_listening_ports,
+    parse_listening_ports,
+    port_reservation,
+    wait_for_ports,
+    wait_for_ports_async,
+)
+from ansys.turbogrid.core.launcher.shared_work_dir import shared_work_dir
+
+TG_CONTAINER_SIGNATURE_LABEL = "pyturbogrid.signature"
+TG_CONTAINER_FTP_PORT_LABEL = "pyturbogrid.ftp_port"
+TG_CONTAINER_SOCKET_PORT_LABEL = "pyturbogrid.socket_port"
+
+
+async def _run_shell_async(command: str, capture: bool = False) -> tuple[str, str]:
+    """Run a shell command without blocking the event loop."""
+    import asyncio
+
+    pipe = asyncio.subprocess.PIPE if capture else None
+    proc = await asyncio.create_subprocess_shell(command, stdout=pipe, stderr=pipe)
+    stdout, stderr = await proc.communicate()
+    if not capture:
+        return "", ""
+    return stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+
+def get_docker_prepend_command() -> str:
+    """Get the command that docker commands are run through on this platform."""
+    return (
+        "sudo"
+        if platform.system() == "Linux"
+        else '"C:/Program Files/PowerShell/7/pwsh.exe" -Command'
+    )
+
+
+def get_tg_container_signature(
+    image_name: str,
+    cfxtg_command_name: str,
+    cfx_version: str,
+    license_server: str,
+    additional_env_vars: dict,
+    volumes: dict = None,
+) -> str:
+    """
+    Get a hash identifying the containers that are interchangeable for a launch.
+
+    Containers with the same signature run the same image and command with the same
+    environment and mounts, and differ only by their name and ports.
+    """
+    settings = [
+        image_name,
+        cfxtg_command_name,
+        str(cfx_version),
+        license_server,
+        additional_env_vars,
+    ]
+    if volumes:
+        settings.append(volumes)
+    settings = json.dumps(
+        settings,
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(settings.encode()).hexdigest()[:16]
+
+
+def parse_tg_container_list(docker_ps_output: str) -> list[tuple[str, int, int]]:
+    """
+    Get the containers from the output of ``docker ps --format "{{.Names}} {{.Labels}}"``.
+
+    Returns (container name, ftp port, socket port) for each container that has the port labels.
+    """
+    containers = []
+    for line in docker_ps_output.splitlines():
+        fields = line.strip().split(" ", 1)
+        if len(fields) < 2:
+            continue
+        labels = dict(label.split("=", 1) for label in fields[1].split(",") if "=" in label)
+        try:
+            containers.append(
+                (
+                    fields[0],
+                    int(labels[TG_CONTAINER_FTP_PORT_LABEL]),
+                    int(labels[TG_CONTAINER_SOCKET_PORT_LABEL]),
+                )
+            )
+        except (KeyError, ValueError):
+            continue
+    return containers
+
+
+def find_stopped_tg_containers(signature: str) -> list[tuple[str, int, int]]:
+    """
+    Find the stopped TurboGrid containers that were launched with the given signature.
+
+    Returns (container name, ftp port, socket port) for each container found.
+    """
+    result = subprocess.run(
+        f"{get_docker_prepend_command()} docker ps -a --filter status=exited "
+        f"--filter label={TG_CONTAINER_SIGNATURE_LABEL}={signature} "
+        '--format "{{.Names}} {{.Labels}}"',
+        shell=True,
+        capture_output=True,
+        text=True,
+    )
+    return parse_tg_container_list(result.stdout)
+
 
 class deployed_tg_container:
     image_name: str
@@ -35,6 +145,14 @@ class deployed_tg_container:
     is_linux: bool
     prepend_command: str
     keep_stopped_container: bool
+    ready_timeout: float
+    time_to_ready: float
+    port_reservation: port_reservation
+    shared_work_dir: shared_work_dir = None
+    docker_command: str
+    log_filename: str
+    log_stream: subprocess.Popen = None
+    disposed: bool = False
 
     def __init__(
         self,
@@ -46,6 +164,12 @@ class deployed_tg_container:
         container_name: str = "TG_CONTAINER",
         keep_stopped_container=False,
         additional_env_vars={},
+        ready_timeout: float = 60.0,
+        port_reservation: port_reservation = None,
+        start: bool = True,
+        log_filename: str = None,
+        labels={},
+        shared_work_dir: shared_work_dir = None,
     ):
         self.image_name = image_name
         self.socket_port = socket_port
@@ -54,10 +178,25 @@ class deployed_tg_container:
         self.license_server = license_server
         self.container_name = container_name
         self.keep_stopped_container = keep_stopped_container
+        self.ready_timeout = ready_timeout
+        self.port_reservation = port_reservation
+        self.shared_work_dir = shared_work_dir
+        self.log_filename = (
+            log_filename
+            if log_filename
+            else os.path.join(os.getcwd(), f"{self.container_name}Log.txt")
+        )
         self.is_linux = platform.system() == "Linux"
         additional_env_string: str = ""
         for key, val in additional_env_vars.items():
             additional_env_string += f" -e {key}={val} "
+        label_string: str = ""
+        for key, val in labels.items():
+            label_string += f"--label {key}={val} "
+        volumes = shared_work_dir.get_volumes() if shared_work_dir else {}
+        volume_string: str = ""
+        for host_path, container_path in volumes.items():
+            volume_string += f'-v "{host_path}:{container_path}" '
         print("\n")
         print(f"######### Launching Container #########")
         print(f"       tg_container_name = {self.container_name}")
@@ -70,6 +209,7 @@ class deployed_tg_container:
         print(f"       is_linux = {self.is_linux}")
         print(f"       additional_env_vars = {additional_env_vars}")
         print(f"       additional_env_string = {additional_env_string}")
+        print(f"       volumes = {volumes}")
         print("\n")
 
         # subprocess.run(
@@ -78,45 +218,237 @@ class deployed_tg_container:
         #     else '"C:/Program Files/PowerShell/7/pwsh.exe" -Command gci env:',
         #     shell=True,
         # )
-        self.prepend_command = (
-            "sudo" if self.is_linux else '"C:/Program Files/PowerShell/7/pwsh.exe" -Command'
-        )
+        self.prepend_command = get_docker_prepend_command()
         logical_and = "&&" if self.is_linux else "^&^&"
-        print("######### Spin up docker image #########")
-        print(f"Remove any existing containers: {self.container_name}")
-        subprocess.run(
-            f"{self.prepend_command} docker container rm -fv {self.container_name}", shell=True
-        )
-        docker_command = (
+        self.docker_command = (
             f"{self.prepend_command} docker run --name {self.container_name} "
+            f"{label_string}{volume_string}"
             f"-e ANSYSLMD_LICENSE_FILE={self.license_server} {additional_env_string}"
             f"-p {self.socket_port}:{self.socket_port} "
             f"-p {self.ftp_port}:{self.ftp_port} "
             f"-d {self.image_name} /bin/bash -c '/usr/local/bin/start_sshd.sh "
             f" {self.ftp_port} {logical_and} {self.cfxtg_command}'"
         )
-        print(f"docker_command: {docker_command}")
-        print(f"start tg...")
-        subprocess.run(f"{docker_command}", shell=True)
-        print(f"sleep...")
-        # Wait 2 seconds for the container to actually be responsive
-        time.sleep(2)
-        print(f"TG container ready")
+        if start:
+            self.start()
 
-    def __del__(self):
-        print("\n######### Container Console Output #########")
-        subprocess.run(f"{self.prepend_command} docker logs {self.container_name}", shell=True)
-        print("\n######### Dispose of container #########")
+    def start(self):
+        """Run the container and wait until TurboGrid and the ssh server are listening."""
+        print("######### Spin up docker image #########")
+        print(f"Remove any existing containers: {self.container_name}")
         subprocess.run(
-            f"{self.prepend_command} docker container stop {self.container_name}", shell=True
+            f"{self.prepend_command} docker container rm -fv {self.container_name}", shell=True
         )
-        if self.keep_stopped_container == False:
-            subprocess.run(
-                f"{self.prepend_command} docker container rm -fv {self.container_name}", shell=True
+        print(f"docker_command: {self.docker_command}")
+        print(f"start tg...")
+        start = time.perf_counter()
+        if self.port_reservation:
+            # Docker needs to bind the reserved ports itself
+            self.port_reservation.release_sockets()
+        subprocess.run(f"{self.docker_command}", shell=True)
+        self.__stream_logs__()
+        print(f"wait for ports {self.socket_port} and {self.ftp_port}...")
+        wait_for_ports(
+            [self.socket_port, self.ftp_port],
+            self.get_container_listening_ports,
+            deadline=self.ready_timeout,
+        )
+        self.time_to_ready = time.perf_counter() - start
+        print(f"TG container ready after {self.time_to_ready:.3f} s")
+
+    async def start_async(self):
+        """Run the container like ``start``, without blocking the event loop."""
+        print("######### Spin up docker image #########")
+        print(f"Remove any existing containers: {self.container_name}")
+        await _run_shell_async(
+            f"{self.prepend_command} docker container rm -fv {self.container_name}"
+        )
+        print(f"docker_command: {self.docker_command}")
+        print(f"start tg...")
+        start = time.perf_counter()
+        if self.port_reservation:
+            # Docker needs to bind the reserved ports itself
+            self.port_reservation.release_sockets()
+        await _run_shell_async(self.docker_command)
+        self.__stream_logs__()
+        print(f"wait for ports {self.socket_port} and {self.ftp_port}...")
+        await wait_for_ports_async(
+            [self.socket_port, self.ftp_port],
+            self.get_container_listening_ports_async,
+            deadline=self.ready_timeout,
+        )
+        self.time_to_ready = time.perf_counter() - start
+        print(f"TG container ready after {self.time_to_ready:.3f} s")
+
+    def restart(self):
+        """
+        Start this stopped container again and wait until it is ready.
+
+        The container runs its original command, so it listens on the ports it was created with.
+        """
+        print("######### Restart stopped container #########")
+        start = time.perf_counter()
+        if self.port_reservation:
+            self.port_reservation.release_sockets()
+        result = subprocess.run(
+            f"{self.prepend_command} docker container start {self.container_name}",
+            shell=True,
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"Unable to restart container {self.container_name}: {result.stderr.strip()}"
+            )
+        self.__stream_logs__()
+        print(f"wait for ports {self.socket_port} and {self.ftp_port}...")
+        wait_for_ports(
+            [self.socket_port, self.ftp_port],
+            self.get_container_listening_ports,
+            deadline=self.ready_timeout,
+        )
+        self.time_to_ready = time.perf_counter() - start
+        print(f"TG container ready after {self.time_to_ready:.3f} s")
+
+    def get_container_listening_ports(self) -> set[int]:
+        """Get the TCP ports that are listening inside the container."""
+        result = subprocess.run(
+            self.__listening_ports_command__(),
+            shell=True,
+            capture_output=True,
+            text=True,
+        )
+        return self.__parse_listening_ports_result__(result.stdout, result.stderr)
+
+    async def get_container_listening_ports_async(self) -> set[int]:
+        """Get the TCP ports that are listening inside the container, without blocking."""
+        stdout, stderr = await _run_shell_async(self.__listening_ports_command__(), capture=True)
+        return self.__parse_listening_ports_result__(stdout, stderr)
+
+    def __listening_ports_command__(self) -> str:
+        """
+        :meta private:
+        """
+        return (
+            f"{self.prepend_command} docker exec {self.container_name} "
+            f"cat /proc/net/tcp /proc/net/tcp6"
+        )
+
+    def __parse_listening_ports_result__(self, stdout: str, stderr: str) -> set[int]:
+        """
+        :meta private:
+        """
+        if not stdout:
+            raise RuntimeError(
+                f"Unable to query container {self.container_name}. "
+                f"Check that it is still running: {stderr.strip()}"
+            )
+        return parse_listening_ports(stdout)
+
+    def __stream_logs__(self):
+        """
+        :meta private:
+        """
+        # The container console output is followed into the log file in the background.
+        # The stream ends by itself when the container stops.
+        with open(self.log_filename, "w") as log_file:
+            self.log_stream = subprocess.Popen(
+                f"{self.prepend_command} docker logs -f {self.container_name}",
+                shell=True,
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
             )
+
+    def dispose(self, wait: bool = True):
+        """
+        Stop the container, and remove it unless ``keep_stopped_container`` is set.
+
+        See ``dispose_tg_containers`` to dispose of several containers at once.
+        """
+        dispose_tg_containers([self], wait)
+
+    def __del__(self):
+        if not self.disposed:
+            self.dispose()
+
+
+def dispose_tg_containers(
+    containers: list[deployed_tg_container],
+    wait: bool = True,
+    stop_timeout: int = 1,
+) -> list[subprocess.Popen]:
+    """
+    Stop and remove a number of TurboGrid containers at once.
+
+    All containers are handled by a single ``docker container rm`` (and a single
+    ``docker container stop`` for the containers that are kept), which docker processes
+    concurrently. Removed containers are killed rather than stopped, because the shell
+    running as the container's main process ignores ``SIGTERM`` and ``docker container stop``
+    would wait for its full grace period.
+
+    Parameters
+    ----------
+    containers : list[deployed_tg_container]
+        Containers to dispose of. ``None`` entries and containers that are already
+        disposed of are skipped. Entries that are not docker containers, such as
+        ``remote_hosts.remote_tg_process``, are disposed of by their own ``dispose``.
+    wait : bool, default: ``True``
+        Whether to wait for docker to finish. When ``False``, the docker commands keep
+        running in their own session, so they complete even if Python exits first.
+    stop_timeout : int, default: ``1``
+        Seconds that docker waits for kept containers to stop before killing them.
+
+    Returns
+    -------
+    list[subprocess.Popen]
+        The docker processes, which are finished already when ``wait`` is ``True``.
+    """
+    containers = [c for c in containers if c is not None and not c.disposed]
+    for other in [c for c in containers if not isinstance(c, deployed_tg_container)]:
+        other.dispose(wait)
+    containers = [c for c in containers if isinstance(c, deployed_tg_container)]
+    if not containers:
+        return []
+    for container in containers:
+        container.disposed = True
+    prepend_command = containers[0].prepend_command
+    removed = [c.container_name for c in containers if not c.keep_stopped_container]
+    stopped = [c.container_name for c in containers if c.keep_stopped_container]
+    commands = []
+    if removed:
+        commands.append(f"{prepend_command} docker container rm -fv {' '.join(removed)}")
+    if stopped:
+        commands.append(
+            f"{prepend_command} docker container stop -t {stop_timeout} {' '.join(stopped)}"
+        )
+    print("\n######### Dispose of containers #########")
+    docker_procs = [
+        subprocess.Popen(
+            command,
+            shell=True,
+            start_new_session=not wait,
+            stdout=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL,
+        )
+        for command in commands
+    ]
+    if wait:
+        for docker_proc in docker_procs:
+            docker_proc.wait()
+    for container in containers:
+        if wait and container.log_stream:
+            try:
+                container.log_stream.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                container.log_stream.kill()
+        if container.port_reservation:
+            container.port_reservation.release()
         print(
-            f"######### All done {self.container_name} from {self.image_name} on {self.socket_port} #########"
+            f"######### All done {container.container_name} from {container.image_name} "
+            f"on {container.socket_port}, console output in {container.log_filename} #########"
         )
+    return docker_procs
 
 
 class remote_tg_instance:
@@ -125,14 +457,18 @@ class remote_tg_instance:
     # license_server: str
     is_linux: bool
     tg_proc: subprocess.Popen
+    ready_timeout: float
+    time_to_ready: float
 
     def __init__(
         self,
         socket_port: int,
         cfxtg_command_noargs: str,
         # license_server: str,
+        ready_timeout: float = 60.0,
     ):
         self.socket_port = socket_port
+        self.ready_timeout = ready_timeout
         self.cfxtg_command = f'"{cfxtg_command_noargs}" -py -control-port {self.socket_port}'
         # self.license_server = license_server
         self.is_linux = platform.system() == "Linux"
@@ -153,15 +489,21 @@ class remote_tg_instance:
             shell=True,
         )
         print("######### Spin up remote process #########")
+        start = time.perf_counter()
         self.tg_proc = subprocess.Popen(
             f"{self.cfxtg_command}",
             shell=True,
         )
         print(f"pid: {self.tg_proc.pid}")
-        print(f"sleep...")
-        # Wait 2 seconds for the container to actually be responsive
-        time.sleep(2)
-        print(f"TG instance ready")
+        print(f"wait for port {self.socket_port}...")
+        wait_for_ports(
+            [self.socket_port],
+            get_listening_ports,
+            deadline=self.ready_timeout,
+            is_alive=lambda: self.tg_proc.poll() is None,
+        )
+        self.time_to_ready = time.perf_counter() - start
+        print(f"TG instance ready after {self.time_to_ready:.3f} s")
 
     def __del__(self):
         print("\n######### Dispose of process #########")
@@ -0,0 +1,228 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-FileCopyrightText: 2023 ANSYS, Inc. All rights reserved
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Module for finding and validating local TurboGrid installations once per host."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import platform
+import re
+import shutil
+import threading
+from typing import Optional
+
+# The environment variables that decide which installation is found
+_DISCOVERY_ENV_PREFIXES = ("AWP_ROOT", "PYTURBOGRID_TURBOGRID_ROOT")
+
+
+class turbogrid_install:
+    """A validated local TurboGrid installation."""
+
+    exe_path: Path
+    version: Optional[str]
+    features: set[str]
+
+    def __init__(self, exe_path: Path, version: Optional[str], features: set[str]):
+        self.exe_path = Path(exe_path)
+        self.version = version
+        self.features = set(features)
+
+    def supports(self, feature: str) -> bool:
+        """Check whether the installation provides a feature, such as ``cfxtgpynoviewer``."""
+        return feature in self.features
+
+    def __repr__(self):
+        return (
+            f"turbogrid_install({str(self.exe_path)!r}, version={self.version!r}, "
+            f"features={sorted(self.features)})"
+        )
+
+
+def get_discovery_cache_path() -> Optional[Path]:
+    """
+    Get the file where discovered installations are cached on this host.
+
+    The file cache is only used when the ``PYTURBOGRID_DISCOVERY_CACHE`` environment variable
+    gives its location. Otherwise, installations are only remembered within the process.
+    """
+    cache_path = os.getenv("PYTURBOGRID_DISCOVERY_CACHE")
+    return Path(cache_path) if cache_path else None
+
+
+def get_install_version(exe_path: Path) -> Optional[str]:
+    """Get the version of an installation from its ``vXYZ`` directory, for example ``"25.2.0"``."""
+    for part in reversed(Path(exe_path).parts):
+        match = re.fullmatch(r"v(\d\d)(\d)", part)
+        if match:
+            return f"{match.group(1)}.{match.group(2)}.0"
+    return None
+
+
+def get_install_features(exe_path: Path) -> set[str]:
+    """Get the ``cfxtg`` commands provided alongside the executable."""
+    bin_dir = Path(exe_path).parent
+    return {
+        entry.stem if entry.suffix.lower() == ".exe" else entry.name
+        for entry in bin_dir.glob("cfxtg*")
+        if entry.is_file()
+    }
+
+
+def validate_install(exe_path: Path) -> turbogrid_install:
+    """
+    Check that a TurboGrid executable can be run, and describe its installation.
+
+    Raises a ``FileNotFoundError`` if the executable does not exist or cannot be run.
+    """
+    exe_path = Path(exe_path)
+    if not exe_path.is_file():
+        # A bare command name may still be found on the PATH
+        found = shutil.which(str(exe_path))
+        if found is None:
+            raise FileNotFoundError(f"The TurboGrid executable {exe_path} does not exist")
+        exe_path = Path(found)
+    if not os.access(exe_path, os.X_OK):
+        raise FileNotFoundError(f"The TurboGrid executable {exe_path} cannot be run")
+    return turbogrid_install(
+        exe_path, get_install_version(exe_path), get_install_features(exe_path)
+    )
+
+
+class install_discovery:
+    """
+    Resolve and validate TurboGrid installations, remembering the results.
+
+    Results are remembered in memory for the life of the process and, if a cache file is
+    configured, in a file shared by all processes on the host. Both are keyed by the launch
+    arguments and the environment variables that select the installation. The file entries
+    are also checked against the modification time of the executable, so that a reinstall
+    is picked up. An explicit ``turbogrid_path`` needs no searching, so it is never written
+    to the file.
+    """
+
+    def __init__(self, cache_path: Optional[Path] = None):
+        self._lock = threading.Lock()
+        self._installs: dict[str, turbogrid_install] = {}
+        self._cache_path = cache_path
+
+    def clear(self):
+        """Forget the installations found in this process."""
+        with self._lock:
+            self._installs.clear()
+
+    def get_install(self, **launch_argvals) -> turbogrid_install:
+        """
+        Get the installation that ``launch_turbogrid`` would use for the given arguments.
+
+        Accepts the same ``turbogrid_path`` and ``product_version`` arguments as
+        ``get_turbogrid_exe_path``. Raises a ``FileNotFoundError`` if the installation is invalid.
+        """
+        key = self.__key__(launch_argvals)
+        use_cache_file = not launch_argvals.get("turbogrid_path")
+        with self._lock:
+            install = self._installs.get(key)
+            if install is None and use_cache_file:
+                install = self.__read_cache__(key)
+            if install is None:
+                from ansys.turbogrid.core.launcher.launcher import get_turbogrid_exe_path
+
+                install = validate_install(get_turbogrid_exe_path(**launch_argvals))
+                if use_cache_file:
+                    self.__write_cache__(key, install)
+            self._installs[key] = install
+            return install
+
+    def __key__(self, launch_argvals: dict) -> str:
+        """
+        :meta private:
+        """
+        environment = {
+            var: val for var, val in os.environ.items() if var.startswith(_DISCOVERY_ENV_PREFIXES)
+        }
+        selection = [
+            platform.node(),
+            str(launch_argvals.get("turbogrid_path")),
+            str(launch_argvals.get("product_version")),
+            environment,
+        ]
+        return hashlib.sha256(json.dumps(selection, sort_keys=True).encode()).hexdigest()
+
+    def __cache_file__(self) -> Optional[Path]:
+        """
+        :meta private:
+        """
+        return self._cache_path if self._cache_path else get_discovery_cache_path()
+
+    def __read_cache__(self, key: str) -> Optional[turbogrid_install]:
+        """
+        :meta private:
+        """
+        cache_file = self.__cache_file__()
+        try:
+            entry = json.loads(cache_file.read_text())[key]
+            if os.stat(entry["exe_path"]).st_mtime_ns != entry["mtime"]:
+                return None
+            return turbogrid_install(entry["exe_path"], entry["version"], entry["features"])
+        except (AttributeError, OSError, KeyError, TypeError, ValueError):
+            return None
+
+    def __write_cache__(self, key: str, install: turbogrid_install):
+        """
+        :meta private:
+        """
+        cache_file = self.__cache_file__()
+        if cache_file is None:
+            return
+        try:
+            try:
+                entries = json.loads(cache_file.read_text())
+            except (OSError, ValueError):
+                entries = {}
+            entries[key] = {
+                "exe_path": str(install.exe_path),
+                "version": install.version,
+                "features": sorted(install.features),
+                "mtime": os.stat(install.exe_path).st_mtime_ns,
+            }
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # Replace the file in one go, so that other processes never read half of it
+            temp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            temp_file.write_text(json.dumps(entries, indent=1))
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            print(f"Unable to write the TurboGrid discovery cache {cache_file}: {e}")
+
+
+_install_discovery = install_discovery()
+
+
+def get_install_discovery() -> install_discovery:
+    """Get the installation discovery shared by this process."""
+    return _install_discovery
+
+
+def discover_turbogrid_install(**launch_argvals) -> turbogrid_install:
+    """Get the validated installation for the given launch arguments, using the shared discovery."""
+    return _install_discovery.get_install(**launch_argvals)
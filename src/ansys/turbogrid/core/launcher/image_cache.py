@@ -0,0 +1,194 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-FileCopyrightText: 2023 ANSYS, Inc. All rights reserved
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Module for pulling TurboGrid container images that are missing on the host."""
+
+import subprocess
+import threading
+import time
+from typing import Optional
+
+from ansys.turbogrid.core.launcher.deploy_tg_container import get_docker_prepend_command
+
+
+def parse_image_digest(docker_inspect_output: str) -> Optional[str]:
+    """
+    Get the image digest from the output of ``docker image inspect --format "{{.Id}}"``.
+
+    Returns ``None`` if the output is not a digest, for example when the image is missing.
+    """
+    lines = docker_inspect_output.strip().splitlines()
+    digest = lines[0].strip() if lines else ""
+    return digest if digest.startswith("sha256:") else None
+
+
+class image_cache:
+    """
+    Pull the container images that are missing on the host, and remember their digests.
+
+    An image that is already on the host is used as it is, so that a tag is never updated
+    behind the user's back and hosts without a registry do not wait for a pull to fail.
+    Only a missing image, or a refreshed one, is pulled. The digest is then remembered in
+    memory for the life of the process. Concurrent preparations of the same image in a
+    process wait for the one pull in flight. Docker itself joins concurrent pulls from
+    several processes.
+    """
+
+    prepend_command: str
+
+    def __init__(self, prepend_command: str = None):
+        """
+        Parameters
+        ----------
+        prepend_command : str, default: ``None``
+            Command that docker commands are run through. The default is ``None``, in which
+            case ``get_docker_prepend_command`` is used.
+        """
+        self.prepend_command = (
+            prepend_command if prepend_command is not None else get_docker_prepend_command()
+        )
+        self._lock = threading.Lock()
+        self._digests: dict[str, str] = {}
+        self._pulls: dict[str, threading.Event] = {}
+        self._errors: dict[str, Exception] = {}
+
+    def clear(self):
+        """Forget the images prepared in this process."""
+        with self._lock:
+            self._digests.clear()
+
+    def prepare(self, image_name: str, refresh: bool = False) -> str:
+        """
+        Make sure that an image is available on this host, pulling it if it is missing.
+
+        Parameters
+        ----------
+        image_name : str
+            Name of the image, with its tag or digest.
+        refresh : bool, default: ``False``
+            Whether to pull the image even if it is on the host already, for example to
+            pick up a new version of a tag.
+
+        Returns
+        -------
+        str
+            The digest of the local image.
+
+        Raises
+        ------
+        RuntimeError
+            If the image can neither be pulled nor be found locally.
+        """
+        with self._lock:
+            if refresh:
+                self._digests.pop(image_name, None)
+            while image_name in self._pulls:
+                pull = self._pulls[image_name]
+                self._lock.release()
+                try:
+                    pull.wait()
+                finally:
+                    self._lock.acquire()
+                if image_name in self._errors:
+                    raise RuntimeError(str(self._errors[image_name]))
+            if image_name in self._digests:
+                return self._digests[image_name]
+            pull = self._pulls[image_name] = threading.Event()
+            self._errors.pop(image_name, None)
+        try:
+            digest = self.__prepare__(image_name, refresh)
+        except Exception as e:
+            with self._lock:
+                self._errors[image_name] = e
+            raise
+        else:
+            with self._lock:
+                self._digests[image_name] = digest
+            return digest
+        finally:
+            with self._lock:
+                del self._pulls[image_name]
+            pull.set()
+
+    def get_local_digest(self, image_name: str) -> Optional[str]:
+        """Get the digest of the local image, ``None`` if there is none."""
+        result = subprocess.run(
+            f'{self.prepend_command} docker image inspect --format "{{{{.Id}}}}" {image_name}',
+            shell=True,
+            capture_output=True,
+            text=True,
+        )
+        return parse_image_digest(result.stdout) if result.returncode == 0 else None
+
+    def __prepare__(self, image_name: str, refresh: bool) -> str:
+        """
+        :meta private:
+        """
+        if not refresh:
+            digest = self.get_local_digest(image_name)
+            if digest is not None:
+                return digest
+        print(f"Pulling image {image_name}...")
+        start = time.perf_counter()
+        result = subprocess.run(
+            f"{self.prepend_command} docker pull {image_name}",
+            shell=True,
+            capture_output=True,
+            text=True,
+        )
+        digest = self.get_local_digest(image_name)
+        if digest is None:
+            raise RuntimeError(f"Unable to pull image {image_name}: {result.stderr.strip()}")
+        if result.returncode != 0:
+            # Images built on this host cannot be pulled, but can be run all the same
+            print(
+                f"Unable to pull image {image_name}, using the local one: {result.stderr.strip()}"
+            )
+        else:
+            print(f"Image {image_name} pulled after {time.perf_counter() - start:.3f} s")
+        return digest
+
+
+_image_cache = None
+_image_cache_lock = threading.Lock()
+
+
+def get_image_cache() -> image_cache:
+    """Get the image cache shared by this process."""
+    global _image_cache
+    with _image_cache_lock:
+        if _image_cache is None:
+            _image_cache = image_cache()
+        return _image_cache
+
+
+def prepare_tg_image(image_name: str, refresh: bool = False) -> str:
+    """
+    Pull a TurboGrid image if it is not on this host yet, using the shared image cache.
+
+    Call it before launching containers, so that the pull does not count in their launch.
+    ``launch_turbogrid_container`` calls it too, and returns straight away for an image
+    that is prepared already. Returns the digest of the image.
+    """
+    return get_image_cache().prepare(image_name, refresh)
@@ -0,0 +1,137 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-FileCopyrightText: 2023 ANSYS, Inc. All rights reserved
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Module for staggering the launches of TurboGrid sessions that are started together."""
+
+from contextlib import contextmanager
+import platform
+import random
+import threading
+import time
+from typing import Callable, Hashable, Optional
+
+
+class staggered_launch_scheduler:
+    """
+    Stagger the starts of TurboGrid launches, and hold back their contended phases.
+
+    Launches started together all load the same executables and libraries, and so compete
+    for the disk and the cores. Starting them a little apart (the stagger), not quite in
+    step (the jitter), spreads that out. Some phases cannot run concurrently at all, such
+    as the conversion of ``.x_b`` files to ``.tin`` when reading a tginit on Linux:
+    those are run inside ``contended``, which lets only so many of them run at a time,
+    while the rest of the launches go on concurrently.
+    """
+
+    stagger: float
+    jitter: float
+    ramp_up: Optional[int]
+    contended_concurrency: Optional[int]
+
+    def __init__(
+        self,
+        stagger: float = 0.5,
+        jitter: float = 0.25,
+        ramp_up: Optional[int] = None,
+        contended_concurrency: Optional[int] = 1,
+        seed: Optional[int] = None,
+    ):
+        """
+        Parameters
+        ----------
+        stagger : float, default: ``0.5``
+            Seconds between the starts of consecutive launches.
+        jitter : float, default: ``0.25``
+            Maximum random seconds added to the start of each launch.
+        ramp_up : int, default: ``None``
+            Number of launches that are staggered. The later ones start along with the last
+            of them, with jitter only, once the first ones have warmed up the file caches.
+            The default is ``None``, in which case all the launches are staggered.
+        contended_concurrency : int, default: ``1``
+            Number of launches that can be in the same contended phase at a time.
+            ``None`` does not hold back any phase.
+        seed : int, default: ``None``
+            Optional seed of the jitter, for reproducible schedules.
+        """
+        if stagger < 0 or jitter < 0:
+            raise ValueError(f"The stagger ({stagger}) and jitter ({jitter}) cannot be negative")
+        if contended_concurrency is not None and contended_concurrency < 1:
+            raise ValueError(
+                f"At least one launch must be let in a contended phase, not {contended_concurrency}"
+            )
+        self.stagger = stagger
+        self.jitter = jitter
+        self.ramp_up = ramp_up
+        self.contended_concurrency = contended_concurrency
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._gates: dict[Hashable, threading.Semaphore] = {}
+
+    def get_start_delays(self, count: int) -> list[float]:
+        """Get the seconds each of ``count`` launches started together waits before it starts."""
+        staggered = count if self.ramp_up is None else min(count, max(self.ramp_up, 1))
+        with self._lock:
+            return [
+                self.stagger * min(i, staggered - 1) + self._random.uniform(0.0, self.jitter)
+                for i in range(count)
+            ]
+
+    def delayed(self, job: Callable, delay: float) -> Callable:
+        """Wrap a launch job so that it waits ``delay`` seconds before it starts."""
+
+        def run(*args, **kwargs):
+            if delay > 0:
+                time.sleep(delay)
+            return job(*args, **kwargs)
+
+        return run
+
+    @contextmanager
+    def contended(self, phase: Hashable):
+        """
+        Run the body of a ``with`` statement once fewer than ``contended_concurrency``
+        launches are in ``phase``.
+        """
+        if self.contended_concurrency is None:
+            yield
+            return
+        with self._lock:
+            gate = self._gates.get(phase)
+            if gate is None:
+                gate = self._gates[phase] = threading.Semaphore(self.contended_concurrency)
+        with gate:
+            yield
+
+
+def get_default_launch_scheduler() -> staggered_launch_scheduler:
+    """
+    Get a scheduler with the default stagger and jitter.
+
+    On Linux, the contended phases are run one at a time, since converting ``.x_b`` files
+    to ``.tin`` in several TurboGrid sessions at once makes them fail unpredictably.
+    Elsewhere, no phase is held back.
+    """
+    return staggered_launch_scheduler(
+        contended_concurrency=1 if platform.system() == "Linux" else None
+    )
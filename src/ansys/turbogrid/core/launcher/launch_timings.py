@@ -0,0 +1,104 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-FileCopyrightText: 2023 ANSYS, Inc. All rights reserved
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Module for timing the phases of the launch and first init of a TurboGrid session."""
+
+from contextlib import contextmanager
+from enum import IntEnum
+import time
+
+
+class LaunchPhase(IntEnum):
+    """The phases of the launch and first init of a TurboGrid session, in order."""
+
+    #: Waiting for the admission controller and the license scheduler.
+    QUEUED = 0
+    #: Starting the container that TurboGrid runs in.
+    CONTAINER_START = 1
+    #: Starting ``cfxtg``. When the session starts ``cfxtg`` itself, this includes the handshake.
+    PROCESS_SPAWN = 2
+    #: Connecting to a running ``cfxtg``.
+    HANDSHAKE = 3
+    #: Copying the input files to where TurboGrid reads them.
+    FILE_TRANSFER = 4
+    #: Setting the parameters that go with the read, such as the opening modes.
+    SETTINGS = 5
+    #: Reading the init source (ndf, tginit, inf or state).
+    READ = 6
+    #: Generating the first mesh, once the topology set is unsuspended.
+    FIRST_MESH = 7
+
+
+class launch_timings:
+    """
+    The seconds spent in each ``LaunchPhase`` by one TurboGrid session.
+
+    The phases are timed with ``time.perf_counter``, so the resolution is well below a
+    millisecond. A phase that happens several times, for example when a launch is retried,
+    adds up.
+    """
+
+    durations: dict[LaunchPhase, float]
+
+    def __init__(self):
+        self.durations = {}
+
+    @contextmanager
+    def phase(self, phase: LaunchPhase):
+        """Time the body of a ``with`` statement as a phase, whether it succeeds or not."""
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def add(self, phase: LaunchPhase, seconds: float):
+        """Add seconds to a phase."""
+        self.durations[phase] = self.durations.get(phase, 0.0) + seconds
+
+    def get(self, phase: LaunchPhase) -> float:
+        """Get the seconds spent in a phase, 0 if it did not happen."""
+        return self.durations.get(phase, 0.0)
+
+    @property
+    def total(self) -> float:
+        """The seconds spent in all the phases."""
+        return sum(self.durations.values())
+
+    def to_dict(self) -> dict[str, float]:
+        """
+        Get the phases that happened, in order, by lowercase name, followed by the ``"total"``.
+        The values are seconds.
+        """
+        timings = {
+            phase.name.lower(): self.durations[phase]
+            for phase in LaunchPhase
+            if phase in self.durations
+        }
+        timings["total"] = self.total
+        return timings
+
+    def __repr__(self):
+        phases = ", ".join(f"{name}={seconds:.6f}" for name, seconds in self.to_dict().items())
+        return f"launch_timings({phases})"
@@ -25,15 +25,36 @@
 
 import ast
 from enum import Enum
+import functools
 import os
 from pathlib import Path
 import platform
 import random
-from typing import Optional
+import subprocess
+import time
+from typing import AsyncIterator, Awaitable, Callable, Optional
 
 from ansys.turbogrid.api import pyturbogrid_core
 
-from ansys.turbogrid.core.launcher.deploy_tg_container import deployed_tg_container
+from ansys.turbogrid.core.launcher.admission_control import (
+    admission_controller,
+    attach_session_resource,
+)
+from ansys.turbogrid.core.launcher.deploy_tg_container import (
+    TG_CONTAINER_FTP_PORT_LABEL,
+    TG_CONTAINER_SIGNATURE_LABEL,
+    TG_CONTAINER_SOCKET_PORT_LABEL,
+    deployed_tg_container,
+    find_stopped_tg_containers,
+    get_docker_prepend_command,
+    get_tg_container_signature,
+)
+from ansys.turbogrid.core.launcher.discovery import discover_turbogrid_install
+from ansys.turbogrid.core.launcher.image_cache import prepare_tg_image
+from ansys.turbogrid.core.launcher.license_seats import license_seat_scheduler
+from ansys.turbogrid.core.launcher.port_helpers import get_port_allocator
+from ansys.turbogrid.core.launcher.resource_sampler import attach_resource_sampler
+from ansys.turbogrid.core.launcher.shared_work_dir import shared_work_dir
 
 
 def _is_windows():
@@ -105,6 +126,8 @@ def get_turbogrid_exe_path(**launch_argvals) -> Path:
     4. The path of the TurboGrid installation from the ``AWP_ROOTxxx`` environment variable for
        the latest installed Ansys version.
 
+    The path is not checked. Use ``discovery.discover_turbogrid_install`` to get a validated
+    installation, which is also remembered for later launches.
 
     Returns
     -------
@@ -155,6 +178,9 @@ def launch_turbogrid(
     port: Optional[int] = None,
     host: str = "127.0.0.1",
     log_filename_suffix: str = "",
+    resource_sample_interval: Optional[float] = 1.0,
+    admission_control: admission_controller = None,
+    license_scheduler: license_seat_scheduler = None,
     **kwargs,
 ) -> pyturbogrid_core.PyTurboGrid:
     """Launch TurboGrid locally in server mode.
@@ -183,6 +209,16 @@ def launch_turbogrid(
         Host for TurboGrid communications. The default is ``127.0.0.1, or the local host``
     log_filename_suffix : str, default: ""
         Suffix for name of the log files written out.
+    resource_sample_interval : float, default: ``1.0``
+        Seconds between samples of the CPU time, memory, threads and I/O of the ``cfxtg``
+        process tree, kept in ``resource_sampler`` of the session. Sampling needs a local
+        process and the /proc file system. ``None`` or 0 disables it.
+    admission_control : admission_controller, default: ``None``
+        Optional controller that queues the launch until the host has room for another session.
+        The slot it gives is held by the session until it is shut down with ``shutdown_session``.
+    license_scheduler : license_seat_scheduler, default: ``None``
+        Optional scheduler that queues the launch until a license seat is free, and retries it
+        if it fails anyway. The seat is held by the session like the admission slot.
 
     Returns
     -------
@@ -196,10 +232,17 @@ def launch_turbogrid(
 
     argVals = locals()
     pathToCFXTG: str = turbogrid_path
-    if turbogrid_path == None:
+    if (
+        turbogrid_location_type
+        == pyturbogrid_core.PyTurboGrid.TurboGridLocationType.TURBOGRID_INSTALL
+    ):
+        # Resolved and validated once per install, so that a bad install fails before spawning
+        pathToCFXTG = discover_turbogrid_install(**argVals).exe_path
+    elif turbogrid_path == None:
         pathToCFXTG = get_turbogrid_exe_path(**argVals)
 
-    return pyturbogrid_core.PyTurboGrid(
+    start_session = functools.partial(
+        pyturbogrid_core.PyTurboGrid,
         socket_port=port,
         turbogrid_location_type=turbogrid_location_type,
         cfxtg_location=pathToCFXTG,
@@ -209,6 +252,124 @@ def launch_turbogrid(
         host_ip=host,
         log_filename_suffix=log_filename_suffix,
     )
+    ticket = admission_control.acquire() if admission_control else None
+    try:
+        if license_scheduler:
+            pytg, grant = license_scheduler.launch(start_session)
+        else:
+            pytg, grant = start_session(), None
+    except BaseException:
+        if ticket:
+            ticket.release()
+        raise
+    for resource in (ticket, grant):
+        if resource:
+            attach_session_resource(pytg, resource)
+    attach_resource_sampler(pytg, resource_sample_interval)
+    return pytg
+
+
+async def launch_turbogrid_async(**launch_kwargs) -> pyturbogrid_core.PyTurboGrid:
+    """Launch TurboGrid locally in server mode without blocking the event loop.
+
+    This is the ``asyncio`` counterpart of ``launch_turbogrid`` and takes the same parameters,
+    including ``admission_control``, ``license_scheduler`` and ``resource_sample_interval``.
+    The launch runs in a worker thread, so that several sessions can be launched concurrently.
+
+    With ``TURBOGRID_RUNNING_CONTAINER``, nothing is spawned and ``port`` must be given,
+    for example from ``launch_turbogrid_container_async``.
+
+    Returns
+    -------
+    pyturbogrid_core.PyTurboGrid
+        TurboGrid session.
+    """
+    import asyncio
+
+    return await asyncio.to_thread(launch_turbogrid, **launch_kwargs)
+
+
+class tg_launch_result:
+    """Outcome of one session launched by ``launch_turbogrid_sessions_async``."""
+
+    index: int
+    session: Optional[pyturbogrid_core.PyTurboGrid]
+    error: Optional[BaseException]
+    elapsed: float
+
+    def __init__(
+        self,
+        index: int,
+        session: Optional[pyturbogrid_core.PyTurboGrid],
+        error: Optional[BaseException],
+        elapsed: float,
+    ):
+        self.index = index
+        self.session = session
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        """Whether the session was launched successfully."""
+        return self.error is None
+
+    def __repr__(self):
+        outcome = "ok" if self.ok else f"failed: {self.error!r}"
+        return f"tg_launch_result(index={self.index}, {outcome}, elapsed={self.elapsed:.3f} s)"
+
+
+async def launch_turbogrid_sessions_async(
+    count: int,
+    session_launcher: Callable[..., Awaitable[pyturbogrid_core.PyTurboGrid]] = None,
+    log_filename_suffix: str = "",
+    **launch_kwargs,
+) -> AsyncIterator[tg_launch_result]:
+    """Launch several TurboGrid sessions concurrently and yield them as they become ready.
+
+    A failed launch does not stop the others. It is yielded as a result carrying the error,
+    so that the caller can decide whether the sessions that did start are enough.
+
+    Parameters
+    ----------
+    count : int
+        Number of sessions to launch.
+    session_launcher : Callable[..., Awaitable[PyTurboGrid]], default: ``None``
+        Coroutine function that launches one session. The default is ``None``, in which case
+        ``launch_turbogrid_async`` is used.
+    log_filename_suffix : str, default: ""
+        Suffix for the log files. The index of each session is appended to it.
+    launch_kwargs
+        Arguments passed to ``session_launcher`` for every session.
+
+    Yields
+    ------
+    tg_launch_result
+        The outcome of each launch, in the order the launches finish.
+    """
+    import asyncio
+
+    if session_launcher is None:
+        session_launcher = launch_turbogrid_async
+
+    async def launch_one(index: int) -> tg_launch_result:
+        start = time.perf_counter()
+        try:
+            session = await session_launcher(
+                log_filename_suffix=f"{log_filename_suffix}_{index}", **launch_kwargs
+            )
+            return tg_launch_result(index, session, None, time.perf_counter() - start)
+        except Exception as e:
+            return tg_launch_result(index, None, e, time.perf_counter() - start)
+
+    tasks = [asyncio.ensure_future(launch_one(index)) for index in range(count)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # The caller stopped early, do not leave launches running unattended
+        for task in tasks:
+            task.cancel()
 
 
 def launch_turbogrid_ansys_labs(
@@ -252,17 +413,66 @@ def launch_turbogrid_container(
     license_file,
     keep_stopped_containers,
     container_env_dict,
+    ready_timeout: float = 60.0,
+    reuse_stopped_containers: bool = False,
+    shared_work_dir: shared_work_dir = None,
 ) -> deployed_tg_container:
+    """Launch TurboGrid in a new docker container.
+
+    With ``reuse_stopped_containers``, a stopped container left behind by an earlier launch
+    with the same image, command and environment is restarted instead, if there is one
+    whose ports are free. Docker cannot change the ports of an existing container, so a
+    restarted container keeps the ports it was created with. Containers launched in this
+    mode are stopped rather than removed when disposed of, so that they can be reused.
+
+    A new container runs an image prepared with ``image_cache.prepare_tg_image``, which pulls
+    it only if it is not on the host yet.
+
+    With ``shared_work_dir``, its directory is mounted in the container, so that files can be
+    exchanged with TurboGrid through it rather than over SSH. Only stopped containers with
+    the same mount are reused.
+    """
+    container_env_vars = ast.literal_eval(container_env_dict)
+    signature = get_tg_container_signature(
+        image_name,
+        cfxtg_command_name,
+        cfx_version,
+        license_file,
+        container_env_vars,
+        shared_work_dir.get_volumes() if shared_work_dir else None,
+    )
+    if reuse_stopped_containers:
+        keep_stopped_containers = True
+        for stopped_name, ftp_port, socket_port in find_stopped_tg_containers(signature):
+            tg_instance = _restart_tg_container(
+                stopped_name,
+                ftp_port,
+                socket_port,
+                cfxtg_command_name,
+                image_name,
+                container_name,
+                cfx_version,
+                license_file,
+                container_env_vars,
+                ready_timeout,
+                signature,
+                shared_work_dir,
+            )
+            if tg_instance:
+                return tg_instance
+
+    # Pulled here if missing rather than by each docker run, which would pull it silently
+    prepare_tg_image(image_name)
+
     # Generate a random integer with 10 digits
     random_number = random.randint(10**9, 10**10 - 1)
     container_name = container_name + str(random_number)
 
     # The path to cfxtg_command is standardized by the container, so just replace the command name.
     # This allows image developers to write custom cfxtg commands.
-    from ansys.turbogrid.core.launcher.container_helpers import get_open_port
-
-    ftp_port = get_open_port()
-    socket_port = get_open_port()
+    # The ports stay reserved until the container is disposed of.
+    port_reservation = get_port_allocator().reserve(2)
+    ftp_port, socket_port = port_reservation.ports
     cfxtg_command: str = cfxtg_command_name
     cfxtg_command = (
         f"./v{cfx_version}/TurboGrid/bin/{cfxtg_command} " f"-py -control-port {socket_port}"
@@ -276,6 +486,128 @@ def launch_turbogrid_container(
         license_file,
         container_name,
         keep_stopped_containers,
-        ast.literal_eval(container_env_dict),
+        container_env_vars,
+        ready_timeout,
+        port_reservation,
+        labels=_get_tg_container_labels(signature, ftp_port, socket_port),
+        shared_work_dir=shared_work_dir,
+    )
+    return tg_instance
+
+
+def _get_tg_container_labels(signature: str, ftp_port: int, socket_port: int) -> dict:
+    """Labels that let a stopped container be found and restarted later."""
+    return {
+        TG_CONTAINER_SIGNATURE_LABEL: signature,
+        TG_CONTAINER_FTP_PORT_LABEL: ftp_port,
+        TG_CONTAINER_SOCKET_PORT_LABEL: socket_port,
+    }
+
+
+def _restart_tg_container(
+    stopped_name,
+    ftp_port,
+    socket_port,
+    cfxtg_command_name,
+    image_name,
+    container_name,
+    cfx_version,
+    license_file,
+    container_env_vars,
+    ready_timeout,
+    signature,
+    shared_work_dir=None,
+) -> Optional[deployed_tg_container]:
+    """Claim and restart a stopped container. Returns ``None`` if it cannot be used."""
+    try:
+        port_reservation = get_port_allocator().reserve_ports([ftp_port, socket_port])
+    except OSError:
+        # Another session (or something else) is using the ports the container needs
+        return None
+    # Renaming claims the container, so that concurrent launches cannot restart it as well
+    container_name = container_name + str(random.randint(10**9, 10**10 - 1))
+    rename = subprocess.run(
+        f"{get_docker_prepend_command()} docker container rename {stopped_name} {container_name}",
+        shell=True,
+        capture_output=True,
+    )
+    if rename.returncode != 0:
+        port_reservation.release()
+        return None
+    tg_instance = deployed_tg_container(
+        image_name,
+        socket_port,
+        ftp_port,
+        f"./v{cfx_version}/TurboGrid/bin/{cfxtg_command_name} -py -control-port {socket_port}",
+        license_file,
+        container_name,
+        True,
+        container_env_vars,
+        ready_timeout,
+        port_reservation,
+        start=False,
+        labels=_get_tg_container_labels(signature, ftp_port, socket_port),
+        shared_work_dir=shared_work_dir,
+    )
+    try:
+        tg_instance.restart()
+    except (RuntimeError, TimeoutError) as e:
+        print(f"Unable to reuse container {stopped_name}, it will be removed: {e}")
+        tg_instance.keep_stopped_container = False
+        tg_instance.dispose()
+        return None
+    return tg_instance
+
+
+async def launch_turbogrid_container_async(
+    cfxtg_command_name,
+    image_name,
+    container_name,
+    cfx_version,
+    license_file,
+    keep_stopped_containers,
+    container_env_dict,
+    ready_timeout: float = 60.0,
+    shared_work_dir: shared_work_dir = None,
+) -> deployed_tg_container:
+    """Launch a TurboGrid container like ``launch_turbogrid_container``, without blocking.
+
+    Connect to the returned container with ``launch_turbogrid_async`` using the
+    ``TURBOGRID_RUNNING_CONTAINER`` location type and its ``socket_port``.
+    """
+    import asyncio
+
+    container_env_vars = ast.literal_eval(container_env_dict)
+    signature = get_tg_container_signature(
+        image_name,
+        cfxtg_command_name,
+        cfx_version,
+        license_file,
+        container_env_vars,
+        shared_work_dir.get_volumes() if shared_work_dir else None,
+    )
+    await asyncio.to_thread(prepare_tg_image, image_name)
+    random_number = random.randint(10**9, 10**10 - 1)
+    container_name = container_name + str(random_number)
+    port_reservation = get_port_allocator().reserve(2)
+    ftp_port, socket_port = port_reservation.ports
+    cfxtg_command = (
+        f"./v{cfx_version}/TurboGrid/bin/{cfxtg_command_name} " f"-py -control-port {socket_port}"
+    )
+    tg_instance = deployed_tg_container(
+        image_name,
+        socket_port,
+        ftp_port,
+        cfxtg_command,
+        license_file,
+        container_name,
+        keep_stopped_containers,
+        container_env_vars,
+        ready_timeout,
+        port_reservation,
+        start=False,
+        labels=_get_tg_container_labels(signature, ftp_port, socket_port),
+        shared_work_dir=shared_work_dir,
     )
+    await tg_instance.start_async()
     return tg_instance
@@ -0,0 +1,356 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-FileCopyrightText: 2023 ANSYS, Inc. All rights reserved
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Module for scheduling TurboGrid launches on the license seats available."""
+
+from collections import deque
+import os
+import re
+import subprocess
+import threading
+import time
+from typing import Any, Callable, Optional
+
+
+class license_seat_provider:
+    """
+    Source of the number of free license seats, for ``license_seat_scheduler``.
+
+    Subclasses implement ``available_seats``.
+    """
+
+    def available_seats(self) -> Optional[int]:
+        """Get the number of seats free on the license server, or ``None`` if it is unknown."""
+        raise NotImplementedError
+
+
+class local_seat_provider(license_seat_provider):
+    """
+    A license server with a fixed number of seats, kept in this process.
+
+    It stands in for a real server in tests: sessions take their seat with ``checkout``
+    and give it back with ``checkin``, as TurboGrid does with the license server.
+    """
+
+    seats: int
+    in_use: int
+
+    def __init__(self, seats: int):
+        self.seats = seats
+        self.in_use = 0
+        self._lock = threading.Lock()
+
+    def checkout(self) -> bool:
+        """Take a seat. Returns ``False`` if there is none free."""
+        with self._lock:
+            if self.in_use >= self.seats:
+                return False
+            self.in_use += 1
+            return True
+
+    def checkin(self):
+        """Give a seat back."""
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def available_seats(self) -> Optional[int]:
+        with self._lock:
+            return self.seats - self.in_use
+
+
+def parse_lmstat_seats(output: str, feature: str) -> Optional[int]:
+    """
+    Get the free seats of a feature from the output of ``lmutil lmstat -f <feature>``.
+
+    Returns ``None`` if the feature is not listed.
+    """
+    match = re.search(
+        rf"Users of {re.escape(feature)}:\s*\(Total of (\d+) licenses? issued;"
+        rf"\s*Total of (\d+) licenses? in use\)",
+        output,
+    )
+    if match is None:
+        return None
+    return int(match.group(1)) - int(match.group(2))
+
+
+class lmstat_seat_provider(license_seat_provider):
+    """Get the free seats of a license feature from the FlexNet server, with ``lmutil lmstat``."""
+
+    feature: str
+    lmutil_path: str
+    license_server: Optional[str]
+    timeout: float
+
+    def __init__(
+        self,
+        feature: str,
+        lmutil_path: str = "lmutil",
+        license_server: str = None,
+        timeout: float = 10.0,
+    ):
+        """
+        Parameters
+        ----------
+        feature : str
+            License feature the TurboGrid sessions use.
+        lmutil_path : str, default: ``"lmutil"``
+            Path to the ``lmutil`` command, which comes with the Ansys license manager.
+        license_server : str, default: ``None``
+            License server, as ``port@host``. The default is ``None``, in which case the
+            ``ANSYSLMD_LICENSE_FILE`` environment variable is used if it is set.
+        timeout : float, default: ``10.0``
+            Maximum number of seconds to wait for ``lmutil``.
+        """
+        self.feature = feature
+        self.lmutil_path = lmutil_path
+        self.license_server = license_server or os.environ.get("ANSYSLMD_LICENSE_FILE")
+        self.timeout = timeout
+
+    def available_seats(self) -> Optional[int]:
+        args = [self.lmutil_path, "lmstat", "-f", self.feature]
+        if self.license_server:
+            args += ["-c", self.license_server]
+        try:
+            result = subprocess.run(args, capture_output=True, text=True, timeout=self.timeout)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            print(f"lmstat_seat_provider exception on lmstat: {e}")
+            return None
+        return parse_lmstat_seats(result.stdout, self.feature)
+
+
+class seat_grant:
+    """A license seat given by ``license_seat_scheduler.acquire``, held until ``release``."""
+
+    waited: float
+    granted_at: float
+
+    def __init__(self, scheduler: "license_seat_scheduler", waited: float):
+        self.waited = waited
+        self.granted_at = time.monotonic()
+        self._scheduler = scheduler
+
+    @property
+    def released(self) -> bool:
+        """Whether the seat was released."""
+        return self._scheduler is None
+
+    def release(self):
+        """Release the seat, so that the next queued launch can have it. Releasing twice does nothing."""
+        scheduler, self._scheduler = self._scheduler, None
+        if scheduler is not None:
+            scheduler.__release__(self)
+
+    def __repr__(self):
+        state = "released" if self.released else "held"
+        return f"seat_grant({state}, waited={self.waited:.3f} s)"
+
+
+class license_seat_scheduler:
+    """
+    Queue TurboGrid launches until a license seat is free for them, rather than let them fail.
+
+    Launches are served in the order they were requested. Only the first one in the queue asks
+    the ``provider`` for free seats; while there is none, it asks again with an exponential
+    backoff, or as soon as a seat of this scheduler is released. Seats granted less than
+    ``settle_time`` seconds ago are assumed not to be taken on the server yet, and are not
+    given again meanwhile.
+    """
+
+    provider: license_seat_provider
+    max_seats: Optional[int]
+    settle_time: float
+    initial_backoff: float
+    max_backoff: float
+    timeout: Optional[float]
+
+    def __init__(
+        self,
+        provider: license_seat_provider,
+        max_seats: int = None,
+        settle_time: float = 10.0,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Parameters
+        ----------
+        provider : license_seat_provider
+            Source of the number of free seats, such as ``lmstat_seat_provider``.
+        max_seats : int, default: ``None``
+            Optional limit on the seats held through this scheduler at the same time.
+            It is the only limit when the provider does not know the free seats.
+        settle_time : float, default: ``10.0``
+            Seconds a launched session takes to check its seat out of the license server.
+        initial_backoff : float, default: ``0.5``
+            Seconds before the free seats are asked for again, doubled each time
+            up to ``max_backoff``.
+        max_backoff : float, default: ``30.0``
+            Maximum number of seconds between two requests to the provider.
+        timeout : float, default: ``None``
+            Maximum number of seconds a launch is queued, by default. The default is ``None``,
+            in which case launches wait as long as it takes.
+        """
+        self.provider = provider
+        self.max_seats = max_seats
+        self.settle_time = settle_time
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self._condition = threading.Condition()
+        self._queue = deque()
+        self._grants = []
+
+    @property
+    def held(self) -> int:
+        """Number of seats held through this scheduler."""
+        with self._condition:
+            return len(self._grants)
+
+    @property
+    def queued(self) -> int:
+        """Number of launches waiting for a seat."""
+        with self._condition:
+            return len(self._queue)
+
+    def acquire(self, timeout: float = None) -> seat_grant:
+        """
+        Wait in turn until a seat is free.
+
+        Parameters
+        ----------
+        timeout : float, default: ``None``
+            Maximum number of seconds to wait. The default is ``None``, in which case
+            the ``timeout`` of the scheduler is used.
+
+        Returns
+        -------
+        seat_grant
+            The seat, to release once the session is quit. Its ``waited`` is the time queued.
+
+        Raises
+        ------
+        TimeoutError
+            If no seat was free within the timeout.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+
+        def remaining() -> Optional[float]:
+            if timeout is None:
+                return None
+            left = timeout - (time.perf_counter() - start)
+            if left <= 0:
+                raise TimeoutError(
+                    f"No license seat became available within {timeout} s "
+                    f"({self.held} held, {self.queued - 1} queued behind)"
+                )
+            return left
+
+        turn = object()
+        with self._condition:
+            self._queue.append(turn)
+        try:
+            backoff = self.initial_backoff
+            while True:
+                with self._condition:
+                    while self._queue[0] is not turn:
+                        self._condition.wait(remaining())
+                # The provider may be slow to answer, so it is asked outside of the lock.
+                # Only the first launch in the queue asks, which keeps the order.
+                if self.__has_free_seat__():
+                    with self._condition:
+                        grant = seat_grant(self, time.perf_counter() - start)
+                        self._grants.append(grant)
+                        return grant
+                wait = backoff if timeout is None else min(backoff, remaining())
+                with self._condition:
+                    # Woken up early by a release
+                    self._condition.wait(wait)
+                backoff = min(2 * backoff, self.max_backoff)
+        finally:
+            with self._condition:
+                self._queue.remove(turn)
+                self._condition.notify_all()
+
+    def launch(self, start: Callable[[], Any], max_attempts: int = 3) -> tuple[Any, seat_grant]:
+        """
+        Run a launch once a seat is free for it, and queue it again if it fails.
+
+        A launch can fail when the seat was taken on the server by somebody else meanwhile,
+        so a failed launch gives its seat back and is retried after a backoff.
+
+        Parameters
+        ----------
+        start : Callable[[], Any]
+            Callable that launches the session.
+        max_attempts : int, default: ``3``
+            Number of times the launch is tried before its error is raised.
+
+        Returns
+        -------
+        tuple[Any, seat_grant]
+            The result of ``start``, and its seat. The ``waited`` of the seat includes the time
+            queued for the failed attempts.
+        """
+        waited = 0.0
+        backoff = self.initial_backoff
+        for attempt in range(1, max_attempts + 1):
+            grant = self.acquire()
+            waited += grant.waited
+            try:
+                result = start()
+            except Exception as e:
+                grant.release()
+                if attempt == max_attempts:
+                    raise
+                print(f"license_seat_scheduler launch attempt {attempt} failed, retrying: {e}")
+                time.sleep(backoff)
+                waited += backoff
+                backoff = min(2 * backoff, self.max_backoff)
+                continue
+            grant.waited = waited
+            return result, grant
+
+    def __has_free_seat__(self) -> bool:
+        """
+        :meta private:
+        """
+        with self._condition:
+            if self.max_seats is not None and len(self._grants) >= self.max_seats:
+                return False
+            now = time.monotonic()
+            settling = sum(1 for grant in self._grants if now - grant.granted_at < self.settle_time)
+        available = self.provider.available_seats()
+        return available is None or available - settling > 0
+
+    def __release__(self, grant: seat_grant):
+        """
+        :meta private:
+        """
+        with self._condition:
+            if grant in self._grants:
+                self._grants.remove(grant)
+            self._condition.notify_all()
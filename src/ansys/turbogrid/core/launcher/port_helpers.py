@@ -0,0 +1,300 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-FileCopyrightText: 2023 ANSYS, Inc. All rights reserved
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Module for reserving ports and waiting for TurboGrid to listen on them."""
+
+import inspect
+import platform
+import socket
+import subprocess
+import threading
+import time
+from typing import Awaitable, Callable, Iterable, Union
+
+# The TCP state code for a listening socket in /proc/net/tcp
+_TCP_LISTEN = "0A"
+
+
+def parse_listening_ports(proc_net_tcp: str) -> set[int]:
+    """
+    Get the listening ports from the contents of /proc/net/tcp (or tcp6).
+
+    The readiness checks look at the listening sockets instead of connecting to the ports,
+    because TurboGrid only accepts one client on its control port, and because docker
+    accepts connections on published ports before anything listens inside the container.
+    """
+    ports = set()
+    for line in proc_net_tcp.splitlines():
+        fields = line.split()
+        if len(fields) < 4 or fields[3] != _TCP_LISTEN or ":" not in fields[1]:
+            continue
+        ports.add(int(fields[1].rsplit(":", 1)[1], 16))
+    return ports
+
+
+def get_listening_ports() -> set[int]:
+    """Get the TCP ports that are listening on this machine."""
+    if platform.system() == "Linux":
+        ports = set()
+        for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+            try:
+                with open(table) as f:
+                    ports |= parse_listening_ports(f.read())
+            except FileNotFoundError:
+                pass
+        return ports
+    netstat = subprocess.run(["netstat", "-an"], capture_output=True, text=True).stdout
+    ports = set()
+    for line in netstat.splitlines():
+        fields = line.split()
+        if len(fields) >= 2 and ("LISTEN" in line.upper()) and ":" in fields[1]:
+            port = fields[1].rsplit(":", 1)[1]
+            if port.isdigit():
+                ports.add(int(port))
+        elif len(fields) >= 4 and "LISTEN" in line.upper() and "." in fields[3]:
+            # BSD style netstat prints addresses as host.port
+            port = fields[3].rsplit(".", 1)[1]
+            if port.isdigit():
+                ports.add(int(port))
+    return ports
+
+
+def wait_for_ports(
+    ports: Iterable[int],
+    listening_ports_getter: Callable[[], set[int]] = get_listening_ports,
+    deadline: float = 60.0,
+    initial_delay: float = 0.02,
+    max_delay: float = 1.0,
+    is_alive: Callable[[], bool] = None,
+) -> float:
+    """
+    Wait until all the given ports are listening.
+
+    Parameters
+    ----------
+    ports : Iterable[int]
+        Ports that must all be listening.
+    listening_ports_getter : Callable[[], set[int]], default: ``get_listening_ports``
+        Callable returning the currently listening ports, for example inside a container.
+    deadline : float, default: ``60.0``
+        Maximum number of seconds to wait.
+    initial_delay : float, default: ``0.02``
+        Delay before the second check. The delay doubles after each check.
+    max_delay : float, default: ``1.0``
+        Upper limit for the delay between checks.
+    is_alive : Callable[[], bool], default: ``None``
+        Optional callable that reports whether the process that should open the ports
+        is still running. Waiting stops as soon as it returns ``False``.
+
+    Returns
+    -------
+    float
+        Number of seconds it took for the ports to become ready.
+    """
+    ports = set(ports)
+    start = time.perf_counter()
+    delay = initial_delay
+    while True:
+        missing = ports - listening_ports_getter()
+        elapsed = time.perf_counter() - start
+        if not missing:
+            return elapsed
+        if is_alive and not is_alive():
+            raise RuntimeError(f"The process exited before ports {sorted(missing)} were ready")
+        if elapsed >= deadline:
+            raise TimeoutError(
+                f"Ports {sorted(missing)} were not ready within the {deadline} s deadline"
+            )
+        time.sleep(min(delay, deadline - elapsed))
+        delay = min(delay * 2, max_delay)
+
+
+async def wait_for_ports_async(
+    ports: Iterable[int],
+    listening_ports_getter: Callable[
+        [], Union[set[int], Awaitable[set[int]]]
+    ] = get_listening_ports,
+    deadline: float = 60.0,
+    initial_delay: float = 0.02,
+    max_delay: float = 1.0,
+    is_alive: Callable[[], bool] = None,
+) -> float:
+    """
+    Wait until all the given ports are listening, without blocking the event loop.
+
+    This is the ``asyncio`` counterpart of ``wait_for_ports`` and takes the same parameters.
+    ``listening_ports_getter`` may also be a coroutine function.
+    """
+    import asyncio
+
+    ports = set(ports)
+    start = time.perf_counter()
+    delay = initial_delay
+    while True:
+        listening = listening_ports_getter()
+        if inspect.isawaitable(listening):
+            listening = await listening
+        missing = ports - listening
+        elapsed = time.perf_counter() - start
+        if not missing:
+            return elapsed
+        if is_alive and not is_alive():
+            raise RuntimeError(f"The process exited before ports {sorted(missing)} were ready")
+        if elapsed >= deadline:
+            raise TimeoutError(
+                f"Ports {sorted(missing)} were not ready within the {deadline} s deadline"
+            )
+        await asyncio.sleep(min(delay, deadline - elapsed))
+        delay = min(delay * 2, max_delay)
+
+
+class port_reservation:
+    """
+    A set of ports handed out by a ``port_allocator``.
+
+    While the reservation is held, the ports are bound by this process so that the OS
+    does not hand them to anybody else. Call ``release_sockets`` right before the ports are
+    bound by their real owner (for example ``docker run``), and ``release`` once they are
+    no longer used.
+    """
+
+    ports: list[int]
+
+    def __init__(self, allocator, sockets: list[socket.socket]):
+        self._allocator = allocator
+        self._sockets = sockets
+        self.ports = [s.getsockname()[1] for s in sockets]
+
+    def __del__(self):
+        # A reservation that is dropped without being released must not keep its ports
+        # reserved for the rest of the process.
+        if getattr(self, "ports", None):
+            self.release()
+        elif getattr(self, "_sockets", None):
+            self.release_sockets()
+
+    def release_sockets(self):
+        """Let the OS bind the ports again. The ports stay reserved within this process."""
+        for s in self._sockets:
+            s.close()
+        self._sockets = []
+
+    def release(self):
+        """Give the ports back so that they can be handed out again."""
+        self.release_sockets()
+        self._allocator.release(self.ports)
+        self.ports = []
+
+
+class port_allocator:
+    """
+    Hand out free TCP ports without handing the same port out twice.
+
+    Ports are picked by the OS by binding port 0, and the bound sockets are kept open
+    until the reservation releases them, so that concurrent callers (in this or other
+    processes) cannot be handed the same port in the meantime.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reserved: set[int] = set()
+
+    def reserved_ports(self) -> set[int]:
+        """Get the ports that are currently reserved by this allocator."""
+        with self._lock:
+            return set(self._reserved)
+
+    def reserve(self, count: int = 1) -> port_reservation:
+        """
+        Reserve a number of free ports at once.
+
+        Parameters
+        ----------
+        count : int, default: ``1``
+            Number of ports to reserve.
+
+        Returns
+        -------
+        port_reservation
+            The reservation holding the ports.
+        """
+        sockets = []
+        # Ports that were reserved earlier and had their sockets released may be offered
+        # by the OS again, so keep those sockets bound until enough new ports are found.
+        rejected = []
+        with self._lock:
+            try:
+                while len(sockets) < count:
+                    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    # using '0' will tell the OS to pick a random port that is available.
+                    s.bind(("", 0))
+                    if s.getsockname()[1] in self._reserved:
+                        rejected.append(s)
+                    else:
+                        self._reserved.add(s.getsockname()[1])
+                        sockets.append(s)
+            except OSError:
+                for s in sockets:
+                    self._reserved.discard(s.getsockname()[1])
+                    s.close()
+                raise
+            finally:
+                for s in rejected:
+                    s.close()
+        return port_reservation(self, sockets)
+
+    def reserve_ports(self, ports: Iterable[int]) -> port_reservation:
+        """
+        Reserve the given ports, for example to bring back a container created with them.
+
+        Raises an ``OSError`` if any of the ports is reserved already or cannot be bound.
+        """
+        ports = list(ports)
+        sockets = []
+        with self._lock:
+            try:
+                for port in ports:
+                    if port in self._reserved:
+                        raise OSError(f"Port {port} is reserved already")
+                    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    sockets.append(s)
+                    s.bind(("", port))
+            except OSError:
+                for s in sockets:
+                    s.close()
+                raise
+            self._reserved.update(ports)
+        return port_reservation(self, sockets)
+
+    def release(self, ports: Iterable[int]):
+        """Give ports back so that they can be handed out again."""
+        with self._lock:
+            self._reserved.difference_update(ports)
+
+
+_port_allocator = port_allocator()
+
+
+def get_port_allocator() -> port_allocator:
+    """Get the port allocator shared by this process."""
+    return _port_allocator
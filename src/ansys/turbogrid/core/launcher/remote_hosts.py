@@ -0,0 +1,394 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-FileCopyrightText: 2023 ANSYS, Inc. All rights reserved
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Module for running TurboGrid sessions on the hosts of an inventory, reached over SSH."""
+
+from enum import IntEnum
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import threading
+import time
+from typing import Optional
+
+from ansys.turbogrid.core.launcher.port_helpers import (
+    get_listening_ports,
+    get_port_allocator,
+    parse_listening_ports,
+    wait_for_ports,
+)
+
+# Prints a free TCP port of the host it runs on
+_FREE_PORT_COMMAND = (
+    "python3 -c 'import socket; s = socket.socket(); s.bind((\"\", 0)); print(s.getsockname()[1])'"
+)
+
+
+class tg_host:
+    """
+    A host that TurboGrid sessions can be launched on.
+
+    Hosts without an ``ssh_port`` are this machine, and are used without SSH. Several of them,
+    with different working directories, stand in for separate hosts in tests. Remote hosts
+    need a POSIX shell, and are reached with ``fabric``.
+    """
+
+    name: str
+    address: str
+    ssh_port: Optional[int]
+    user: Optional[str]
+    key_filename: Optional[str]
+    cfxtg_path: str
+    working_directory: str
+    max_sessions: int
+
+    def __init__(
+        self,
+        name: str,
+        cfxtg_path: str,
+        working_directory: str,
+        address: str = "127.0.0.1",
+        ssh_port: Optional[int] = 22,
+        user: str = None,
+        key_filename: str = None,
+        max_sessions: int = 4,
+    ):
+        """
+        Parameters
+        ----------
+        name : str
+            Name of the host in the inventory.
+        cfxtg_path : str
+            Path to the ``cfxtg`` command on the host.
+        working_directory : str
+            Directory on the host that the sessions run in, and that their input files
+            are copied to.
+        address : str, default: ``"127.0.0.1"``
+            Address of the host, for SSH and for the TurboGrid control port.
+        ssh_port : int, default: ``22``
+            SSH port of the host. ``None`` for this machine, which is then used without SSH.
+        user : str, default: ``None``
+            SSH user. The default is ``None``, in which case the current user is used.
+        key_filename : str, default: ``None``
+            Optional SSH private key file.
+        max_sessions : int, default: ``4``
+            Number of sessions the host can run at the same time.
+        """
+        self.name = name
+        self.cfxtg_path = cfxtg_path
+        self.working_directory = working_directory
+        self.address = address
+        self.ssh_port = ssh_port
+        self.user = user
+        self.key_filename = key_filename
+        self.max_sessions = max_sessions
+
+    @property
+    def is_local(self) -> bool:
+        """Whether the host is this machine, used without SSH."""
+        return self.ssh_port is None
+
+    def connection(self):
+        """Open an SSH connection to the host, as a ``fabric.Connection``."""
+        from fabric import Connection
+
+        connect_kwargs = {"key_filename": self.key_filename} if self.key_filename else {}
+        return Connection(
+            host=self.address, user=self.user, port=self.ssh_port, connect_kwargs=connect_kwargs
+        )
+
+    def run(self, command: str) -> str:
+        """Run a shell command on the host, and return its output. Raises if it fails."""
+        if self.is_local:
+            return subprocess.run(
+                command, shell=True, check=True, capture_output=True, text=True
+            ).stdout
+        with self.connection() as connection:
+            return connection.run(command, hide=True).stdout
+
+    def get_free_port(self) -> int:
+        """
+        Get a TCP port that nothing listens on, on a remote host.
+
+        Ports of this machine are reserved with ``port_helpers.get_port_allocator`` instead.
+        """
+        return int(self.run(_FREE_PORT_COMMAND).strip())
+
+    def get_listening_ports(self) -> set[int]:
+        """Get the TCP ports that are listening on the host."""
+        if self.is_local:
+            return get_listening_ports()
+        return parse_listening_ports(self.run("cat /proc/net/tcp /proc/net/tcp6 2>/dev/null"))
+
+    def put_files(self, local_paths: list[str]) -> list[str]:
+        """Copy files to the working directory of the host, and return their paths there."""
+        remote_paths = [
+            f"{self.working_directory}/{os.path.basename(local_path)}" for local_path in local_paths
+        ]
+        if self.is_local:
+            os.makedirs(self.working_directory, exist_ok=True)
+            for local_path, remote_path in zip(local_paths, remote_paths):
+                shutil.copyfile(local_path, remote_path)
+            return remote_paths
+        with self.connection() as connection:
+            connection.run(f"mkdir -p {shlex.quote(self.working_directory)}", hide=True)
+            for local_path, remote_path in zip(local_paths, remote_paths):
+                connection.put(local=local_path, remote=remote_path)
+        return remote_paths
+
+    def get_files(self, remote_filenames: list[str], local_directory: str) -> list[str]:
+        """Copy files from the working directory of the host to a local directory."""
+        local_paths = [os.path.join(local_directory, filename) for filename in remote_filenames]
+        if self.is_local:
+            for filename, local_path in zip(remote_filenames, local_paths):
+                shutil.copyfile(os.path.join(self.working_directory, filename), local_path)
+            return local_paths
+        with self.connection() as connection:
+            for filename, local_path in zip(remote_filenames, local_paths):
+                connection.get(remote=f"{self.working_directory}/{filename}", local=local_path)
+        return local_paths
+
+    def __repr__(self):
+        where = "local" if self.is_local else f"{self.address}:{self.ssh_port}"
+        return f"tg_host({self.name}, {where})"
+
+
+class PlacementPolicy(IntEnum):
+    """How ``host_inventory`` chooses the host of a new session."""
+
+    #: Each host in turn, skipping the full ones.
+    ROUND_ROBIN = 0
+    #: The host with the lowest share of its ``max_sessions`` in use.
+    LEAST_LOADED = 1
+
+
+class host_inventory:
+    """
+    The hosts that TurboGrid sessions can be placed on, with the sessions placed on each one.
+
+    The load of a host is the number of sessions placed on it through this inventory
+    and not released yet.
+    """
+
+    hosts: list[tg_host]
+    policy: PlacementPolicy
+
+    def __init__(self, hosts: list[tg_host], policy: PlacementPolicy = PlacementPolicy.ROUND_ROBIN):
+        if not hosts:
+            raise ValueError("A host inventory needs at least one host")
+        if len({host.name for host in hosts}) != len(hosts):
+            raise ValueError(f"Host names must be unique: {[host.name for host in hosts]}")
+        self.hosts = list(hosts)
+        self.policy = policy
+        self._sessions = {host.name: 0 for host in hosts}
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def from_file(filename: str, policy: PlacementPolicy = None) -> "host_inventory":
+        """
+        Read an inventory from a json file.
+
+        The file holds a ``"hosts"`` list of objects with the parameters of ``tg_host``,
+        and optionally a ``"policy"``, ``"round_robin"`` or ``"least_loaded"``.
+        The ``policy`` parameter takes precedence over the file.
+        """
+        with open(filename) as f:
+            inventory = json.load(f)
+        if policy is None:
+            policy = PlacementPolicy[inventory.get("policy", "round_robin").upper()]
+        return host_inventory([tg_host(**host) for host in inventory["hosts"]], policy)
+
+    def place(self) -> tg_host:
+        """
+        Choose the host of a new session, and count the session on it.
+
+        Raises
+        ------
+        RuntimeError
+            If all the hosts run their ``max_sessions`` already.
+        """
+        with self._lock:
+            candidates = [
+                host for host in self.hosts if self._sessions[host.name] < host.max_sessions
+            ]
+            if not candidates:
+                raise RuntimeError(f"All the hosts are full: {self._sessions}")
+            if self.policy == PlacementPolicy.LEAST_LOADED:
+                host = min(
+                    candidates, key=lambda host: self._sessions[host.name] / host.max_sessions
+                )
+            else:
+                count = len(self.hosts)
+                order = [self.hosts[(self._next + i) % count] for i in range(count)]
+                host = next(host for host in order if host in candidates)
+                self._next = (self.hosts.index(host) + 1) % count
+            self._sessions[host.name] += 1
+            return host
+
+    def release(self, host: tg_host):
+        """Stop counting a session on a host."""
+        with self._lock:
+            self._sessions[host.name] = max(0, self._sessions[host.name] - 1)
+
+    def get_loads(self) -> dict[str, int]:
+        """Get the number of sessions placed on each host, by host name."""
+        with self._lock:
+            return dict(self._sessions)
+
+
+class remote_tg_process:
+    """
+    A TurboGrid process started on a host of an inventory, in its working directory.
+
+    TurboGrid is started in its own process group, so that it can be killed with everything
+    it started. The session connects to it as to a running container, on ``host.address``
+    and ``socket_port``.
+    """
+
+    host: tg_host
+    socket_port: int
+    pid: int
+    log_filename: str
+    ready_timeout: float
+    time_to_ready: float
+    disposed: bool = False
+
+    def __init__(
+        self,
+        inventory: host_inventory,
+        log_filename_suffix: str = "",
+        additional_kw_args: dict = None,
+        ready_timeout: float = 60.0,
+    ):
+        """
+        Place a TurboGrid process on a host of the inventory, start it, and wait until it listens.
+
+        Parameters
+        ----------
+        inventory : host_inventory
+            The hosts to choose from.
+        log_filename_suffix : str, default: ""
+            Suffix of ``TurboGridProcessLog{log_filename_suffix}.txt``, which receives the output
+            of ``cfxtg`` in the working directory of the host.
+        additional_kw_args : dict, default: ``None``
+            Additional arguments to send to TurboGrid.
+        ready_timeout : float, default: ``60.0``
+            Maximum number of seconds to wait for ``cfxtg`` to listen on its control port.
+        """
+        self._inventory = inventory
+        self.host = inventory.place()
+        self.ready_timeout = ready_timeout
+        self.log_filename = f"TurboGridProcessLog{log_filename_suffix}.txt"
+        self.socket_port = None
+        self.pid = None
+        self._proc = None
+        self._port_reservation = None
+        try:
+            if self.host.is_local:
+                # Kept reserved in this process until the TurboGrid process is disposed of
+                self._port_reservation = get_port_allocator().reserve(1)
+                self._port_reservation.release_sockets()
+                self.socket_port = self._port_reservation.ports[0]
+            else:
+                self.socket_port = self.host.get_free_port()
+            args = [self.host.cfxtg_path, "-py", "-control-port", str(self.socket_port)]
+            for key, val in (additional_kw_args or {}).items():
+                args += [f"-{key}", str(val)]
+            start = time.perf_counter()
+            self.pid = self.__spawn__(args)
+            wait_for_ports(
+                [self.socket_port],
+                self.host.get_listening_ports,
+                deadline=self.ready_timeout,
+                is_alive=self.is_alive,
+            )
+            self.time_to_ready = time.perf_counter() - start
+        except BaseException:
+            self.dispose()
+            raise
+        print(f"TG instance ready on {self.host.name} after {self.time_to_ready:.3f} s")
+
+    def is_alive(self) -> bool:
+        """Whether the TurboGrid process still runs."""
+        if self._proc is not None:
+            return self._proc.poll() is None
+        try:
+            self.host.run(f"kill -0 {self.pid}")
+        except Exception:
+            return False
+        return True
+
+    def dispose(self, wait: bool = True):
+        """Kill the TurboGrid process, if it still runs, and release its place on the host."""
+        if self.disposed:
+            return
+        self.disposed = True
+        try:
+            if self._proc is not None:
+                from ansys.turbogrid.core.launcher.session_shutdown import kill_process_tree
+
+                kill_process_tree(self._proc.pid)
+                if wait:
+                    self._proc.wait()
+            elif self.pid:
+                self.host.run(f"kill -KILL -- -{self.pid} 2>/dev/null; true")
+        except Exception as e:
+            print(f"{self} exception on dispose: {e}")
+        finally:
+            if self._port_reservation:
+                self._port_reservation.release()
+            self._inventory.release(self.host)
+
+    def __spawn__(self, args: list[str]) -> int:
+        """
+        :meta private:
+        """
+        if self.host.is_local:
+            os.makedirs(self.host.working_directory, exist_ok=True)
+            with open(os.path.join(self.host.working_directory, self.log_filename), "w") as log:
+                self._proc = subprocess.Popen(
+                    args,
+                    cwd=self.host.working_directory,
+                    stdout=log,
+                    stderr=subprocess.STDOUT,
+                    stdin=subprocess.DEVNULL,
+                    start_new_session=True,
+                )
+            return self._proc.pid
+        # Started in the background of a shell without job control, setsid does not fork,
+        # so the pid printed is the one of cfxtg, which leads its own process group
+        working_directory = shlex.quote(self.host.working_directory)
+        return int(
+            self.host.run(
+                f"mkdir -p {working_directory} && cd {working_directory} && "
+                f"setsid {shlex.join(args)} > {shlex.quote(self.log_filename)} 2>&1 "
+                f"< /dev/null & echo $!"
+            ).strip()
+        )
+
+    def __repr__(self):
+        return f"remote_tg_process({self.host.name}, port={self.socket_port})"
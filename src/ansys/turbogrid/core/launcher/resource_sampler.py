@@ -0,0 +1,263 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-FileCopyrightText: 2023 ANSYS, Inc. All rights reserved
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Module for sampling the resources used by the ``cfxtg`` process tree of a TurboGrid session."""
+
+from array import array
+import csv
+import io
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+from ansys.turbogrid.api.pyturbogrid_core import PyTurboGrid
+
+#: The values of each sample: the time (seconds since the epoch), the CPU time (seconds),
+#: the resident memory (bytes), the thread count, the bytes read from and written to storage,
+#: and the number of processes in the tree.
+RESOURCE_SAMPLE_FIELDS = (
+    "time",
+    "cpu_time",
+    "rss",
+    "threads",
+    "read_bytes",
+    "write_bytes",
+    "processes",
+)
+
+
+def parse_proc_stat(stat: str) -> tuple[int, int, int]:
+    """
+    Get the CPU ticks (including those of reaped children), thread count and resident pages
+    from the contents of a /proc/<pid>/stat file.
+    """
+    # The command name is in parentheses and may itself contain spaces or parentheses,
+    # so the fields are counted from the state, which is the third field.
+    fields = stat.rsplit(")", 1)[-1].split()
+    cpu_ticks = sum(int(tick) for tick in fields[11:15])
+    return cpu_ticks, int(fields[17]), int(fields[21])
+
+
+def parse_proc_io(proc_io: str) -> tuple[int, int]:
+    """Get the bytes read from and written to storage from the contents of a /proc/<pid>/io file."""
+    values = dict(line.split(":", 1) for line in proc_io.splitlines() if ":" in line)
+    return int(values.get("read_bytes", 0)), int(values.get("write_bytes", 0))
+
+
+def get_child_processes(pid: int) -> list[int]:
+    """Get the children of a process, from the children files of its threads."""
+    children = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError:
+        # The process exited meanwhile
+        pass
+    return children
+
+
+def read_process_tree_resources(pid: int) -> Optional[tuple[float, ...]]:
+    """
+    Read the resources used by a process and its descendants from /proc.
+
+    Returns the values listed in ``RESOURCE_SAMPLE_FIELDS``, or ``None`` if the process is gone.
+    The I/O counters of processes owned by other users cannot be read, and count as 0.
+    """
+    tree = [pid]
+    cpu_ticks = threads = rss_pages = read_bytes = write_bytes = processes = 0
+    for member in tree:
+        try:
+            with open(f"/proc/{member}/stat") as f:
+                stat = f.read()
+            # An exited process that has not been reaped yet is gone all the same
+            if member == pid and stat.rsplit(")", 1)[-1].split()[0] == "Z":
+                return None
+            member_ticks, member_threads, member_pages = parse_proc_stat(stat)
+        except (OSError, IndexError, ValueError):
+            if member == pid:
+                return None
+            continue
+        cpu_ticks += member_ticks
+        threads += member_threads
+        rss_pages += member_pages
+        processes += 1
+        try:
+            with open(f"/proc/{member}/io") as f:
+                member_read, member_written = parse_proc_io(f.read())
+            read_bytes += member_read
+            write_bytes += member_written
+        except (OSError, ValueError):
+            pass
+        tree.extend(get_child_processes(member))
+    return (
+        time.time(),
+        cpu_ticks / os.sysconf("SC_CLK_TCK"),
+        rss_pages * os.sysconf("SC_PAGE_SIZE"),
+        threads,
+        read_bytes,
+        write_bytes,
+        processes,
+    )
+
+
+class resource_sampler:
+    """
+    Sample the resources used by a process tree at a regular interval.
+
+    The samples are kept in a fixed size ring buffer of floats, so that a sampler can run
+    for the whole life of a session, and only the latest ``capacity`` samples are kept.
+    """
+
+    pid: int
+    interval: float
+    capacity: int
+
+    def __init__(self, pid: int, interval: float = 1.0, capacity: int = 3600):
+        """
+        Parameters
+        ----------
+        pid : int
+            Process at the root of the sampled tree, usually ``cfxtg``.
+        interval : float, default: ``1.0``
+            Seconds between samples.
+        capacity : int, default: ``3600``
+            Number of samples kept.
+        """
+        self.pid = pid
+        self.interval = interval
+        self.capacity = capacity
+        self._buffer = array("d", bytes(8 * capacity * len(RESOURCE_SAMPLE_FIELDS)))
+        self._count = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start sampling in a background thread, until the process exits or ``stop`` is called."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.__run__, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling."""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def sample(self) -> bool:
+        """Take one sample now. Returns ``False`` if the process is gone."""
+        values = read_process_tree_resources(self.pid)
+        if values is None:
+            return False
+        with self._lock:
+            offset = (self._count % self.capacity) * len(RESOURCE_SAMPLE_FIELDS)
+            self._buffer[offset : offset + len(RESOURCE_SAMPLE_FIELDS)] = array("d", values)
+            self._count += 1
+        return True
+
+    def clear(self):
+        """Forget the samples taken so far."""
+        with self._lock:
+            self._count = 0
+
+    def samples(self) -> list[dict[str, float]]:
+        """Get the samples kept, oldest first, as dictionaries keyed by ``RESOURCE_SAMPLE_FIELDS``."""
+        width = len(RESOURCE_SAMPLE_FIELDS)
+        with self._lock:
+            first = max(0, self._count - self.capacity)
+            rows = [
+                self._buffer[(i % self.capacity) * width : (i % self.capacity + 1) * width]
+                for i in range(first, self._count)
+            ]
+        return [dict(zip(RESOURCE_SAMPLE_FIELDS, row)) for row in rows]
+
+    def to_json(self) -> str:
+        """Get the samples as a JSON list."""
+        return json.dumps(self.samples())
+
+    def to_csv(self) -> str:
+        """Get the samples as CSV, with a header row."""
+        return resource_samples_to_csv({None: self.samples()})
+
+    def __run__(self):
+        """
+        :meta private:
+        """
+        while self.sample() and not self._stop.wait(self.interval):
+            pass
+
+
+def resource_samples_to_csv(samples: dict[Optional[str], list[dict[str, float]]]) -> str:
+    """
+    Write samples to CSV, with a header row.
+
+    ``samples`` maps names (such as blade row names) to samples. Unless the only name is ``None``,
+    the names are written in a first ``name`` column.
+    """
+    named = list(samples) != [None]
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow((["name"] if named else []) + list(RESOURCE_SAMPLE_FIELDS))
+    for name, rows in samples.items():
+        for row in rows:
+            writer.writerow(
+                ([name] if named else []) + [row[key] for key in RESOURCE_SAMPLE_FIELDS]
+            )
+    return output.getvalue()
+
+
+def export_resource_samples(samples: dict[str, list[dict[str, float]]], filename: str):
+    """Write samples, by name, to a ``.json`` or ``.csv`` file."""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".json":
+        content = json.dumps(samples, indent=1)
+    elif extension == ".csv":
+        content = resource_samples_to_csv(samples)
+    else:
+        raise ValueError(f"Resource samples can be exported to .json or .csv files, not {filename}")
+    with open(filename, "w", newline="") as f:
+        f.write(content)
+
+
+def attach_resource_sampler(
+    pytg: PyTurboGrid, interval: Optional[float] = 1.0, capacity: int = 3600
+) -> Optional[resource_sampler]:
+    """
+    Start sampling the ``cfxtg`` process tree of a session, as ``pytg.resource_sampler``.
+
+    Nothing is attached if ``interval`` is ``None`` or 0, if the session has no local process
+    (for example when TurboGrid runs in a container), or if there is no /proc file system.
+    """
+    engine_proc = getattr(pytg, "engine_proc", None)
+    if not interval or not engine_proc or not os.path.isdir(f"/proc/{engine_proc.pid}"):
+        pytg.resource_sampler = None
+        return None
+    pytg.resource_sampler = resource_sampler(engine_proc.pid, interval, capacity)
+    pytg.resource_sampler.start()
+    return pytg.resource_sampler
@@ -0,0 +1,378 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-FileCopyrightText: 2023 ANSYS, Inc. All rights reserved
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Module for keeping a pool of pre-launched TurboGrid sessions ready for use."""
+
+import atexit
+import concurrent.futures
+from contextlib import contextmanager
+import itertools
+import os
+import queue
+import tempfile
+import threading
+import time
+import traceback
+from typing import Callable, Optional
+
+from ansys.turbogrid.api.pyturbogrid_core import PyTurboGrid
+
+
+def is_session_alive(pytg: PyTurboGrid) -> bool:
+    """
+    Check whether a TurboGrid session is still usable.
+
+    A session is considered dead when it has been quit, when its ``cfxtg`` process
+    has exited, or when its message services have stopped.
+    """
+    if getattr(pytg, "already_exited", False):
+        return False
+    engine_proc = getattr(pytg, "engine_proc", None)
+    if engine_proc and engine_proc.poll() is not None:
+        return False
+    for service_name in ("read_message_process", "send_message_process"):
+        service = getattr(pytg, service_name, None)
+        if service and not service.is_alive():
+            return False
+    return True
+
+
+def capture_blank_state(pytg: PyTurboGrid, blank_state_filename: str) -> str:
+    """
+    Save the current (blank) state of a session so that it can be restored later.
+
+    Returns the CCL state of the session, which is used to verify later resets.
+    """
+    pytg.save_state(filename=blank_state_filename)
+    return pytg.get_state()
+
+
+def reset_session(pytg: PyTurboGrid, blank_state_filename: str, blank_ccl_state: str) -> bool:
+    """
+    Return a session to the blank state captured by ``capture_blank_state``.
+
+    Returns ``True`` if the session state matches the blank state after the reset.
+    """
+    pytg.read_state(filename=blank_state_filename)
+    return pytg.get_state() == blank_ccl_state
+
+
+_blank_state_ids = itertools.count()
+
+
+def get_blank_state_filename(state_directory: str = None) -> str:
+    """
+    Get a unique file name for the blank state of a session.
+
+    ``state_directory`` is the directory as seen by the TurboGrid engine. The default is ``None``,
+    in which case the system temporary directory is used.
+    """
+    state_directory = state_directory if state_directory else tempfile.gettempdir()
+    return os.path.join(
+        state_directory, f"pyturbogrid_blank_{os.getpid()}_{next(_blank_state_ids)}.tst"
+    ).replace("\\", "/")
+
+
+def recycle_session(pytg: PyTurboGrid, blank_state_filename: str, blank_ccl_state: str) -> bool:
+    """
+    Return a live session to the blank state captured by ``capture_blank_state``.
+
+    This lets a long-lived session take on another blade row or case instead of launching a
+    new one. Returns ``False`` if the session is dead, or if the reset fails or cannot be
+    verified, in which case the session must not be reused.
+    """
+    if not blank_state_filename or not is_session_alive(pytg):
+        return False
+    try:
+        if reset_session(pytg, blank_state_filename, blank_ccl_state):
+            return True
+        print(f"{pytg} could not be reset to a blank state")
+    except Exception as e:
+        print(f"{pytg} exception on reset: {e}")
+    return False
+
+
+class tg_session_pool:
+    """
+    Keep a number of pre-launched TurboGrid sessions ready to be checked out.
+
+    Sessions are launched in the background with ``launch_turbogrid`` (or ``session_factory``).
+    Checked-in sessions are reset to the blank state they had right after launch,
+    and sessions that die or fail to reset are replaced automatically.
+    """
+
+    size: int
+    session_factory: Callable[[], PyTurboGrid]
+    state_directory: str
+    health_check_interval: float
+    # Seconds a discarded session is given to quit before it is killed.
+    shutdown_timeout: float = 30.0
+
+    def __init__(
+        self,
+        size: int,
+        session_factory: Callable[[], PyTurboGrid] = None,
+        state_directory: str = None,
+        health_check_interval: float = 5.0,
+        **launch_kwargs,
+    ):
+        """
+        Initialize the pool and begin launching sessions in the background.
+
+        Parameters
+        ----------
+        size : int
+            Number of sessions to keep alive, whether idle or checked out.
+        session_factory : Callable[[], PyTurboGrid], default: ``None``
+            Callable that launches one session. The default is ``None``, in which case
+            ``launch_turbogrid`` is called with ``launch_kwargs``.
+        state_directory : str, default: ``None``
+            Directory, as seen by the TurboGrid engine, where the blank state files are written.
+            The default is ``None``, in which case the system temporary directory is used.
+        health_check_interval : float, default: ``5.0``
+            Seconds between background checks that replace dead idle sessions.
+        launch_kwargs
+            Arguments passed to ``launch_turbogrid`` when ``session_factory`` is not given.
+        """
+        if size < 1:
+            raise ValueError(f"The pool size must be at least 1, got {size}")
+        if session_factory is None:
+            from ansys.turbogrid.core.launcher.launcher import launch_turbogrid
+
+            def session_factory():
+                return launch_turbogrid(**launch_kwargs)
+
+        self.size = size
+        self.session_factory = session_factory
+        self.state_directory = state_directory if state_directory else tempfile.gettempdir()
+        self.health_check_interval = health_check_interval
+
+        self._idle: queue.Queue = queue.Queue()
+        self._blank_states: dict[int, tuple[str, str]] = {}
+        self._checked_out: set[int] = set()
+        self._pending = 0
+        # Idle sessions taken out of the queue by the health check, which still count
+        self._checking = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        # Notified whenever a session joins the idle ones, or the pool is closed
+        self._available = threading.Condition(self._lock)
+        self._session_ids = itertools.count()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=size)
+        self._stop_monitor = threading.Event()
+
+        self.refill()
+        self._monitor = threading.Thread(target=self.__monitor__, daemon=True)
+        self._monitor.start()
+        atexit.register(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def idle_count(self) -> int:
+        """Number of sessions that are ready to be checked out."""
+        return self._idle.qsize()
+
+    def checked_out_count(self) -> int:
+        """Number of sessions currently checked out."""
+        with self._lock:
+            return len(self._checked_out)
+
+    def checkout(self, timeout: Optional[float] = None) -> PyTurboGrid:
+        """
+        Take a ready session out of the pool.
+
+        Parameters
+        ----------
+        timeout : float, default: ``None``
+            Maximum number of seconds to wait for a session. The default is ``None``,
+            in which case this waits until a session is available.
+
+        Returns
+        -------
+        PyTurboGrid
+            A session in the blank state.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # The session is taken from the idle ones and counted as checked out in one go,
+            # so that a refill never finds it in neither and launches one too many
+            with self._available:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("The session pool has been closed")
+                    try:
+                        pytg = self._idle.get_nowait()
+                        break
+                    except queue.Empty:
+                        pass
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(
+                            f"No TurboGrid session became available within {timeout} s"
+                        )
+                    self._available.wait(remaining)
+                self._checked_out.add(id(pytg))
+            if is_session_alive(pytg):
+                return pytg
+            self.__discard__(pytg)
+            with self._lock:
+                self._checked_out.discard(id(pytg))
+            self.refill()
+
+    def checkin(self, pytg: PyTurboGrid):
+        """
+        Return a checked-out session to the pool.
+
+        The session is reset to its blank state. If it is dead, or the reset cannot be
+        verified, it is quit and a new session is launched in its place.
+        """
+        with self._lock:
+            if id(pytg) not in self._checked_out:
+                raise ValueError("The session was not checked out from this pool")
+
+        # The session counts as checked out until it is back with the idle ones or quit,
+        # so that a refill meanwhile does not replace it
+        if not self._closed and recycle_session(pytg, *self._blank_states[id(pytg)]):
+            with self._lock:
+                self._checked_out.discard(id(pytg))
+                self._idle.put(pytg)
+                self._available.notify()
+            return
+
+        self.__discard__(pytg)
+        with self._lock:
+            self._checked_out.discard(id(pytg))
+        self.refill()
+
+    @contextmanager
+    def session(self, timeout: Optional[float] = None):
+        """Check out a session for the duration of a ``with`` block."""
+        pytg = self.checkout(timeout)
+        try:
+            yield pytg
+        finally:
+            self.checkin(pytg)
+
+    def refill(self):
+        """Launch enough sessions in the background to bring the pool back up to its size."""
+        # Launches are submitted under the lock, so that ``close`` cannot shut the executor
+        # down in between and leave them counted as pending
+        with self._lock:
+            if self._closed:
+                return
+            missing = self.size - (
+                self._idle.qsize() + len(self._checked_out) + self._pending + self._checking
+            )
+            for i in range(missing):
+                self._executor.submit(self.__spawn__)
+                self._pending += 1
+
+    def close(self):
+        """Quit all idle sessions and stop launching new ones.
+
+        Sessions that are still checked out are quit when they are checked in.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._available.notify_all()
+        # Once closed, the exit handler must not keep the pool and its sessions alive
+        atexit.unregister(self.close)
+        self._stop_monitor.set()
+        self._executor.shutdown(wait=True)
+        while not self._idle.empty():
+            self.__discard__(self._idle.get())
+
+    def __spawn__(self):
+        """
+        :meta private:
+        """
+        pytg = None
+        try:
+            pytg = self.session_factory()
+            blank_state_filename = os.path.join(
+                self.state_directory,
+                f"pyturbogrid_pool_{os.getpid()}_{next(self._session_ids)}.tst",
+            ).replace("\\", "/")
+            blank_ccl_state = capture_blank_state(pytg, blank_state_filename)
+            self._blank_states[id(pytg)] = (blank_state_filename, blank_ccl_state)
+        except Exception as e:
+            print(f"tg_session_pool exception on __spawn__: {e}")
+            print(f"tg_session_pool traceback: {traceback.extract_tb(e.__traceback__)}")
+            if pytg:
+                self.__discard__(pytg)
+            pytg = None
+        finally:
+            # The session joins the idle ones as it stops being pending, so that a refill
+            # meanwhile does not count it out and launch another
+            with self._lock:
+                self._pending -= 1
+                closed = self._closed
+                if pytg and not closed:
+                    self._idle.put(pytg)
+                    self._available.notify()
+        if pytg and closed:
+            self.__discard__(pytg)
+
+    def __discard__(self, pytg: PyTurboGrid):
+        """
+        :meta private:
+        """
+        from ansys.turbogrid.core.launcher.session_shutdown import shutdown_session
+
+        blank_state = self._blank_states.pop(id(pytg), None)
+        # The pool is closed at exit, so a hung session must not be waited for indefinitely
+        shutdown_session(pytg, self.shutdown_timeout)
+        if blank_state and os.path.isfile(blank_state[0]):
+            os.remove(blank_state[0])
+
+    def __monitor__(self):
+        """
+        :meta private:
+        """
+        while not self._stop_monitor.wait(self.health_check_interval):
+            alive = []
+            while True:
+                with self._lock:
+                    try:
+                        pytg = self._idle.get_nowait()
+                    except queue.Empty:
+                        break
+                    self._checking += 1
+                if is_session_alive(pytg):
+                    alive.append(pytg)
+                else:
+                    self.__discard__(pytg)
+                    with self._lock:
+                        self._checking -= 1
+            with self._lock:
+                for pytg in alive:
+                    self._idle.put(pytg)
+                self._checking -= len(alive)
+                self._available.notify(len(alive))
+            self.refill()
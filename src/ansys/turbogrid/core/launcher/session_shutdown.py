@@ -0,0 +1,255 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-FileCopyrightText: 2023 ANSYS, Inc. All rights reserved
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Module for shutting TurboGrid sessions down within a deadline, forcefully if needed."""
+
+from enum import IntEnum
+import os
+import platform
+import signal
+import subprocess
+import threading
+import time
+from typing import Callable, Optional
+
+from ansys.turbogrid.api.pyturbogrid_core import PyTurboGrid
+
+from ansys.turbogrid.core.launcher.admission_control import release_session_resources
+from ansys.turbogrid.core.launcher.session_pool import is_session_alive
+
+
+class ShutdownOutcome(IntEnum):
+    """How a TurboGrid session ended."""
+
+    #: The session quit by itself within the deadline.
+    CLEAN = 0
+    #: The session did not quit within the deadline, and could not be killed.
+    TIMED_OUT = 1
+    #: The session did not quit within the deadline (or failed to), and was killed.
+    KILLED = 2
+    #: The session had died before the shutdown.
+    EXITED = 3
+
+
+class shutdown_report:
+    """The outcome of shutting down one TurboGrid session."""
+
+    outcome: ShutdownOutcome
+    elapsed: float
+    error: Optional[str]
+
+    def __init__(self, outcome: ShutdownOutcome, elapsed: float, error: Optional[str] = None):
+        self.outcome = outcome
+        self.elapsed = elapsed
+        self.error = error
+
+    def __repr__(self):
+        error = f", error={self.error!r}" if self.error else ""
+        return f"shutdown_report({self.outcome.name}, elapsed={self.elapsed:.3f}{error})"
+
+
+def parse_process_parents(proc_stats: dict[int, str]) -> dict[int, int]:
+    """Get the parent of each process from the contents of their /proc/<pid>/stat files."""
+    parents = {}
+    for pid, stat in proc_stats.items():
+        # The command name is in parentheses and may itself contain spaces or parentheses
+        fields = stat.rsplit(")", 1)[-1].split()
+        if len(fields) >= 2:
+            parents[pid] = int(fields[1])
+    return parents
+
+
+def get_process_tree(pid: int) -> list[int]:
+    """
+    Get a process and all its descendants, parents first.
+
+    The descendants are found in /proc, so on other systems only the process itself is returned.
+    """
+    proc_stats = {}
+    if platform.system() == "Linux":
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    proc_stats[int(entry)] = f.read()
+            except OSError:
+                # The process exited meanwhile
+                pass
+    children = {}
+    for child, parent in parse_process_parents(proc_stats).items():
+        children.setdefault(parent, []).append(child)
+    tree = [pid]
+    for parent in tree:
+        tree.extend(children.get(parent, []))
+    return tree
+
+
+def kill_process_tree(pid: int) -> list[int]:
+    """
+    Kill a process, its process group if it leads one, and all its descendants.
+
+    The descendants are looked up before anything is killed, because they are re-parented
+    (and cannot be found anymore) once their parent dies. Returns the processes signalled.
+    """
+    if platform.system() == "Windows":
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(pid)], capture_output=True)
+        return [pid]
+    tree = get_process_tree(pid)
+    try:
+        if os.getpgid(pid) == pid and os.getpgid(0) != pid:
+            os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        pass
+    killed = []
+    # Parents first, so that they cannot spawn replacements for their children
+    for member in tree:
+        try:
+            os.kill(member, signal.SIGKILL)
+            killed.append(member)
+        except OSError:
+            pass
+    return killed
+
+
+def shutdown_session(
+    pytg: PyTurboGrid,
+    timeout: Optional[float] = 30.0,
+    kill: Callable[[], None] = None,
+    reap_timeout: float = 5.0,
+) -> shutdown_report:
+    """
+    Quit a TurboGrid session, killing it if it does not quit within a deadline.
+
+    Parameters
+    ----------
+    pytg : PyTurboGrid
+        The session to shut down.
+    timeout : float, default: ``30.0``
+        Seconds the session is given to quit by itself. ``None`` waits as long as it takes.
+    kill : Callable[[], None], default: ``None``
+        Optional callable that kills a session without a local process, for example by
+        removing its container.
+    reap_timeout : float, default: ``5.0``
+        Seconds to wait for a killed process to be reaped.
+
+    Returns
+    -------
+    shutdown_report
+        Whether the session quit cleanly, timed out or was killed.
+        In all cases, the resources held by the session (see ``attach_session_resource``)
+        are released.
+    """
+    try:
+        start = time.perf_counter()
+        # engine_proc is not a process when TG was launched by somebody else
+        engine_proc = getattr(pytg, "engine_proc", None) or None
+        if getattr(pytg, "already_exited", False) and (
+            engine_proc is None or engine_proc.poll() is not None
+        ):
+            return shutdown_report(ShutdownOutcome.CLEAN, time.perf_counter() - start)
+
+        if is_session_alive(pytg):
+            errors = []
+
+            def quit_session():
+                try:
+                    pytg.quit()
+                except Exception as e:
+                    errors.append(e)
+
+            # The quit runs in a daemon thread, so that a hung one does not hold up Python's exit
+            quitter = threading.Thread(target=quit_session, daemon=True)
+            try:
+                quitter.start()
+            except RuntimeError as e:
+                # Recent Python versions do not start threads once they are shutting down, and an
+                # unbounded quit is what this avoids, so the session is killed straight away
+                error = str(e)
+            else:
+                quitter.join(timeout)
+                if not quitter.is_alive() and not errors:
+                    return shutdown_report(ShutdownOutcome.CLEAN, time.perf_counter() - start)
+                error = str(errors[0]) if errors else f"quit did not finish within {timeout} s"
+        else:
+            # A dead session is not quit, since quitting waits for an answer that never comes
+            error = "The session had died"
+            if engine_proc is None or engine_proc.poll() is not None:
+                pytg.already_exited = True
+                return shutdown_report(ShutdownOutcome.EXITED, time.perf_counter() - start, error)
+
+        # Later quit attempts, such as the one made when the session is deleted, must not wait
+        pytg.already_exited = True
+        if engine_proc is not None:
+            kill_process_tree(engine_proc.pid)
+            try:
+                engine_proc.wait(reap_timeout)
+            except subprocess.TimeoutExpired:
+                return shutdown_report(
+                    ShutdownOutcome.TIMED_OUT, time.perf_counter() - start, error
+                )
+        elif kill is not None:
+            try:
+                kill()
+            except Exception as e:
+                print(f"{pytg} exception on kill: {e}")
+                return shutdown_report(
+                    ShutdownOutcome.TIMED_OUT, time.perf_counter() - start, error
+                )
+        else:
+            return shutdown_report(ShutdownOutcome.TIMED_OUT, time.perf_counter() - start, error)
+        return shutdown_report(ShutdownOutcome.KILLED, time.perf_counter() - start, error)
+
+    finally:
+        # Whatever the outcome, the session no longer needs its launch slot and such
+        release_session_resources(pytg)
+
+
+def shutdown_concurrently(
+    shutdowns: dict[str, Callable[[], shutdown_report]]
+) -> dict[str, shutdown_report]:
+    """
+    Run shutdowns (such as calls to ``shutdown_session``) at the same time, and collect their reports.
+
+    Plain threads are used rather than an executor, because this also runs at exit,
+    when executors no longer accept work. Shutdowns that cannot get a thread are run in turn.
+    """
+    reports = {}
+
+    def run(name: str, shutdown: Callable[[], shutdown_report]):
+        try:
+            reports[name] = shutdown()
+        except Exception as e:
+            print(f"{name} exception on shutdown: {e}")
+
+    threads = []
+    for name, shutdown in shutdowns.items():
+        thread = threading.Thread(target=run, args=(name, shutdown), daemon=True)
+        try:
+            thread.start()
+            threads.append(thread)
+        except RuntimeError:
+            run(name, shutdown)
+    for thread in threads:
+        thread.join()
+    return {name: reports[name] for name in shutdowns if name in reports}
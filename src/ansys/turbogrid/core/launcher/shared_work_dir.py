@@ -0,0 +1,181 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-FileCopyrightText: 2023 ANSYS, Inc. All rights reserved
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+"""Module for sharing a working directory with the TurboGrid containers of this host."""
+
+import os
+import shutil
+import tempfile
+import threading
+from typing import Optional
+import uuid
+import warnings
+
+#: Where the shared working directory is mounted in the containers.
+SHARED_WORK_DIR_CONTAINER_PATH = "/pytg_work"
+
+
+def get_default_shared_work_dir() -> str:
+    """
+    Get the host directory shared with the TurboGrid containers by default.
+
+    The location can be changed with the ``PYTURBOGRID_SHARED_WORK_DIR`` environment variable.
+    """
+    return os.getenv("PYTURBOGRID_SHARED_WORK_DIR") or os.path.join(
+        tempfile.gettempdir(), "pyturbogrid_work"
+    )
+
+
+_remote_docker_warned = False
+
+
+def is_local_docker(warn: bool = False) -> bool:
+    """
+    Check whether docker runs its containers on this host.
+
+    A directory of this host can only be mounted in the containers of a local docker daemon.
+    ``DOCKER_HOST`` points the docker commands to another host, unless it is a local socket.
+    With ``warn``, a ``RuntimeWarning`` is issued, once per process, when it does not.
+    """
+    global _remote_docker_warned
+    docker_host = os.getenv("DOCKER_HOST", "")
+    if not docker_host or docker_host.startswith(("unix://", "npipe://")):
+        return True
+    if warn and not _remote_docker_warned:
+        _remote_docker_warned = True
+        warnings.warn(
+            f"Docker runs the containers on {docker_host}, which cannot mount a directory "
+            f"of this host, so files are copied to the containers over SSH instead",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+    return False
+
+
+class shared_work_dir:
+    """
+    Working directory of this host mounted in the TurboGrid containers launched here.
+
+    Files are put in the directory, where TG reads them through the mount, instead of being
+    transferred to each container over SSH. Files that TG writes there are read directly too.
+    The whole directory is mounted, so that containers stay interchangeable, but each
+    ``shared_work_dir`` keeps its files in a subdirectory of its own. Files of the same name
+    put by different users of the directory (for example two ``multi_blade_row`` objects,
+    or processes, meshing different models) therefore never replace each other.
+
+    Parameters
+    ----------
+    host_path : str, default: ``None``
+        Directory of this host. The default is ``None``, in which case
+        ``get_default_shared_work_dir`` is used.
+    container_path : str, default: ``SHARED_WORK_DIR_CONTAINER_PATH``
+        Where the directory is mounted in the containers.
+    subdirectory : str, default: ``None``
+        Name of the subdirectory of the files. The default is ``None``, in which case
+        a unique name is used.
+    """
+
+    host_path: str
+    container_path: str
+    subdirectory: str
+
+    def __init__(
+        self,
+        host_path: Optional[str] = None,
+        container_path: str = SHARED_WORK_DIR_CONTAINER_PATH,
+        subdirectory: Optional[str] = None,
+    ):
+        self.host_path = os.path.abspath(host_path if host_path else get_default_shared_work_dir())
+        self.container_path = container_path
+        self.subdirectory = subdirectory if subdirectory else uuid.uuid4().hex
+        os.makedirs(os.path.join(self.host_path, self.subdirectory), exist_ok=True)
+
+    def get_volumes(self) -> dict[str, str]:
+        """Get the volume to mount in a container, as host path: container path."""
+        return {self.host_path: self.container_path}
+
+    def get_container_path(self, filename: str) -> str:
+        """Get the path of a file of the subdirectory, as seen from the containers."""
+        return f"{self.container_path}/{self.subdirectory}/{filename}"
+
+    def get_host_path(self, filename: str) -> str:
+        """Get the path of a file of the subdirectory on this host."""
+        return os.path.join(self.host_path, self.subdirectory, filename)
+
+    def remove(self):
+        """Remove the subdirectory and its files. The shared directory itself is left."""
+        shutil.rmtree(os.path.join(self.host_path, self.subdirectory), ignore_errors=True)
+
+    def put_files(self, local_paths: list[str]) -> list[str]:
+        """
+        Put files in the subdirectory, and return their paths as seen from the containers.
+
+        A file that is in the subdirectory already, with the same size and modification time,
+        is not copied again. Files are copied rather than linked, so that TG writing a file of
+        the same name in the subdirectory never changes the original.
+        """
+        container_paths = []
+        for local_path in local_paths:
+            filename = os.path.basename(local_path)
+            host_path = self.get_host_path(filename)
+            if not self.__is_current__(local_path, host_path):
+                # Put under a temporary name and renamed, so that a container reading the
+                # file, or a concurrent put of the same file, never sees it half written
+                temp_path = f"{host_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                shutil.copy2(local_path, temp_path)
+                os.replace(temp_path, host_path)
+            container_paths.append(self.get_container_path(filename))
+        return container_paths
+
+    def get_files(self, filenames: list[str], local_directory: str) -> list[str]:
+        """Copy files from the subdirectory to a local directory, and return their local paths."""
+        local_paths = [os.path.join(local_directory, filename) for filename in filenames]
+        for filename, local_path in zip(filenames, local_paths):
+            host_path = self.get_host_path(filename)
+            if not os.path.isfile(host_path):
+                raise FileNotFoundError(
+                    f"{filename} was not written to the shared work directory {host_path}"
+                )
+            if not self.__is_current__(host_path, local_path):
+                shutil.copy2(host_path, local_path)
+        return local_paths
+
+    # Whether target is source, or a copy of it with the same size and modification time
+    @staticmethod
+    def __is_current__(source: str, target: str) -> bool:
+        """
+        :meta private:
+        """
+        try:
+            source_stat = os.stat(source)
+            target_stat = os.stat(target)
+        except OSError:
+            return False
+        return os.path.samestat(source_stat, target_stat) or (
+            source_stat.st_size == target_stat.st_size
+            and source_stat.st_mtime_ns == target_stat.st_mtime_ns
+        )
+
+    def __repr__(self):
+        return f"shared_work_dir({self.get_host_path('')} -> {self.get_container_path('')})"
@@ -38,15 +38,48 @@ import os
 from pathlib import Path, PurePath
 import queue
 import threading
-import time
 import traceback
 from typing import Optional, Tuple
 
 from ansys.turbogrid.api.pyturbogrid_core import PyTurboGrid
 
+from ansys.turbogrid.core.launcher.admission_control import (
+    admission_controller,
+    attach_session_resource,
+    release_session_resources,
+)
+from ansys.turbogrid.core.launcher.deploy_tg_container import (
+    deployed_tg_container,
+    dispose_tg_containers,
+)
+from ansys.turbogrid.core.launcher.discovery import discover_turbogrid_install
+from ansys.turbogrid.core.launcher.image_cache import prepare_tg_image
+from ansys.turbogrid.core.launcher.launch_scheduler import (
+    get_default_launch_scheduler,
+    staggered_launch_scheduler,
+)
+from ansys.turbogrid.core.launcher.launch_timings import LaunchPhase, launch_timings
 from ansys.turbogrid.core.launcher.launcher import launch_turbogrid, launch_turbogrid_container
+from ansys.turbogrid.core.launcher.license_seats import license_seat_scheduler
+from ansys.turbogrid.core.launcher.remote_hosts import host_inventory, remote_tg_process, tg_host
+from ansys.turbogrid.core.launcher.resource_sampler import export_resource_samples
+from ansys.turbogrid.core.launcher.session_pool import (
+    capture_blank_state,
+    get_blank_state_filename,
+    recycle_session,
+    tg_session_pool,
+)
+from ansys.turbogrid.core.launcher.session_shutdown import (
+    ShutdownOutcome,
+    shutdown_concurrently,
+    shutdown_report,
+    shutdown_session,
+)
+from ansys.turbogrid.core.launcher.shared_work_dir import is_local_docker, shared_work_dir
 from ansys.turbogrid.core.mesh_statistics import mesh_statistics
+from ansys.turbogrid.core.multi_blade_row.session_multiplexer import session_multiplexer
 from ansys.turbogrid.core.multi_blade_row.single_blade_row import single_blade_row
+from ansys.turbogrid.core.multi_blade_row.worker_watchdog import worker_watchdog
 import ansys.turbogrid.core.ndf_parser.ndf_parser as ndf_parser
 
 
@@ -89,6 +122,7 @@ class multi_blade_row:
     base_gsf: dict[str, float]
     turbogrid_location_type: PyTurboGrid.TurboGridLocationType
     tg_container_launch_settings: dict[str, str]
+    shared_work_dir: Optional[shared_work_dir] = None
     turbogrid_path: str
     ndf_base_path: str
     ndf_file_name: str
@@ -104,6 +138,37 @@ class multi_blade_row:
     pyturbogrid_saas_execution_control = None
     pyturbogrid_saas_port: int = None
 
+    # Optional pool of pre-launched sessions, used instead of launching TG for each blade row.
+    session_pool: tg_session_pool = None
+
+    # Optional watchdog that relaunches the blade rows whose TG died.
+    watchdog: worker_watchdog = None
+
+    # Whether the TG instances of the blade rows are reset and reused by the next init,
+    # rather than quit and launched again.
+    recycle_sessions: bool = False
+    # Sessions left by the previous init, reset to blank, as (pytg, container, blank state).
+    recycled_workers: queue.Queue = None
+
+    # Seconds each TG instance is given to quit before it is killed.
+    shutdown_timeout: float = 30.0
+    # How each TG instance ended in the last quit or quit_tg_workers, by blade row name.
+    shutdown_reports: dict[str, shutdown_report] = None
+
+    # Seconds between samples of the resources used by each TG instance, None to not sample.
+    resource_sample_interval: Optional[float] = 1.0
+
+    # Optional controller that queues the launches of TG instances until the host has room.
+    admission_control: admission_controller = None
+    # Optional scheduler that queues the launches of TG instances until a license seat is free.
+    license_scheduler: license_seat_scheduler = None
+    # Optional hosts that the TG instances of the blade rows are placed on, over SSH.
+    hosts: host_inventory = None
+    # Optional multiplexer serving all the blade rows from a few TG instances, by swapping states.
+    multiplexer: session_multiplexer = None
+    # Staggers the launches of the blade rows, and holds back the phases that cannot run together.
+    launch_scheduler: staggered_launch_scheduler = None
+
     cached_tginit_filename: str = None
     cached_tginit_geometry: Tuple[list[any], list[str], list[any], dict] = None
     # cached_tginit_show_3d_faces: bool = None
@@ -124,6 +189,16 @@ class multi_blade_row:
         log_prefix: str = "",
         log_level=PyTurboGrid.TurboGridLogLevel.INFO,
         saas_server: bool = True,
+        session_pool: tg_session_pool = None,
+        watchdog_interval: float = None,
+        recycle_sessions: bool = False,
+        shutdown_timeout: float = 30.0,
+        resource_sample_interval: Optional[float] = 1.0,
+        admission_control: admission_controller = None,
+        license_scheduler: license_seat_scheduler = None,
+        hosts: host_inventory = None,
+        multiplexed_sessions: int = None,
+        launch_scheduler: staggered_launch_scheduler = None,
     ):
         """
         Initialize the MBR object
@@ -133,32 +208,119 @@ class multi_blade_row:
         turbogrid_location_type : PyTurboGrid.TurboGridLocationType, default: ``TURBOGRID_INSTALL``
             For container/cloud operation, this can be changed. Generally only used by devs/github.
         tg_container_launch_settings : dict[str, str], default: ``{}``
-            For dev usage.
+            For dev usage. Its ``image_name`` is pulled when the MBR is created, if it is not
+            on the host yet (see ``image_cache.prepare_tg_image``). With ``shared_work_dir`` set to ``True``, or
+            to a directory, that directory is mounted in the containers and the files are
+            exchanged with them through it, rather than copied over SSH (see
+            ``shared_work_dir.shared_work_dir``). The files of the MBR, including the meshes
+            written by ``save_meshes``, are kept in a subdirectory of its own, which ``quit``
+            deletes, so copy the meshes out before quitting. The subdirectory is kept if
+            ``keep_shared_work_dir`` is ``True``, or if it is named with
+            ``shared_work_dir_subdirectory``. Files still go over SSH, with a warning, if docker
+            runs the containers on another host.
         turbogrid_path : str, default: ``None``
             Optional specifying for cfxtg path. Otherwise, launcher will attempt to find it automatically.
+        session_pool : tg_session_pool, default: ``None``
+            Optional pool of pre-launched sessions. When given (and TG is launched locally),
+            sessions are checked out of the pool instead of being launched, and checked back in on quit.
+        watchdog_interval : float, default: ``None``
+            Seconds between heartbeats of the blade row TG instances. A blade row whose TG dies is
+            relaunched, and its init source, size factors and ``set_br_state`` changes are replayed.
+            The default is ``None``, in which case the blade rows are not watched.
+        recycle_sessions : bool, default: ``False``
+            Whether initializing again (with ``init_from_tginit``, ``init_from_ndf``...) resets the
+            TG instances of the current blade rows to blank and reuses them, rather than launching
+            new ones. Reused instances keep the log files they were launched with. Each launch
+            then also saves the blank state of its instance to a temporary ``.tst`` file.
+        shutdown_timeout : float, default: ``30.0``
+            Seconds each TG instance is given to quit, by ``quit`` or ``quit_tg_workers``,
+            before its process tree (or container) is killed.
+        resource_sample_interval : float, default: ``1.0``
+            Seconds between samples of the CPU time, memory, threads and I/O of each TG instance
+            launched locally, as returned by ``get_resource_samples``. ``None`` or 0 disables it.
+        admission_control : admission_controller, default: ``None``
+            Optional controller shared by the processes of the host. Each TG instance (and its
+            container) is launched only once the controller admits it, so that launches are queued
+            rather than overcommit the memory and cores of the host. The slot is released when the
+            instance is quit. Sessions from a ``session_pool`` are not subject to it.
+        license_scheduler : license_seat_scheduler, default: ``None``
+            Optional scheduler of the license seats. The TG instances are then launched in turn
+            as seats become free, rather than fail when there are more blade rows than seats,
+            and a failed launch is queued again. The seat is released when the instance is quit.
+            The time each blade row was queued is returned by ``get_launch_wait_times``.
+        hosts : host_inventory, default: ``None``
+            Optional hosts to spread the blade rows over, with ``TURBOGRID_INSTALL``. The TG
+            instance of each blade row is started on the host chosen by the placement policy of
+            the inventory, over SSH, and ``init_from_tginit`` and ``init_from_tgmachine`` copy
+            the input files to the working directory of that host. The saas instance still runs
+            here.
+        multiplexed_sessions : int, default: ``None``
+            Optional number of TG instances serving all the blade rows, with ``TURBOGRID_INSTALL``
+            and neither a ``session_pool`` nor ``hosts``. Each blade row then has its state swapped
+            into one of the instances when it is used, the state of the least recently used blade
+            row being saved to a file to make room (see ``session_multiplexer``). This trades swap
+            time for memory and license seats when there are many blade rows. The instances are
+            kept by the next init, and the watchdog leaves them alone.
+        launch_scheduler : staggered_launch_scheduler, default: ``None``
+            Optional scheduler of the launches of the blade rows. They are all started
+            concurrently, a little apart, and only the phases that cannot run concurrently
+            (reading a tginit, which converts its ``.x_b`` file, on Linux) are run in turn.
+            The default is ``None``, in which case ``get_default_launch_scheduler`` is used.
         """
 
         self.turbogrid_location_type = turbogrid_location_type
+        self.session_pool = session_pool
+        self.recycle_sessions = recycle_sessions
+        self.shutdown_timeout = shutdown_timeout
+        self.resource_sample_interval = resource_sample_interval
+        self.admission_control = admission_control
+        self.license_scheduler = license_scheduler
+        self.hosts = hosts
+        self.launch_scheduler = (
+            launch_scheduler if launch_scheduler else get_default_launch_scheduler()
+        )
+        self.multiplexer = None
+        if (
+            multiplexed_sessions
+            and self.turbogrid_location_type == PyTurboGrid.TurboGridLocationType.TURBOGRID_INSTALL
+            and self.session_pool is None
+            and self.hosts is None
+        ):
+            self.multiplexer = session_multiplexer(
+                partial(self.__launch_multiplexed_session__, log_level),
+                multiplexed_sessions,
+                session_quitter=self.__quit_turbogrid__,
+            )
+        self.recycled_workers = queue.Queue()
         self.tg_container_launch_settings = tg_container_launch_settings
         self.turbogrid_path = turbogrid_path
+        if (
+            self.turbogrid_location_type == PyTurboGrid.TurboGridLocationType.TURBOGRID_INSTALL
+            and not self.session_pool
+        ):
+            # Resolve and validate the install once, before any worker is spawned
+            self.turbogrid_path = str(
+                discover_turbogrid_install(turbogrid_path=self.turbogrid_path).exe_path
+            )
+        elif (
+            self.turbogrid_location_type
+            == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
+            and tg_container_launch_settings.get("image_name")
+        ):
+            # Pull the image once, before any container is launched, so that the pull is not
+            # part of the launch of the saas instance or of any worker
+            prepare_tg_image(tg_container_launch_settings["image_name"])
+        self.shared_work_dir = self.__get_shared_work_dir__()
         self.tg_kw_args = tg_kw_args
         self.log_prefix = log_prefix
         if saas_server:
-            if (
-                self.turbogrid_location_type
-                == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
-            ):
-                self.pyturbogrid_saas_execution_control = launch_turbogrid_container(
-                    self.tg_container_launch_settings["cfxtg_command_name"],
-                    self.tg_container_launch_settings["image_name"],
-                    self.tg_container_launch_settings["container_name"],
-                    self.tg_container_launch_settings["cfx_version"],
-                    self.tg_container_launch_settings["license_file"],
-                    self.tg_container_launch_settings["keep_stopped_containers"],
-                    self.tg_container_launch_settings["container_env_dict"],
-                )
-                self.pyturbogrid_saas_port = self.pyturbogrid_saas_execution_control.socket_port
-            self.pyturbogrid_saas = launch_turbogrid(
+            # The saas instance reads the files the MBR is given, so it is not placed on a host
+            (
+                self.pyturbogrid_saas,
+                self.pyturbogrid_saas_execution_control,
+                _,
+            ) = self.__launch_session__(
+                placed=False,
                 log_level=log_level,
                 log_filename_suffix=self.log_prefix + "_saas",
                 turbogrid_path=self.turbogrid_path,
@@ -167,42 +329,103 @@ class multi_blade_row:
                 additional_kw_args=self.tg_kw_args,
                 # additional_args_str="-debug",
             )
+            if self.pyturbogrid_saas_execution_control:
+                self.pyturbogrid_saas_port = self.pyturbogrid_saas_execution_control.socket_port
         else:
             self.pyturbogrid_saas = None
             self.pyturbogrid_saas_execution_control = None
         # print(f"MBR self.pyturbogrid_saas {self.pyturbogrid_saas}")
         self.init_style = InitStyle.NO_INIT
+        if watchdog_interval:
+            self.watchdog = worker_watchdog(
+                lambda: self.tg_worker_instances,
+                interval=watchdog_interval,
+                dead_session_handler=self.__discard_dead_session__,
+            )
+            self.watchdog.start()
         atexit.register(self.quit)
 
     def __del__(self):
         self.quit()
 
-    def quit(self):
-        """This method will quit all TG instances."""
+    def quit(
+        self, wait_for_containers: bool = None, timeout: float = None
+    ) -> dict[str, shutdown_report]:
+        """
+        This method will quit all TG instances.
+
+        The instances are quit concurrently. Each one that does not quit within the timeout
+        is killed, together with its child processes, or has its container removed.
+
+        Parameters
+        ----------
+        wait_for_containers : bool, default: ``None``
+            Whether to wait for the TG containers to be stopped and removed. When ``False``,
+            the containers are disposed of in the background, even after Python exits.
+            The default is ``None``, in which case the ``wait_for_container_disposal`` entry of
+            the container launch settings is used if present, otherwise ``True``.
+        timeout : float, default: ``None``
+            Seconds each TG instance is given to quit. The default is ``None``, in which case
+            ``shutdown_timeout`` is used.
+
+        Returns
+        -------
+        dict[str, shutdown_report]
+            How each worker instance ended, by blade row name, the ``"saas"`` instance,
+            and the ``"multiplexed_<index>"`` instances.
+        """
         # debug printout for here and for container helpers
         # print(
         #     f"multi_blade_row quit self.tg_worker_instances {self.tg_worker_instances} self.pyturbogrid_saas {self.pyturbogrid_saas}"
         # )
-        self.quit_tg_workers()
-        if self.pyturbogrid_saas:
-            # print("pyturbogrid_saas.quit()")
-            self.pyturbogrid_saas.quit()
-            if self.pyturbogrid_saas_execution_control:
-                # print("del self.pyturbogrid_saas_execution_control")
-                del self.pyturbogrid_saas_execution_control
+        if self.watchdog:
+            self.watchdog.stop()
+        if wait_for_containers is None:
+            wait_for_containers = self.__container_launch_flag__(
+                "wait_for_container_disposal", True
+            )
+        containers = self.__quit_workers__(timeout, quit_saas=True)
+        containers += self.__quit_recycled_workers__(timeout)
+        self.__close_multiplexer__(timeout)
+        containers.append(self.pyturbogrid_saas_execution_control)
+        self.pyturbogrid_saas_execution_control = None
         self.pyturbogrid_saas = None
+        # All the containers are stopped and removed together rather than one by one
+        dispose_tg_containers(containers, wait_for_containers)
+        if self.shared_work_dir and not self.__keeps_shared_work_dir__():
+            self.shared_work_dir.remove()
+        return self.shutdown_reports
 
-    def quit_tg_workers(self):
-        if self.tg_worker_instances:
-            with concurrent.futures.ThreadPoolExecutor(
-                max_workers=len(self.tg_worker_instances)
-            ) as executor:
-                futures = [
-                    executor.submit(self.__quit__, val)
-                    for key, val in self.tg_worker_instances.items()
-                ]
-                concurrent.futures.wait(futures)
-        self.tg_worker_instances = None
+    def quit_tg_workers(
+        self, wait_for_containers: bool = True, timeout: float = None
+    ) -> dict[str, shutdown_report]:
+        """
+        Quit the TG worker instances, and dispose of their containers if there are any.
+        The watchdog, if there is one, is stopped until the next init.
+
+        The instances are quit concurrently. Each one that does not quit within the timeout
+        is killed, together with its child processes, or has its container removed.
+
+        Parameters
+        ----------
+        wait_for_containers : bool, default: ``True``
+            Whether to wait for the worker containers to be stopped and removed.
+        timeout : float, default: ``None``
+            Seconds each TG instance is given to quit. The default is ``None``, in which case
+            ``shutdown_timeout`` is used.
+
+        Returns
+        -------
+        dict[str, shutdown_report]
+            How each worker instance ended, by blade row name, and the ``"multiplexed_<index>"``
+            instances.
+        """
+        if self.watchdog:
+            self.watchdog.stop()
+        timeout = self.shutdown_timeout if timeout is None else timeout
+        dispose_tg_containers(self.__quit_workers__(timeout), wait_for_containers)
+        self.__close_multiplexer__(timeout)
+        return self.shutdown_reports
 
     def save_state(self) -> dict[str, any]:
         print("save_state", self.init_style)
@@ -234,22 +457,19 @@ class multi_blade_row:
 
         self.all_blade_row_keys = state_dict["Blade Rows"]
 
+        self.__recycle_workers__()
         self.tg_worker_instances = {key: single_blade_row() for key in self.all_blade_row_keys}
         self.base_gsf = state_dict["Base Size Factors"]
-        with concurrent.futures.ThreadPoolExecutor(
-            max_workers=len(self.tg_worker_instances)
-        ) as executor:
-            job = partial(
-                self.__launch_instances_state__,
-                tg_log_level,
-                state_dict["File Dict"],
-            )
-            futures = [
-                executor.submit(job, key, val) for key, val in self.tg_worker_instances.items()
-            ]
-            concurrent.futures.wait(futures)
+        job = partial(
+            self.__launch_instances_state__,
+            tg_log_level,
+            state_dict["File Dict"],
+        )
+        self.__run_launch_jobs__(job)
+        self.__set_launch_jobs__(job)
+        dispose_tg_containers(self.__quit_recycled_workers__(), wait=False)
+        self.__check_launches__()
 
-        # pprint.pprint(timings)
         self.init_style = InitStyle.TGInit
         self.tginit_path = state_dict["TGInit Path"]
 
@@ -285,77 +505,51 @@ class multi_blade_row:
             self.turbogrid_location_type
             == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
         ):
-            from ansys.turbogrid.core.launcher.container_helpers import container_helpers
-
-            container = container_helpers.get_container_connection(
-                self.pyturbogrid_saas_execution_control.ftp_port,
-                self.tg_container_launch_settings["ssh_key_filename"],
-            )
             print(f"transfer files to container {tginit_path}")
-            container_helpers.transfer_file_to_container(container, tginit_path)
+            tginit_read_path = self.__put_container_files__(
+                self.pyturbogrid_saas_execution_control, [tginit_path]
+            )[0]
+        else:
+            tginit_read_path = tginit_path
 
         selected_brs = (
             blade_rows_to_mesh
             if blade_rows_to_mesh
-            else self.get_blade_row_names_from_tginit(
-                tginit_name
-                if self.turbogrid_location_type
-                == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
-                else tginit_path
-            )
+            else self.get_blade_row_names_from_tginit(tginit_read_path)
         )
         self.all_blade_row_keys = selected_brs
 
-        timings = {}
+        self.__recycle_workers__()
         self.tg_worker_instances = {key: single_blade_row() for key in selected_brs}
         self.base_gsf = {key: 1.0 for key in selected_brs}
-        with concurrent.futures.ThreadPoolExecutor(
-            max_workers=len(self.tg_worker_instances)
-        ) as executor:
-            job = partial(
-                self.__launch_instances_blank__,
-                tginit_path,
-                tg_log_level,
-                self.log_prefix,
-                timings,
-            )
-            futures = [
-                executor.submit(job, key, val) for key, val in self.tg_worker_instances.items()
-            ]
-            concurrent.futures.wait(futures)
-
-        if os.getenv("TMM_PROFILING", "").lower() in ("1", "true", "yes", "on"):
-            print(f"init_blank_tginit: {timings}")
+        job = partial(
+            self.__launch_instances_blank__,
+            tginit_path,
+            tg_log_level,
+            self.log_prefix,
+        )
+        self.__run_launch_jobs__(job)
+        self.__set_launch_jobs__(job)
+        dispose_tg_containers(self.__quit_recycled_workers__(), wait=False)
+        self.__check_launches__()
 
     def read_tginit_into_blank(
         self,
         tginit_path: str,
         tg_log_level: PyTurboGrid.TurboGridLogLevel = PyTurboGrid.TurboGridLogLevel.INFO,
     ):
-        timings = {}
-        # There currently is a bug with TurboGrid on Linux, coming from WorkBench,
-        # when converting .x_b to .tin, which must happen. When this occurs in parallel,
-        # workbench often throws an error and the application behaves unpredictably.
-        # In that scenario, do __read_tginit__ in serial (max of 1 worker)
-        import platform
-
-        is_linux = platform.system() == "Linux"
+        # The reads are held back by the launch scheduler where they cannot run concurrently
         with concurrent.futures.ThreadPoolExecutor(
-            max_workers=1 if is_linux else len(self.tg_worker_instances)
+            max_workers=len(self.tg_worker_instances)
         ) as executor:
-            job = partial(
-                self.__read_tginit__,
-                tginit_path,
-                timings,
-            )
+            job = partial(self.__read_tginit__, tginit_path)
+            for key, val in self.tg_worker_instances.items():
+                val.record("init source", partial(self.__read_tginit__, tginit_path, key))
             futures = [
                 executor.submit(job, key, val) for key, val in self.tg_worker_instances.items()
             ]
             concurrent.futures.wait(futures)
 
-        if os.getenv("TMM_PROFILING", "").lower() in ("1", "true", "yes", "on"):
-            print(f"read_tginit_into_blank: {timings}")
-
         self.init_style = InitStyle.TGInit
         self.tginit_path = tginit_path
 
@@ -374,53 +568,34 @@ class multi_blade_row:
             self.turbogrid_location_type
             == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
         ):
-            from ansys.turbogrid.core.launcher.container_helpers import container_helpers
-
-            container = container_helpers.get_container_connection(
-                self.pyturbogrid_saas_execution_control.ftp_port,
-                self.tg_container_launch_settings["ssh_key_filename"],
-            )
             print(f"transfer files to container {tginit_path}")
-            container_helpers.transfer_file_to_container(container, tginit_path)
+            tginit_read_path = self.__put_container_files__(
+                self.pyturbogrid_saas_execution_control, [tginit_path]
+            )[0]
+        else:
+            tginit_read_path = tginit_path
 
         selected_brs = (
             blade_rows_to_mesh
             if blade_rows_to_mesh
-            else self.get_blade_row_names_from_tginit(
-                tginit_name
-                if self.turbogrid_location_type
-                == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
-                else tginit_path
-            )
+            else self.get_blade_row_names_from_tginit(tginit_read_path)
         )
         self.all_blade_row_keys = selected_brs
 
-        timings = {}
+        self.__recycle_workers__()
         self.tg_worker_instances = {key: single_blade_row() for key in selected_brs}
         self.base_gsf = {key: 1.0 for key in selected_brs}
-        # There currently is a bug with TurboGrid on Linux, coming from WorkBench,
-        # when converting .x_b to .tin, which must happen. When this occurs in parallel,
-        # workbench often throws an error and the application behaves unpredictably.
-        # In that scenario, do __read_tginit__ in serial (max of 1 worker)
-        import platform
-
-        is_linux = platform.system() == "Linux"
-        with concurrent.futures.ThreadPoolExecutor(
-            max_workers=1 if is_linux else len(self.tg_worker_instances)
-        ) as executor:
-            job = partial(
-                self.__launch_instances_tginit__,
-                tginit_path,
-                tg_log_level,
-                self.log_prefix,
-                timings,
-            )
-            futures = [
-                executor.submit(job, key, val) for key, val in self.tg_worker_instances.items()
-            ]
-            concurrent.futures.wait(futures)
+        job = partial(
+            self.__launch_instances_tginit__,
+            tginit_path,
+            tg_log_level,
+            self.log_prefix,
+        )
+        self.__run_launch_jobs__(job)
+        self.__set_launch_jobs__(job)
+        dispose_tg_containers(self.__quit_recycled_workers__(), wait=False)
+        self.__check_launches__()
 
-        # pprint.pprint(timings)
         self.init_style = InitStyle.TGInit
         self.tginit_path = tginit_path
 
@@ -460,17 +635,9 @@ class multi_blade_row:
                 self.turbogrid_location_type
                 == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
             ):
-                tg_execution_control = launch_turbogrid_container(
-                    self.tg_container_launch_settings["cfxtg_command_name"],
-                    self.tg_container_launch_settings["image_name"],
-                    self.tg_container_launch_settings["container_name"],
-                    self.tg_container_launch_settings["cfx_version"],
-                    self.tg_container_launch_settings["license_file"],
-                    self.tg_container_launch_settings["keep_stopped_containers"],
-                    self.tg_container_launch_settings["container_env_dict"],
-                )
+                tg_execution_control = self.__launch_container__()
                 tg_port = tg_execution_control.socket_port
-            pyturbogrid_instance = launch_turbogrid(
+            pyturbogrid_instance = self.__launch_turbogrid__(
                 log_level=tg_log_level,
                 log_filename_suffix="_" + ndf_name,
                 turbogrid_path=self.turbogrid_path,
@@ -481,29 +648,20 @@ class multi_blade_row:
                 self.turbogrid_location_type
                 == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
             ):
-                from ansys.turbogrid.core.launcher.container_helpers import container_helpers
-
                 pyturbogrid_instance.block_each_message = True
-                # print(
-                #     f"get_container_connection {tg_execution_control.ftp_port} {self.tg_container_launch_settings['ssh_key_filename']}"
-                # )
-                container = container_helpers.get_container_connection(
-                    tg_execution_control.ftp_port,
-                    self.tg_container_launch_settings["ssh_key_filename"],
-                )
                 # print(f"transfer files to container {ndf_path}")
-                container_helpers.transfer_files_to_container(
-                    container,
-                    self.ndf_base_path,
-                    [ndf_name],
+                # path and file name in the container
+                ndf_path = self.__put_container_files__(tg_execution_control, [ndf_path])[0]
+                # TG writes the tginit next to the ndf file, and the CAD file where it is told
+                cad_path = self.__container_file_path__(
+                    tg_execution_control, self.ndf_file_name + ".x_b"
                 )
-                # print(f"files transferred")
-                # full path and file name in the container
-                ndf_path = "/" + ndf_name
+            else:
+                cad_path = self.ndf_file_name + ".x_b"
 
             pyturbogrid_instance.read_ndf(
                 ndffilename=ndf_path,
-                cadfilename=self.ndf_file_name + ".x_b",
+                cadfilename=cad_path,
                 bladerow=self.all_blade_row_keys[0],
             )
 
@@ -512,33 +670,24 @@ class multi_blade_row:
                 == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
             ):
                 # print(f"Get file from container")
-                container_helpers.transfer_files_from_container(
-                    container,
-                    self.ndf_base_path,
+                self.__get_container_files__(
+                    tg_execution_control,
                     [self.ndf_file_name + ".x_b", self.ndf_file_name + ".tginit"],
+                    self.ndf_base_path,
                 )
                 # print(f"file transferred")
-            pyturbogrid_instance.quit()
+            self.__quit_turbogrid__(pyturbogrid_instance)
             if tg_execution_control:
                 del tg_execution_control
 
+        self.__recycle_workers__()
         self.tg_worker_instances = {key: single_blade_row() for key in self.all_blade_row_keys}
         self.base_gsf = {key: 1.0 for key in self.all_blade_row_keys}
-        # There currently is a bug with TurboGrid on Linux, coming from WorkBench,
-        # when converting .x_b to .tin, which must happen. When this occurs in parallel,
-        # workbench often throws an error and the application behaves unpredictably.
-        # In that scenario, do __read_tginit__ in serial (max of 1 worker)
-        import platform
-
-        is_linux = platform.system() == "Linux"
-        with concurrent.futures.ThreadPoolExecutor(
-            max_workers=1 if is_linux else len(self.tg_worker_instances)
-        ) as executor:
-            job = partial(self.__launch_instances__, self.ndf_file_name, tg_log_level)
-            futures = [
-                executor.submit(job, key, val) for key, val in self.tg_worker_instances.items()
-            ]
-            concurrent.futures.wait(futures)
+        job = partial(self.__launch_instances__, self.ndf_file_name, tg_log_level)
+        self.__run_launch_jobs__(job)
+        self.__set_launch_jobs__(job)
+        dispose_tg_containers(self.__quit_recycled_workers__(), wait=False)
+        self.__check_launches__()
 
     def init_from_tgmachine(
         self,
@@ -578,22 +727,20 @@ class multi_blade_row:
                     right_neighbor = os.path.splitext(right_neighbor)[0] + ".crv"
             self.neighbor_dict[self.all_blade_row_keys[i]] = [left_neighbor, right_neighbor]
         # print(f"   {self.neighbor_dict=}")
+        self.__recycle_workers__()
         self.tg_worker_instances = {key: single_blade_row() for key in self.all_blade_row_keys}
         self.base_gsf = {key: 1.0 for key in self.all_blade_row_keys}
-        with concurrent.futures.ThreadPoolExecutor(
-            max_workers=len(self.tg_worker_instances)
-        ) as executor:
-            job = partial(
-                self.__launch_instances_inf__,
-                tg_log_level,
-                os.path.split(tgmachine_path)[0],
-                self.neighbor_dict,
-                disable_lma,
-            )
-            futures = [
-                executor.submit(job, key, val) for key, val in self.tg_worker_instances.items()
-            ]
-            concurrent.futures.wait(futures)
+        job = partial(
+            self.__launch_instances_inf__,
+            tg_log_level,
+            os.path.split(tgmachine_path)[0],
+            self.neighbor_dict,
+            disable_lma,
+        )
+        self.__run_launch_jobs__(job)
+        self.__set_launch_jobs__(job)
+        dispose_tg_containers(self.__quit_recycled_workers__(), wait=False)
+        self.__check_launches__()
 
     def get_average_background_face_areas(self) -> dict:
         """
@@ -620,7 +767,7 @@ class multi_blade_row:
         Query the element count for each blade row.
         """
         return {
-            tg_worker_name: self.__get_ec__(tg_worker_instance)
+            tg_worker_name: self.__get_ec__(tg_worker_instance, tg_worker_name)
             for tg_worker_name, tg_worker_instance in self.tg_worker_instances.items()
         }
 
@@ -659,7 +806,9 @@ class multi_blade_row:
             )
         # print("set_global_size_factor ", size_factor)
         # print("  before vcount ", self.get_mesh_statistics()[blade_row_name]["Vertices"]["Count"])
-        self.tg_worker_instances[blade_row_name].pytg.set_global_size_factor(size_factor)
+        tg_worker_instance = self.tg_worker_instances[blade_row_name]
+        tg_worker_instance.record("size", partial(self.__apply_gsf__, size_factor))
+        self.__apply_gsf__(size_factor, tg_worker_instance)
         # print("  after vcount ", self.get_mesh_statistics()[blade_row_name]["Vertices"]["Count"])
 
     # Advanced use only
@@ -947,6 +1096,8 @@ class multi_blade_row:
         Write out the .def files representing the entire blade row.
         Blade rows that threw errors will not write meshes (check the logs.)
         The assembly can be opened directly in CFX-Pre (Meshes contain some topology.)
+        With a shared work directory, the containers write the files there, and their
+        paths on this host are returned. ``quit`` deletes them, so copy them out before.
 
         """
         # print(f"save_meshes")
@@ -1228,6 +1379,83 @@ class multi_blade_row:
                 tg_worker_errors[tg_worker_name].append(msg)
         return tg_worker_errors
 
+    def get_resource_samples(self, blade_row_name: str = None) -> dict[str, list[dict[str, float]]]:
+        """
+        Get the resources used over time by the TG instances of the blade rows.
+
+        Each sample holds the time, the CPU time in seconds, the resident memory in bytes,
+        the thread count, the bytes read and written, and the number of processes of the
+        ``cfxtg`` process tree. TG instances in containers are not sampled.
+
+        Parameters
+        ----------
+        blade_row_name : str, default: ``None``
+            Blade row to get the samples of. The default is ``None``, in which case the samples
+            of all blade rows are returned.
+
+        Returns
+        -------
+        dict[str, list[dict[str, float]]]
+            Samples by blade row name, oldest first.
+        """
+        tg_worker_instances = self.tg_worker_instances or {}
+        if blade_row_name is not None:
+            tg_worker_instances = {blade_row_name: tg_worker_instances[blade_row_name]}
+        samples = {}
+        for tg_worker_name, tg_worker_instance in tg_worker_instances.items():
+            sampler = getattr(getattr(tg_worker_instance, "pytg", None), "resource_sampler", None)
+            samples[tg_worker_name] = sampler.samples() if sampler else []
+        return samples
+
+    def export_resource_samples(self, filename: str, blade_row_name: str = None):
+        """
+        Write the resources used by the TG instances of the blade rows to a file.
+
+        Parameters
+        ----------
+        filename : str
+            A ``.json`` file, with the samples by blade row name, or a ``.csv`` file,
+            with a row per sample and the blade row name in the first column.
+        blade_row_name : str, default: ``None``
+            Blade row to write the samples of. The default is ``None``, for all blade rows.
+        """
+        export_resource_samples(self.get_resource_samples(blade_row_name), filename)
+
+    def get_launch_wait_times(self) -> dict[str, float]:
+        """
+        Get the seconds the TG instance of each blade row was queued before it was launched,
+        by the ``admission_control`` and the ``license_scheduler``.
+
+        Returns
+        -------
+        dict[str, float]
+            The time queued by blade row name. Reused instances were not queued.
+        """
+        return {
+            tg_worker_name: tg_worker_instance.launch_wait
+            for tg_worker_name, tg_worker_instance in (self.tg_worker_instances or {}).items()
+        }
+
+    def get_launch_timings(self) -> dict[str, launch_timings]:
+        """
+        Get the time the TG instance of each blade row spent in each phase of its launch
+        and init (see ``LaunchPhase``), down to well below a millisecond.
+
+        The timings are those of the latest ``init_from_*`` call. A reused instance has no
+        launch phases, only those of its init. ``read_tginit_into_blank`` adds to the timings
+        of ``init_blank_tginit``.
+
+        Returns
+        -------
+        dict[str, launch_timings]
+            The timings by blade row name. ``launch_timings.to_dict`` gives them in seconds
+            by phase name.
+        """
+        return {
+            tg_worker_name: tg_worker_instance.launch_timings
+            for tg_worker_name, tg_worker_instance in (self.tg_worker_instances or {}).items()
+        }
+
     # Parallel launch routine for uninitiatlized TG sessions.
     # Useful for then setting certain parameters upfront without waiting for the init to happen.
     # Still requires the TGInit name for log file naming. Currently there is no way to change the log file name in-process.
@@ -1236,7 +1464,6 @@ class multi_blade_row:
         tginit_file_path,
         tg_log_level,
         log_prefix,
-        timings,
         tg_worker_name,
         tg_worker_instance,
     ):
@@ -1244,129 +1471,89 @@ class multi_blade_row:
         :meta private:
         """
         try:
-            t0 = time.time()
             tginit_name = os.path.basename(tginit_file_path)
             tginit_path = os.path.dirname(tginit_file_path)
             tginit_file_name, tginit_file_extension = os.path.splitext(tginit_name)
-            tg_port = None
-            if (
-                self.turbogrid_location_type
-                == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
-            ):
-                tg_worker_instance.tg_execution_control = launch_turbogrid_container(
-                    self.tg_container_launch_settings["cfxtg_command_name"],
-                    self.tg_container_launch_settings["image_name"],
-                    self.tg_container_launch_settings["container_name"],
-                    self.tg_container_launch_settings["cfx_version"],
-                    self.tg_container_launch_settings["license_file"],
-                    self.tg_container_launch_settings["keep_stopped_containers"],
-                    self.tg_container_launch_settings["container_env_dict"],
-                )
-                tg_port = tg_worker_instance.tg_execution_control.socket_port
 
             # tginit_name = os.path.basename(tginit_file_path)
             # tginit_path = os.path.dirname(tginit_file_path)
             # tginit_file_name, tginit_file_extension = os.path.splitext(tginit_name)
 
-            t1 = time.time()
-            tg_worker_instance.pytg = launch_turbogrid(
+            self.__start_worker__(
+                tg_worker_instance,
                 log_level=tg_log_level,
                 log_filename_suffix=f"{log_prefix}_{tginit_file_name}_{tg_worker_name}",
                 additional_kw_args=self.tg_kw_args,
                 # additional_args_str="-debug",
                 turbogrid_path=self.turbogrid_path,
                 turbogrid_location_type=self.turbogrid_location_type,
-                port=tg_port,
             )
             # print(f"MBR WORKER {tg_worker_name} pyturbogrid {tg_worker_instance.pytg}")
 
-            t2 = time.time()
             tg_worker_instance.pytg.block_each_message = True
-
-            # timings[tg_worker_name + "t0t1"] = round(t1 - t0)
-            # timings[tg_worker_name + "t1t2"] = round(t2 - t1)
-            timings[tg_worker_name + "total"] = round(t2 - t0)
         except Exception as e:
             print(f"{tg_worker_instance} exception on __launch_instances_blank__: {e}")
             print(f"{tg_worker_instance} traceback: {traceback.extract_tb(e.__traceback__)}")
+            tg_worker_instance.launch_error = str(e)
 
     def __launch_instances__(self, ndf_file_name, tg_log_level, tg_worker_name, tg_worker_instance):
         """
         :meta private:
         """
         try:
-
-            tg_port = None
-            if (
-                self.turbogrid_location_type
-                == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
-            ):
-                tg_worker_instance.tg_execution_control = launch_turbogrid_container(
-                    self.tg_container_launch_settings["cfxtg_command_name"],
-                    self.tg_container_launch_settings["image_name"],
-                    self.tg_container_launch_settings["container_name"],
-                    self.tg_container_launch_settings["cfx_version"],
-                    self.tg_container_launch_settings["license_file"],
-                    self.tg_container_launch_settings["keep_stopped_containers"],
-                    self.tg_container_launch_settings["container_env_dict"],
-                )
-                tg_port = tg_worker_instance.tg_execution_control.socket_port
-            tg_worker_instance.pytg = launch_turbogrid(
+            self.__start_worker__(
+                tg_worker_instance,
                 log_level=tg_log_level,
                 log_filename_suffix=f"_{ndf_file_name}_{tg_worker_name}",
                 additional_kw_args=self.tg_kw_args,
                 turbogrid_path=self.turbogrid_path,
                 turbogrid_location_type=self.turbogrid_location_type,
-                port=tg_port,
             )
+            timings = tg_worker_instance.launch_timings
             tg_worker_instance.pytg.block_each_message = True
 
             if (
                 self.turbogrid_location_type
                 == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
             ):
-                from ansys.turbogrid.core.launcher.container_helpers import container_helpers
-
-                # print(
-                #     f"get_container_connection {tg_worker_instance.tg_execution_control.ftp_port} {self.tg_container_launch_settings['ssh_key_filename']}"
-                # )
-                container = container_helpers.get_container_connection(
-                    tg_worker_instance.tg_execution_control.ftp_port,
-                    self.tg_container_launch_settings["ssh_key_filename"],
+                with timings.phase(LaunchPhase.FILE_TRANSFER):
+                    # print(f"transfer files to container {ndf_file_name}")
+                    tginit_read_path = self.__put_container_files__(
+                        tg_worker_instance.tg_execution_control,
+                        [
+                            os.path.join(self.ndf_base_path, ndf_file_name + ".tginit"),
+                            os.path.join(self.ndf_base_path, ndf_file_name + ".x_b"),
+                        ],
+                    )[0]
+            else:
+                tginit_read_path = ndf_file_name + ".tginit"
+
+            with self.launch_scheduler.contended(LaunchPhase.READ), timings.phase(LaunchPhase.READ):
+                tg_worker_instance.pytg.read_tginit(path=tginit_read_path, bladerow=tg_worker_name)
+            with timings.phase(LaunchPhase.SETTINGS):
+                tg_worker_instance.pytg.set_obj_param(
+                    object="/GEOMETRY/INLET", param_val_pairs="Opening Mode = Fully extend"
                 )
-                # print(f"transfer files to container {ndf_file_name}")
-                container_helpers.transfer_files_to_container(
-                    container,
-                    self.ndf_base_path,
-                    [ndf_file_name + ".tginit", ndf_file_name + ".x_b"],
+                tg_worker_instance.pytg.set_obj_param(
+                    object="/GEOMETRY/OUTLET", param_val_pairs="Opening Mode = Fully extend"
                 )
-                # print(f"files transferred")
-
-            tg_worker_instance.pytg.read_tginit(
-                path=ndf_file_name + ".tginit", bladerow=tg_worker_name
-            )
-            tg_worker_instance.pytg.set_obj_param(
-                object="/GEOMETRY/INLET", param_val_pairs="Opening Mode = Fully extend"
-            )
-            tg_worker_instance.pytg.set_obj_param(
-                object="/GEOMETRY/OUTLET", param_val_pairs="Opening Mode = Fully extend"
-            )
             # tg_worker_instance.pytg.set_obj_param(
             #     object="/TOPOLOGY SET", param_val_pairs="ATM Stop After Main Layers=True"
             # )
-            tg_worker_instance.pytg.unsuspend(object="/TOPOLOGY SET")
+            with timings.phase(LaunchPhase.FIRST_MESH):
+                tg_worker_instance.pytg.unsuspend(object="/TOPOLOGY SET")
             # av_bg_face_area = tg_worker_instance.pytg.query_average_background_face_area()
             # print(f"{tg_worker_name=} {av_bg_face_area=}")
         except Exception as e:
             print(f"{tg_worker_instance} exception on __launch_instances__: {e}")
             print(f"{tg_worker_instance} traceback: {traceback.extract_tb(e.__traceback__)}")
+            tg_worker_instance.launch_error = str(e)
 
     def __launch_instances_tginit__(
         self,
         tginit_file_path,
         tg_log_level,
         log_prefix,
-        timings,
         tg_worker_name,
         tg_worker_instance,
     ):
@@ -1374,103 +1561,51 @@ class multi_blade_row:
         :meta private:
         """
         try:
-            t0 = time.time()
-
-            tg_port = None
-            if (
-                self.turbogrid_location_type
-                == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
-            ):
-                tg_worker_instance.tg_execution_control = launch_turbogrid_container(
-                    self.tg_container_launch_settings["cfxtg_command_name"],
-                    self.tg_container_launch_settings["image_name"],
-                    self.tg_container_launch_settings["container_name"],
-                    self.tg_container_launch_settings["cfx_version"],
-                    self.tg_container_launch_settings["license_file"],
-                    self.tg_container_launch_settings["keep_stopped_containers"],
-                    self.tg_container_launch_settings["container_env_dict"],
-                )
-                tg_port = tg_worker_instance.tg_execution_control.socket_port
-
             tginit_name = os.path.basename(tginit_file_path)
             tginit_path = os.path.dirname(tginit_file_path)
             tginit_file_name, tginit_file_extension = os.path.splitext(tginit_name)
 
-            t1 = time.time()
-            tg_worker_instance.pytg = launch_turbogrid(
+            self.__start_worker__(
+                tg_worker_instance,
                 log_level=tg_log_level,
                 log_filename_suffix=f"{log_prefix}_{tginit_file_name}_{tg_worker_name}",
                 additional_kw_args=self.tg_kw_args,
                 # additional_args_str="-debug",
                 turbogrid_path=self.turbogrid_path,
                 turbogrid_location_type=self.turbogrid_location_type,
-                port=tg_port,
             )
-            t2 = time.time()
+            timings = tg_worker_instance.launch_timings
             tg_worker_instance.pytg.block_each_message = True
 
-            if (
-                self.turbogrid_location_type
-                == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
-            ):
-                # print(
-                #     f"get_container_connection {tg_worker_instance.tg_execution_control.ftp_port} {self.tg_container_launch_settings['ssh_key_filename']}"
-                # )
-                from ansys.turbogrid.core.launcher.container_helpers import container_helpers
-
-                container = container_helpers.get_container_connection(
-                    tg_worker_instance.tg_execution_control.ftp_port,
-                    self.tg_container_launch_settings["ssh_key_filename"],
+            tginit_read_path = self.__transfer_tginit__(
+                tg_worker_instance, tginit_file_path, tginit_path, tginit_file_name
+            )
+
+            with timings.phase(LaunchPhase.SETTINGS):
+                tg_worker_instance.pytg.set_obj_param(
+                    object="/GEOMETRY/INLET", param_val_pairs="Opening Mode = Parametric"
                 )
-                # print(f"transfer files to container {tginit_file_name}")
-                container_helpers.transfer_files_to_container(
-                    container,
-                    tginit_path,
-                    [
-                        tginit_file_name + ".tginit",
-                        tginit_file_name + ".x_b",
-                    ],
+                tg_worker_instance.pytg.set_obj_param(
+                    object="/GEOMETRY/OUTLET", param_val_pairs="Opening Mode = Parametric"
+                )
+            with self.launch_scheduler.contended(LaunchPhase.READ), timings.phase(LaunchPhase.READ):
+                tg_worker_instance.pytg.read_tginit(
+                    path=tginit_read_path,
+                    bladerow=tg_worker_name,
+                    autoregions=True,
+                    includemesh=False,
                 )
-                # print(f"files transferred")
-
-            t3 = time.time()
-            tg_worker_instance.pytg.set_obj_param(
-                object="/GEOMETRY/INLET", param_val_pairs="Opening Mode = Parametric"
-            )
-            tg_worker_instance.pytg.set_obj_param(
-                object="/GEOMETRY/OUTLET", param_val_pairs="Opening Mode = Parametric"
-            )
-            t4 = time.time()
-            tg_worker_instance.pytg.read_tginit(
-                path=(
-                    tginit_file_path
-                    if self.turbogrid_location_type
-                    == PyTurboGrid.TurboGridLocationType.TURBOGRID_INSTALL
-                    else tginit_file_name
-                ),
-                bladerow=tg_worker_name,
-                autoregions=True,
-                includemesh=False,
-            )
-            t5 = time.time()
             # tg_worker_instance.pytg.set_obj_param(
             #     object="/TOPOLOGY SET", param_val_pairs="ATM Stop After Main Layers=True"
             # )
-            tg_worker_instance.pytg.unsuspend(object="/TOPOLOGY SET")
-            t6 = time.time()
+            with timings.phase(LaunchPhase.FIRST_MESH):
+                tg_worker_instance.pytg.unsuspend(object="/TOPOLOGY SET")
             # av_bg_face_area = tg_worker_instance.pytg.query_average_background_face_area()
             # print(f"{tg_worker_name=} {av_bg_face_area=}")
-            end_time = time.time()
-            timings[tg_worker_name + "t0t1"] = round(t1 - t0)
-            timings[tg_worker_name + "t1t2"] = round(t2 - t1)
-            timings[tg_worker_name + "t2t3"] = round(t3 - t2)
-            timings[tg_worker_name + "t3t4"] = round(t4 - t3)
-            timings[tg_worker_name + "t4t5"] = round(t5 - t4)
-            timings[tg_worker_name + "t5t6"] = round(t6 - t5)
-            timings[tg_worker_name + "total"] = round(t6 - t0)
         except Exception as e:
             print(f"{tg_worker_instance} exception on __launch_instances__: {e}")
             print(f"{tg_worker_instance} traceback: {traceback.extract_tb(e.__traceback__)}")
+            tg_worker_instance.launch_error = str(e)
 
     def __launch_instances_inf__(
         self,
@@ -1485,129 +1620,111 @@ class multi_blade_row:
         :meta private:
         """
         try:
-            tg_port = None
-            if (
-                self.turbogrid_location_type
-                == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
-            ):
-                tg_worker_instance.tg_execution_control = launch_turbogrid_container(
-                    self.tg_container_launch_settings["cfxtg_command_name"],
-                    self.tg_container_launch_settings["image_name"],
-                    self.tg_container_launch_settings["container_name"],
-                    self.tg_container_launch_settings["cfx_version"],
-                    self.tg_container_launch_settings["license_file"],
-                    self.tg_container_launch_settings["keep_stopped_containers"],
-                    self.tg_container_launch_settings["container_env_dict"],
-                )
-                tg_port = tg_worker_instance.tg_execution_control.socket_port
-                # print("tg_port", tg_port)
-
             # tg_worker_instance.pytg = launch_turbogrid(
             #     log_level=tg_log_level,
             #     log_filename_suffix=f"_{tg_worker_name}",
             #     additional_kw_args=self.tg_kw_args,
             # )
             inf_filename = os.path.join(base_dir, tg_worker_name)
-            tg_worker_instance.pytg = launch_turbogrid(
+            self.__start_worker__(
+                tg_worker_instance,
                 log_level=tg_log_level,
                 log_filename_suffix=f"_inf_{tg_worker_name}",
                 additional_kw_args=self.tg_kw_args,
                 turbogrid_path=self.turbogrid_path,
                 turbogrid_location_type=self.turbogrid_location_type,
-                port=tg_port,
             )
+            timings = tg_worker_instance.launch_timings
             tg_worker_instance.pytg.block_each_message = True
-            if (
-                self.turbogrid_location_type
-                == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
-            ):
-                # print(
-                #     f"get_container_connection {tg_worker_instance.tg_execution_control.ftp_port} {self.tg_container_launch_settings['ssh_key_filename']}"
-                # )
-                from ansys.turbogrid.core.launcher.container_helpers import container_helpers
-
-                container = container_helpers.get_container_connection(
-                    tg_worker_instance.tg_execution_control.ftp_port,
-                    self.tg_container_launch_settings["ssh_key_filename"],
-                )
-
-                # Read the INF file to get a list of all the curve files to transfer
-                from ansys.turbogrid.core.inf_parser.inf_parser import INFParser
-
-                contents = INFParser.get_inf_contents(inf_filename)
-                file_list = [inf_filename]
-                file_list.append(os.path.join(base_dir, contents["Hub Data File"]))
-                file_list.append(os.path.join(base_dir, contents["Shroud Data File"]))
-                file_list.append(os.path.join(base_dir, contents["Profile Data File"]))
-                # print(f"transfer files to container {file_list}")
-                # print(f"Directory listing of {base_dir} {os.listdir(base_dir)}")
-                container_helpers.transfer_files_to_container(
-                    container,
-                    "",
-                    file_list,
-                )
-                # print(f"files transferred")
-            if disable_lma:
-                tg_worker_instance.pytg.set_obj_param(
-                    "/GEOMETRY/MACHINE DATA",
-                    f"Turbo Transform Mesh Type = Block-structured",
-                )
-            tg_worker_instance.pytg.read_inf(
-                filename=(
-                    tg_worker_name
-                    if self.turbogrid_location_type
-                    == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
-                    else inf_filename
-                )
-            )
-            # tg_worker_instance.pytg.unsuspend(object="/GEOMETRY")
-            # If we want to use adjacent profiles to determine the hub/shroud limits for each blade row case,
-            # send the profile names and opening mode.
-            # In container mode, transfer the relevant profile as well.
-            if neighbor_dict[tg_worker_name][0]:
+            host = self.__worker_host__(tg_worker_instance)
+            with timings.phase(LaunchPhase.FILE_TRANSFER):
                 if (
                     self.turbogrid_location_type
                     == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
                 ):
-                    container_helpers.transfer_file_to_container(
-                        container, os.path.join(base_dir, neighbor_dict[tg_worker_name][0])
+                    # Read the INF file to get a list of all the curve files to transfer
+                    from ansys.turbogrid.core.inf_parser.inf_parser import INFParser
+
+                    contents = INFParser.get_inf_contents(inf_filename)
+                    file_list = [inf_filename]
+                    file_list.append(os.path.join(base_dir, contents["Hub Data File"]))
+                    file_list.append(os.path.join(base_dir, contents["Shroud Data File"]))
+                    file_list.append(os.path.join(base_dir, contents["Profile Data File"]))
+                    # In container mode, transfer the adjacent profiles as well.
+                    file_list += [
+                        os.path.join(base_dir, neighbor)
+                        for neighbor in neighbor_dict[tg_worker_name]
+                        if neighbor
+                    ]
+                    # print(f"transfer files to container {file_list}")
+                    # print(f"Directory listing of {base_dir} {os.listdir(base_dir)}")
+                    inf_filename = self.__put_container_files__(
+                        tg_worker_instance.tg_execution_control, file_list
+                    )[0]
+                    # print(f"files transferred")
+                if host is not None:
+                    # The INF file, its curve files and the neighbor profiles are read from copies
+                    # in the working directory of the host
+                    from ansys.turbogrid.core.inf_parser.inf_parser import INFParser
+
+                    contents = INFParser.get_inf_contents(inf_filename)
+                    neighbors = [neighbor for neighbor in neighbor_dict[tg_worker_name] if neighbor]
+                    inf_filename = host.put_files(
+                        [inf_filename]
+                        + [
+                            os.path.join(base_dir, name)
+                            for name in [
+                                contents["Hub Data File"],
+                                contents["Shroud Data File"],
+                                contents["Profile Data File"],
+                            ]
+                            + neighbors
+                        ]
+                    )[0]
+                    base_dir = host.working_directory
+            if disable_lma:
+                with timings.phase(LaunchPhase.SETTINGS):
+                    tg_worker_instance.pytg.set_obj_param(
+                        "/GEOMETRY/MACHINE DATA",
+                        f"Turbo Transform Mesh Type = Block-structured",
                     )
-
-                tg_worker_instance.pytg.set_obj_param(
-                    object="/GEOMETRY/INLET",
-                    param_val_pairs=f"Opening Mode = Adjacent blade, Input Filename = {neighbor_dict[tg_worker_name][0] if self.turbogrid_location_type == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER else os.path.join(base_dir, neighbor_dict[tg_worker_name][0])}",
-                )
-                tg_worker_instance.pytg.set_obj_param(
-                    object="/MESH DATA",
-                    param_val_pairs=f"Inlet Domain = Off",
-                )
-            else:
-                tg_worker_instance.pytg.set_obj_param(
-                    object="/GEOMETRY/INLET", param_val_pairs=f"Opening Mode = Fully extend"
-                )
-            if neighbor_dict[tg_worker_name][1]:
-                if (
-                    self.turbogrid_location_type
-                    == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
-                ):
-                    container_helpers.transfer_file_to_container(
-                        container, os.path.join(base_dir, neighbor_dict[tg_worker_name][1])
+            with timings.phase(LaunchPhase.READ):
+                tg_worker_instance.pytg.read_inf(filename=inf_filename)
+            # tg_worker_instance.pytg.unsuspend(object="/GEOMETRY")
+            # If we want to use adjacent profiles to determine the hub/shroud limits for each blade row case,
+            # send the profile names and opening mode.
+            with timings.phase(LaunchPhase.SETTINGS):
+                if neighbor_dict[tg_worker_name][0]:
+                    tg_worker_instance.pytg.set_obj_param(
+                        object="/GEOMETRY/INLET",
+                        param_val_pairs=f"Opening Mode = Adjacent blade, Input Filename = {self.__neighbor_path__(tg_worker_instance, host, base_dir, neighbor_dict[tg_worker_name][0])}",
                     )
-                tg_worker_instance.pytg.set_obj_param(
-                    object="/GEOMETRY/OUTLET",
-                    param_val_pairs=f"Opening Mode = Adjacent blade, Input Filename = {neighbor_dict[tg_worker_name][1] if self.turbogrid_location_type == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER else os.path.join(base_dir, neighbor_dict[tg_worker_name][1])}",
-                )
-                tg_worker_instance.pytg.set_obj_param(
-                    object="/MESH DATA",
-                    param_val_pairs=f"Outlet Domain = Off",
-                )
-            else:
-                tg_worker_instance.pytg.set_obj_param(
-                    object="/GEOMETRY/OUTLET", param_val_pairs=f"Opening Mode = Fully extend"
-                )
-            tg_worker_instance.pytg.unsuspend(object="/TOPOLOGY SET")
+                    tg_worker_instance.pytg.set_obj_param(
+                        object="/MESH DATA",
+                        param_val_pairs=f"Inlet Domain = Off",
+                    )
+                else:
+                    tg_worker_instance.pytg.set_obj_param(
+                        object="/GEOMETRY/INLET", param_val_pairs=f"Opening Mode = Fully extend"
+                    )
+                if neighbor_dict[tg_worker_name][1]:
+                    tg_worker_instance.pytg.set_obj_param(
+                        object="/GEOMETRY/OUTLET",
+                        param_val_pairs=f"Opening Mode = Adjacent blade, Input Filename = {self.__neighbor_path__(tg_worker_instance, host, base_dir, neighbor_dict[tg_worker_name][1])}",
+                    )
+                    tg_worker_instance.pytg.set_obj_param(
+                        object="/MESH DATA",
+                        param_val_pairs=f"Outlet Domain = Off",
+                    )
+                else:
+                    tg_worker_instance.pytg.set_obj_param(
+                        object="/GEOMETRY/OUTLET", param_val_pairs=f"Opening Mode = Fully extend"
+                    )
+            with timings.phase(LaunchPhase.FIRST_MESH):
+                tg_worker_instance.pytg.unsuspend(object="/TOPOLOGY SET")
         except Exception as e:
             print(f"{tg_worker_instance} exception on __launch_instances_inf__: {e}")
+            tg_worker_instance.launch_error = str(e)
 
     def __launch_instances_state__(
         self,
@@ -1620,82 +1737,105 @@ class multi_blade_row:
         :meta private:
         """
         try:
-            tg_worker_instance.pytg = launch_turbogrid(
+            self.__start_worker__(
+                tg_worker_instance,
                 log_level=tg_log_level,
                 log_filename_suffix=f"_{tg_worker_name}",
                 additional_kw_args=self.tg_kw_args,
             )
+            timings = tg_worker_instance.launch_timings
             tg_worker_instance.pytg.block_each_message = True
-            tg_worker_instance.pytg.read_state(filename=state_path_name_list[tg_worker_name])
-            tg_worker_instance.pytg.unsuspend(object="/TOPOLOGY SET")
+            with timings.phase(LaunchPhase.READ):
+                tg_worker_instance.pytg.read_state(filename=state_path_name_list[tg_worker_name])
+            with timings.phase(LaunchPhase.FIRST_MESH):
+                tg_worker_instance.pytg.unsuspend(object="/TOPOLOGY SET")
         except Exception as e:
             print(f"{tg_worker_instance} exception on __launch_instances_inf__: {e}")
             print(f"{tg_worker_instance} traceback: {traceback.extract_tb(e.__traceback__)}")
+            tg_worker_instance.launch_error = str(e)
 
     def __read_tginit__(
         self,
         tginit_file_path,
-        timings,
         tg_worker_name,
         tg_worker_instance,
     ):
         try:
-            t0 = time.time()
             tginit_name = os.path.basename(tginit_file_path)
             tginit_path = os.path.dirname(tginit_file_path)
             tginit_file_name, tginit_file_extension = os.path.splitext(tginit_name)
+            tginit_read_path = self.__transfer_tginit__(
+                tg_worker_instance, tginit_file_path, tginit_path, tginit_file_name
+            )
+            with (
+                self.launch_scheduler.contended(LaunchPhase.READ),
+                tg_worker_instance.launch_timings.phase(LaunchPhase.READ),
+            ):
+                tg_worker_instance.pytg.read_tginit(
+                    path=tginit_read_path,
+                    bladerow=tg_worker_name,
+                    autoregions=True,
+                    includemesh=False,
+                )
+        except Exception as e:
+            print(f"{tg_worker_instance} exception on __launch_instances__: {e}")
+            print(f"{tg_worker_instance} traceback: {traceback.extract_tb(e.__traceback__)}")
+
+    # Copies the tginit and its CAD file to where the TG of an SBR reads them (its container,
+    # or its host), and returns the path to read the tginit from.
+    def __transfer_tginit__(
+        self,
+        tg_worker_instance: single_blade_row,
+        tginit_file_path: str,
+        tginit_path: str,
+        tginit_file_name: str,
+    ) -> str:
+        """
+        :meta private:
+        """
+        with tg_worker_instance.launch_timings.phase(LaunchPhase.FILE_TRANSFER):
             if (
                 self.turbogrid_location_type
                 == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
             ):
-                # print(
-                #     f"get_container_connection {tg_worker_instance.tg_execution_control.ftp_port} {self.tg_container_launch_settings['ssh_key_filename']}"
-                # )
-                from ansys.turbogrid.core.launcher.container_helpers import container_helpers
-
-                container = container_helpers.get_container_connection(
-                    tg_worker_instance.tg_execution_control.ftp_port,
-                    self.tg_container_launch_settings["ssh_key_filename"],
-                )
                 # print(f"transfer files to container {tginit_file_name}")
-                container_helpers.transfer_files_to_container(
-                    container,
-                    tginit_path,
+                return self.__put_container_files__(
+                    tg_worker_instance.tg_execution_control,
                     [
-                        tginit_file_name + ".tginit",
-                        tginit_file_name + ".x_b",
+                        os.path.join(tginit_path, tginit_file_name + ".tginit"),
+                        os.path.join(tginit_path, tginit_file_name + ".x_b"),
                     ],
-                )
-                # print(f"files transferred")
-
-            t1 = time.time()
-            tg_worker_instance.pytg.read_tginit(
-                path=(
-                    tginit_file_path
-                    if self.turbogrid_location_type
-                    == PyTurboGrid.TurboGridLocationType.TURBOGRID_INSTALL
-                    else tginit_file_name
-                ),
-                bladerow=tg_worker_name,
-                autoregions=True,
-                includemesh=False,
-            )
-            t2 = time.time()
-            timings[tg_worker_name + "container"] = round(t1 - t0)
-            timings[tg_worker_name + "read_tginit"] = round(t2 - t1)
-            timings[tg_worker_name + "total"] = round(t2 - t0)
-        except Exception as e:
-            print(f"{tg_worker_instance} exception on __launch_instances__: {e}")
-            print(f"{tg_worker_instance} traceback: {traceback.extract_tb(e.__traceback__)}")
+                )[0]
+            if self.turbogrid_location_type != PyTurboGrid.TurboGridLocationType.TURBOGRID_INSTALL:
+                return tginit_file_name
+            return self.__route_files__(
+                tg_worker_instance,
+                [tginit_file_path, os.path.join(tginit_path, tginit_file_name + ".x_b")],
+            )[0]
 
     # Sets this TG's sf to self.base_gsf[tg_worker_name] * size_factor
     def __set_gsf__(self, size_factor, tg_worker_name, tg_worker_instance):
         """
         :meta private:
         """
-        tg_worker_instance.pytg.set_global_size_factor(self.base_gsf[tg_worker_name] * size_factor)
+        gsf = self.base_gsf[tg_worker_name] * size_factor
+        tg_worker_instance.record("size", partial(self.__apply_gsf__, gsf))
+        self.__apply_gsf__(gsf, tg_worker_instance)
+
+    def __apply_gsf__(self, gsf, tg_worker_instance):
+        """
+        :meta private:
+        """
+        tg_worker_instance.pytg.set_global_size_factor(gsf)
 
     def __set_tnc__(self, target_node_count, tg_worker_name, tg_worker_instance):
+        """
+        :meta private:
+        """
+        tg_worker_instance.record("size", partial(self.__apply_tnc__, target_node_count))
+        self.__apply_tnc__(target_node_count, tg_worker_instance)
+
+    def __apply_tnc__(self, target_node_count, tg_worker_instance):
         """
         :meta private:
         """
@@ -1706,15 +1846,18 @@ class multi_blade_row:
             f"Target Mesh Node Count = {int(target_node_count)}",
         )
 
-    def __get_ec__(self, tg_worker_instance) -> int:
+    def __get_ec__(self, tg_worker_instance, tg_worker_name: str = None) -> int:
         """
         :meta private:
         """
         ec = 0
         try:
             ec = int(tg_worker_instance.pytg.query_mesh_statistics()["Elements"]["Count"])
-        except:
-            pass
+        except Exception:
+            # If TG died, bring the blade row back (or wait for the watchdog to) and ask again
+            # rather than report no elements
+            if self.watchdog and self.watchdog.check_worker(tg_worker_name, tg_worker_instance):
+                return self.__get_ec__(tg_worker_instance, tg_worker_name)
         return ec
 
     def __get_turbo_domain_assembly__(
@@ -1774,6 +1917,13 @@ class multi_blade_row:
         file_name: str = tg_worker_name + "." + file_format
         if optional_prefix:
             file_name = optional_prefix + file_name
+        process = getattr(tg_worker_instance, "tg_execution_control", None)
+        work_dir = getattr(process, "shared_work_dir", None)
+        if work_dir:
+            tg_worker_instance.pytg.save_mesh(
+                work_dir.get_container_path(file_name), tg_worker_name
+            )
+            return work_dir.get_host_path(file_name)
         tg_worker_instance.pytg.save_mesh(file_name, tg_worker_name)
         return file_name
 
@@ -1788,11 +1938,517 @@ class multi_blade_row:
         tg_worker_instance.pytg.save_state(filename=file_name)
         return tg_worker_name, file_name
 
-    def __quit__(self, tg_worker_instance):
+    # Quits all the workers (and the saas instance) concurrently, each within the timeout,
+    # and returns their containers. How each one ended is kept in shutdown_reports.
+    def __quit_workers__(
+        self, timeout: float = None, quit_saas: bool = False
+    ) -> list[deployed_tg_container]:
+        """
+        :meta private:
+        """
+        timeout = self.shutdown_timeout if timeout is None else timeout
+        shutdowns = {
+            key: partial(self.__quit__, val, timeout)
+            for key, val in (self.tg_worker_instances or {}).items()
+        }
+        if quit_saas and self.pyturbogrid_saas:
+            shutdowns["saas"] = partial(
+                self.__quit_turbogrid__,
+                self.pyturbogrid_saas,
+                timeout,
+                self.pyturbogrid_saas_execution_control,
+            )
+        self.shutdown_reports = shutdown_concurrently(shutdowns)
+        containers = []
+        if self.tg_worker_instances:
+            containers = [
+                getattr(val, "tg_execution_control", None)
+                for val in self.tg_worker_instances.values()
+            ]
+        self.tg_worker_instances = None
+        return containers
+
+    # Runs a launch job for each SBR, all at once but staggered by the launch scheduler.
+    # Recycled and multiplexed sessions start nothing, so the jobs that get them are not delayed.
+    def __run_launch_jobs__(self, job):
+        """
+        :meta private:
+        """
+        count = len(self.tg_worker_instances)
+        ready = count if self.multiplexer is not None else self.recycled_workers.qsize()
+        delays = [0.0] * min(ready, count) + self.launch_scheduler.get_start_delays(
+            max(count - ready, 0)
+        )
+        with concurrent.futures.ThreadPoolExecutor(max_workers=count) as executor:
+            futures = [
+                executor.submit(self.launch_scheduler.delayed(job, delay), key, val)
+                for delay, (key, val) in zip(delays, self.tg_worker_instances.items())
+            ]
+            concurrent.futures.wait(futures)
+
+    # Remembers how each blade row was launched, so that the watchdog can relaunch it
+    def __set_launch_jobs__(self, job):
+        """
+        :meta private:
+        """
+        for key, val in self.tg_worker_instances.items():
+            val.launch_job = partial(job, key)
+
+    # A blade row without a TG instance cannot do anything, so it is an error straight away,
+    # unless the watchdog is running to relaunch it. The watchdog is started again for the
+    # new blade rows if quit_tg_workers stopped it.
+    def __check_launches__(self):
+        """
+        :meta private:
+        """
+        if self.watchdog is not None:
+            self.watchdog.start()
+            if self.watchdog.is_running():
+                return
+        failed = {
+            key: val.launch_error
+            for key, val in self.tg_worker_instances.items()
+            if getattr(val, "pytg", None) is None
+        }
+        if failed:
+            raise RuntimeError(f"TurboGrid could not be launched for the blade rows {failed}")
+
+    def __discard_dead_session__(self, pytg: PyTurboGrid):
         """
         :meta private:
         """
-        tg_worker_instance.pytg.quit()
+        # Dead sessions cannot be quit, but a pool needs to know it has to replace them
+        if self.__uses_session_pool__():
+            self.session_pool.checkin(pytg)
+        else:
+            release_session_resources(pytg)
+
+    def __quit__(self, tg_worker_instance, timeout: float = None) -> shutdown_report:
+        """
+        :meta private:
+        """
+        pytg = getattr(tg_worker_instance, "pytg", None)
+        if pytg is None:
+            # The worker failed to launch, or was given up on by the watchdog
+            report = shutdown_report(ShutdownOutcome.EXITED, 0.0, "The worker has no session")
+        else:
+            report = self.__quit_turbogrid__(
+                pytg, timeout, getattr(tg_worker_instance, "tg_execution_control", None)
+            )
+        self.__forget_blank_state__(tg_worker_instance.blank_state)
+        return report
+
+    # Gives an SBR a TG session: one recycled from the previous init if there is one left,
+    # otherwise a newly launched one (in a new container, if TG runs in containers).
+    def __start_worker__(self, tg_worker_instance: single_blade_row, **launch_kwargs):
+        """
+        :meta private:
+        """
+        tg_worker_instance.launch_error = None
+        # A recycled session has no launch phases, only those of its init
+        tg_worker_instance.launch_timings = launch_timings()
+        if self.multiplexer is not None:
+            # The blade row starts blank in whichever session it is swapped into first
+            tg_worker_instance.pytg = self.multiplexer.session(tg_worker_instance)
+            tg_worker_instance.tg_execution_control = None
+            tg_worker_instance.launch_wait = 0.0
+            return
+        try:
+            pytg, container, blank_state = self.recycled_workers.get_nowait()
+        except queue.Empty:
+            pass
+        else:
+            tg_worker_instance.pytg = pytg
+            tg_worker_instance.tg_execution_control = container
+            tg_worker_instance.blank_state = blank_state
+            tg_worker_instance.launch_wait = 0.0
+            # The resources used for the previous blade row do not belong to this one
+            if getattr(pytg, "resource_sampler", None):
+                pytg.resource_sampler.clear()
+            return
+        # A relaunched SBR gets a new blank state
+        self.__forget_blank_state__(tg_worker_instance.blank_state)
+        tg_worker_instance.blank_state = None
+        (
+            tg_worker_instance.pytg,
+            tg_worker_instance.tg_execution_control,
+            tg_worker_instance.launch_wait,
+        ) = self.__launch_session__(timings=tg_worker_instance.launch_timings, **launch_kwargs)
+        tg_worker_instance.pytg.block_each_message = True
+        # Pooled sessions are recycled by the pool instead
+        if self.recycle_sessions and not self.__uses_session_pool__():
+            # TG in a container, or on a host of the inventory, writes the blank state there
+            blank_state_filename = get_blank_state_filename(
+                "/tmp"
+                if self.turbogrid_location_type
+                == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
+                or self.__worker_host__(tg_worker_instance) is not None
+                else None
+            )
+            try:
+                tg_worker_instance.blank_state = (
+                    blank_state_filename,
+                    capture_blank_state(tg_worker_instance.pytg, blank_state_filename),
+                )
+            except Exception as e:
+                print(f"{tg_worker_instance} exception on capture_blank_state: {e}")
+
+    # Resets the TG sessions of the current SBRs to blank, so that the next init reuses them.
+    # Sessions that cannot be recycled are quit.
+    def __recycle_workers__(self):
+        """
+        :meta private:
+        """
+        if not self.tg_worker_instances:
+            return
+        if not self.recycle_sessions or self.__uses_session_pool__():
+            dispose_tg_containers(self.__quit_workers__(), wait=False)
+            return
+        tg_worker_instances = self.tg_worker_instances
+        # Stop watching the SBRs being recycled, so that none of them is relaunched meanwhile
+        self.tg_worker_instances = None
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=len(tg_worker_instances)
+        ) as executor:
+            futures = [
+                executor.submit(self.__recycle_worker__, val)
+                for val in tg_worker_instances.values()
+            ]
+            concurrent.futures.wait(futures)
+        dispose_tg_containers([future.result() for future in futures], wait=False)
+
+    def __recycle_worker__(self, tg_worker_instance: single_blade_row) -> deployed_tg_container:
+        """
+        :meta private:
+        """
+        pytg = getattr(tg_worker_instance, "pytg", None)
+        container = getattr(tg_worker_instance, "tg_execution_control", None)
+        blank_state = tg_worker_instance.blank_state
+        if pytg is not None and blank_state and recycle_session(pytg, *blank_state):
+            self.recycled_workers.put((pytg, container, blank_state))
+            return None
+        if pytg is not None:
+            shutdown_session(pytg, self.shutdown_timeout, container.dispose if container else None)
+        self.__forget_blank_state__(blank_state)
+        return container
+
+    # Quits the recycled sessions that the last init did not need, and returns their containers
+    def __quit_recycled_workers__(self, timeout: float = None) -> list[deployed_tg_container]:
+        """
+        :meta private:
+        """
+        containers = []
+        if self.recycled_workers is None:
+            return containers
+        timeout = self.shutdown_timeout if timeout is None else timeout
+        while True:
+            try:
+                pytg, container, blank_state = self.recycled_workers.get_nowait()
+            except queue.Empty:
+                return containers
+            shutdown_session(pytg, timeout, container.dispose if container else None)
+            self.__forget_blank_state__(blank_state)
+            containers.append(container)
+
+    # Launches one of the TG sessions of the multiplexer
+    def __launch_multiplexed_session__(self, log_level, index: int) -> PyTurboGrid:
+        """
+        :meta private:
+        """
+        pytg = self.__launch_session__(
+            log_level=log_level,
+            log_filename_suffix=f"{self.log_prefix}_multiplexed_{index}",
+            additional_kw_args=self.tg_kw_args,
+            turbogrid_path=self.turbogrid_path,
+            turbogrid_location_type=self.turbogrid_location_type,
+        )[0]
+        pytg.block_each_message = True
+        return pytg
+
+    # Quits the TG sessions of the multiplexer, if any, adding how they ended to shutdown_reports
+    def __close_multiplexer__(self, timeout: float = None):
+        """
+        :meta private:
+        """
+        if self.multiplexer is None:
+            return
+        reports = self.multiplexer.close(self.shutdown_timeout if timeout is None else timeout)
+        self.shutdown_reports = {**(self.shutdown_reports or {}), **reports}
+
+    def __forget_blank_state__(self, blank_state: tuple[str, str]):
+        """
+        :meta private:
+        """
+        # Files written by TG in a container go with the container
+        if blank_state and os.path.isfile(blank_state[0]):
+            os.remove(blank_state[0])
+
+    def __launch_container__(self):
+        """
+        :meta private:
+        """
+        return launch_turbogrid_container(
+            self.tg_container_launch_settings["cfxtg_command_name"],
+            self.tg_container_launch_settings["image_name"],
+            self.tg_container_launch_settings["container_name"],
+            self.tg_container_launch_settings["cfx_version"],
+            self.tg_container_launch_settings["license_file"],
+            self.tg_container_launch_settings["keep_stopped_containers"],
+            self.tg_container_launch_settings["container_env_dict"],
+            ready_timeout=float(self.tg_container_launch_settings.get("ready_timeout", 60.0)),
+            reuse_stopped_containers=self.__container_launch_flag__(
+                "reuse_stopped_containers", False
+            ),
+            shared_work_dir=self.shared_work_dir,
+        )
+
+    # The directory mounted in the containers, if the launch settings ask for one and docker
+    # runs the containers on this host
+    def __get_shared_work_dir__(self) -> Optional[shared_work_dir]:
+        """
+        :meta private:
+        """
+        if (
+            self.turbogrid_location_type
+            != PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
+            or self.tg_container_launch_settings.get("shared_work_dir") is None
+            or not self.__container_launch_flag__("shared_work_dir", False)
+        ):
+            return None
+        if not is_local_docker(warn=True):
+            return None
+        setting = str(self.tg_container_launch_settings["shared_work_dir"])
+        return shared_work_dir(
+            None if setting.lower() in ("true", "1") else setting,
+            subdirectory=self.tg_container_launch_settings.get("shared_work_dir_subdirectory"),
+        )
+
+    # Whether the subdirectory of the shared work directory outlives the MBR, because the
+    # user asked to keep it or named it
+    def __keeps_shared_work_dir__(self) -> bool:
+        """
+        :meta private:
+        """
+        return self.__container_launch_flag__("keep_shared_work_dir", False) or bool(
+            self.tg_container_launch_settings.get("shared_work_dir_subdirectory")
+        )
+
+    # Container launch settings may come as strings, for example from a json file
+    def __container_launch_flag__(self, key: str, default: bool) -> bool:
+        """
+        :meta private:
+        """
+        return str(self.tg_container_launch_settings.get(key, default)).lower() not in (
+            "false",
+            "0",
+            "",
+        )
+
+    # The host a worker was placed on, None if it runs here or in a container
+    def __worker_host__(self, tg_worker_instance: single_blade_row) -> Optional[tg_host]:
+        """
+        :meta private:
+        """
+        process = getattr(tg_worker_instance, "tg_execution_control", None)
+        return process.host if isinstance(process, remote_tg_process) else None
+
+    # Copies input files to the host of a worker placed on a host of the inventory, and returns
+    # their paths there. Workers running here read the files where they are.
+    def __route_files__(self, tg_worker_instance: single_blade_row, paths: list[str]) -> list[str]:
+        """
+        :meta private:
+        """
+        host = self.__worker_host__(tg_worker_instance)
+        return paths if host is None else host.put_files(paths)
+
+    def __host_path__(self, host: Optional[tg_host], directory: str, filename: str) -> str:
+        """
+        :meta private:
+        """
+        # Hosts of the inventory have POSIX paths
+        return os.path.join(directory, filename) if host is None else f"{directory}/{filename}"
+
+    # Where the TG of a worker finds a neighbor profile copied with its INF file
+    def __neighbor_path__(
+        self,
+        tg_worker_instance: single_blade_row,
+        host: Optional[tg_host],
+        directory: str,
+        filename: str,
+    ) -> str:
+        """
+        :meta private:
+        """
+        if (
+            self.turbogrid_location_type
+            == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
+        ):
+            return self.__container_file_path__(tg_worker_instance.tg_execution_control, filename)
+        return self.__host_path__(host, directory, filename)
+
+    # Makes input files readable by the TG of a container, and returns the paths TG reads them
+    # from: in the shared work directory if the container mounts it, otherwise in the container,
+    # where they are copied over SSH
+    def __put_container_files__(self, tg_execution_control, local_paths: list[str]) -> list[str]:
+        """
+        :meta private:
+        """
+        work_dir = getattr(tg_execution_control, "shared_work_dir", None)
+        if work_dir:
+            return work_dir.put_files(local_paths)
+        from ansys.turbogrid.core.launcher.container_helpers import container_helpers
+
+        container = container_helpers.get_container_connection(
+            tg_execution_control.ftp_port,
+            self.tg_container_launch_settings["ssh_key_filename"],
+        )
+        container_helpers.transfer_files_to_container(container, "", local_paths)
+        return [os.path.basename(local_path) for local_path in local_paths]
+
+    # The path of a file that the TG of a container reads or writes by name
+    def __container_file_path__(self, tg_execution_control, filename: str) -> str:
+        """
+        :meta private:
+        """
+        work_dir = getattr(tg_execution_control, "shared_work_dir", None)
+        return work_dir.get_container_path(filename) if work_dir else filename
+
+    # Copies files written by the TG of a container to a local directory
+    def __get_container_files__(
+        self, tg_execution_control, filenames: list[str], local_directory: str
+    ):
+        """
+        :meta private:
+        """
+        work_dir = getattr(tg_execution_control, "shared_work_dir", None)
+        if work_dir:
+            work_dir.get_files(filenames, local_directory)
+            return
+        from ansys.turbogrid.core.launcher.container_helpers import container_helpers
+
+        container = container_helpers.get_container_connection(
+            tg_execution_control.ftp_port,
+            self.tg_container_launch_settings["ssh_key_filename"],
+        )
+        container_helpers.transfer_files_from_container(container, local_directory, filenames)
+
+    def __uses_session_pool__(self) -> bool:
+        """
+        :meta private:
+        """
+        return (
+            self.session_pool is not None
+            and self.turbogrid_location_type == PyTurboGrid.TurboGridLocationType.TURBOGRID_INSTALL
+        )
+
+    # Launches a TG session (in a new container, if TG runs in containers, or on a host of
+    # the inventory, unless placed is False) once the admission controller and the license
+    # scheduler, if any, let it start. Pooled sessions are already running, so they are not
+    # subject to them. Returns the session, its container (or remote process) and the
+    # seconds it was queued. The session holds its slot and seat until it is shut down.
+    # The launch phases are added to timings, if given.
+    def __launch_session__(
+        self, placed: bool = True, timings: launch_timings = None, **launch_kwargs
+    ) -> tuple[PyTurboGrid, deployed_tg_container, float]:
+        """
+        :meta private:
+        """
+        timings = timings if timings is not None else launch_timings()
+        queued = not self.__uses_session_pool__()
+        ticket = self.admission_control.acquire() if queued and self.admission_control else None
+        # Sessions that are placed on the hosts of the inventory are started there over SSH,
+        # and connected to like sessions in containers
+        placed = (
+            placed
+            and queued
+            and self.hosts is not None
+            and self.turbogrid_location_type == PyTurboGrid.TurboGridLocationType.TURBOGRID_INSTALL
+        )
+
+        def start() -> tuple[PyTurboGrid, deployed_tg_container]:
+            container = None
+            if placed:
+                with timings.phase(LaunchPhase.PROCESS_SPAWN):
+                    container = remote_tg_process(
+                        self.hosts,
+                        launch_kwargs.get("log_filename_suffix", ""),
+                        launch_kwargs.get("additional_kw_args"),
+                    )
+                launch_kwargs.update(
+                    port=container.socket_port,
+                    host=container.host.address,
+                    turbogrid_path=container.host.cfxtg_path,
+                    turbogrid_location_type=PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER,
+                )
+            elif (
+                self.turbogrid_location_type
+                == PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER
+            ):
+                with timings.phase(LaunchPhase.CONTAINER_START):
+                    container = self.__launch_container__()
+                launch_kwargs["port"] = container.socket_port
+            try:
+                # A session that starts cfxtg itself connects to it in the same call
+                with timings.phase(
+                    LaunchPhase.HANDSHAKE if container or not queued else LaunchPhase.PROCESS_SPAWN
+                ):
+                    return self.__launch_turbogrid__(**launch_kwargs), container
+            except BaseException:
+                # A launch that is tried again gets a new container
+                if container:
+                    container.dispose(wait=False)
+                raise
+
+        try:
+            if queued and self.license_scheduler:
+                (pytg, container), grant = self.license_scheduler.launch(start)
+            else:
+                (pytg, container), grant = start(), None
+        except BaseException:
+            if ticket:
+                ticket.release()
+            raise
+        waited = 0.0
+        for resource in (ticket, grant):
+            if resource:
+                attach_session_resource(pytg, resource)
+                waited += resource.waited
+        timings.add(LaunchPhase.QUEUED, waited)
+        if waited >= 1.0:
+            print(f"{self.log_prefix} TG launch queued for {waited:.1f} s")
+        return pytg, container, waited
+
+    # Launches a TG session, or checks one out of the session pool if there is one.
+    # Pooled sessions are already running, so the launch arguments do not apply to them.
+    def __launch_turbogrid__(self, **launch_kwargs) -> PyTurboGrid:
+        """
+        :meta private:
+        """
+        if self.__uses_session_pool__():
+            return self.session_pool.checkout()
+        return launch_turbogrid(
+            resource_sample_interval=self.resource_sample_interval, **launch_kwargs
+        )
+
+    # Quits a TG session within the timeout, killing it (or its container) after that.
+    # Pooled sessions are checked back in instead.
+    def __quit_turbogrid__(
+        self,
+        pytg: PyTurboGrid,
+        timeout: float = None,
+        container: deployed_tg_container = None,
+    ) -> shutdown_report:
+        """
+        :meta private:
+        """
+        if self.__uses_session_pool__():
+            self.session_pool.checkin(pytg)
+            return shutdown_report(ShutdownOutcome.CLEAN, 0.0)
+        return shutdown_session(
+            pytg,
+            self.shutdown_timeout if timeout is None else timeout,
+            container.dispose if container else None,
+        )
 
     def __disable_lma__(self, tg_worker_instance: single_blade_row):
         """
@@ -1845,6 +2501,13 @@ class multi_blade_row:
         threadsafe_dict[tg_worker_name] = ms_hd
 
     def __set_params__(self, tg_worker_instance, param_list: list[tuple[str, str]]):
+        """
+        :meta private:
+        """
+        tg_worker_instance.record("set_br_state", partial(self.__apply_params__, param_list))
+        self.__apply_params__(param_list, tg_worker_instance)
+
+    def __apply_params__(self, param_list: list[tuple[str, str]], tg_worker_instance):
         """
         :meta private:
         """
@@ -27,17 +27,20 @@ from collections import OrderedDict
 from datetime import datetime as dt
 from datetime import timedelta as td
 import math
-from multiprocessing import Manager, Pool, Process, cpu_count
 import os
 import threading
-import time
 
 from ansys.turbogrid.api import pyturbogrid_core
 from ansys.turbogrid.api.CCL.ccl_object_db import CCLObjectDB
-from fabric import Connection
-from jinja2 import Environment, FileSystemLoader
 
+from ansys.turbogrid.core.launcher.admission_control import release_session_resources
 from ansys.turbogrid.core.launcher.launcher import launch_turbogrid
+from ansys.turbogrid.core.launcher.session_pool import (
+    capture_blank_state,
+    get_blank_state_filename,
+    recycle_session,
+)
+from ansys.turbogrid.core.launcher.session_shutdown import ShutdownOutcome, shutdown_session
 from ansys.turbogrid.core.mesh_statistics import mesh_statistics
 import ansys.turbogrid.core.ndf_parser.ndf_parser as ndfp
 
@@ -81,8 +84,9 @@ class MultiBladeRow:
         "Orthogonality Angle",
     ]
 
-    #: When working in Ansys Labs, the number of attempts to be made for file transfer from
-    #: container to the local working directory results folder.
+    #: When working in Ansys Labs, the number of times a result file in the container is
+    #: checked for being fully written, at growing intervals (up to 2 s), before it is copied
+    #: to the local working directory results folder. The transfer fails after that.
     max_file_transfer_attempts = 20
 
     #: An alias for the TurboGridLocationType in pyturbogrid_core.PyTurboGrid.
@@ -91,6 +95,17 @@ class MultiBladeRow:
     #: When working in Ansys Labs, the name with full path of the file containing the container key.
     tg_container_key_file = ""
 
+    #: Optional ``admission_controller`` for the TurboGrid sessions launched locally.
+    #: The producers then launch their session only once the host has room for it
+    #: (memory, cores and a cap on the sessions of all the processes of the host),
+    #: and wait in turn otherwise.
+    admission_control = None
+
+    #: Whether each producer process keeps its TurboGrid session from one blade row to the
+    #: next, reset to its blank state, rather than launching TurboGrid for each blade row.
+    #: Each reset saves and reads back a temporary blank state file.
+    recycle_sessions = False
+
     def __init__(self, working_dir: str, case_directory: str, ndf_file_name: str):
         """
         Initialize the class using name with full path of an NDF file for the multi blade row case.
@@ -146,13 +161,14 @@ class MultiBladeRow:
         multi_process_count : int
             The number of processes to be used in parallel. This will be limited to the smaller of
             the number of blade rows to mesh and the cpu count of the system. A value of zero will
-            use the maximum possible number of processes.
+            use the maximum possible number of processes. With an ``admission_control``, producers
+            that the host has no room for wait for a session to be launched.
         """
         num_rows_to_process = len(self._blade_rows_to_mesh)
         if num_rows_to_process == 0:
             self._multi_process_count = 0
             return
-        max_producers = min(cpu_count(), num_rows_to_process)
+        max_producers = min(os.cpu_count() or 1, num_rows_to_process)
         multi_process_count_clamped = min(max(0, multi_process_count), max_producers)
         num_producers = min(num_rows_to_process, multi_process_count_clamped)
         num_producers = num_producers if num_producers > 0 else max_producers
@@ -266,6 +282,8 @@ class MultiBladeRow:
         blade_row_settings = self._get_blade_row_settings()
         # print(f"blade row settings: {blade_row_settings}")
 
+        from multiprocessing import Manager, Process
+
         original_dir = os.getcwd()
         os.chdir(self._results_directory)
         progress_updates_mgr = Manager()
@@ -317,6 +335,8 @@ class MultiBladeRow:
     ######################################
 
     def _execute_local(self, progress_updates_queue, blade_row_settings, num_producers):
+        from multiprocessing import Pool
+
         if self._write_tginit_first:
             tginit_name = self._read_ndf(
                 self._ndf_file_full_path,
@@ -336,12 +356,16 @@ class MultiBladeRow:
                         self.report_stats_angle_unit,
                         self.report_stats_decimal_places,
                         self.report_mesh_quality_measures,
+                        self.admission_control,
+                        self.recycle_sessions,
                     ]
                 )
             with Pool(num_producers) as producers:
                 producers.starmap(execute_tginit_bladerow, work_details)
-            producers.close()
-            producers.join()
+                # Closing the pool before leaving the block lets the producers exit normally,
+                # which quits the sessions they kept, if any, rather than be terminated.
+                producers.close()
+                producers.join()
         else:
             work_details = []
             for blade_row in self._blade_rows_to_mesh:
@@ -356,16 +380,22 @@ class MultiBladeRow:
                         self.report_stats_angle_unit,
                         self.report_stats_decimal_places,
                         self.report_mesh_quality_measures,
+                        self.admission_control,
+                        self.recycle_sessions,
                     ]
                 )
             with Pool(num_producers) as producers:
                 producers.starmap(execute_ndf_bladerow, work_details)
-            producers.close()
-            producers.join()
+                # Closing the pool before leaving the block lets the producers exit normally,
+                # which quits the sessions they kept, if any, rather than be terminated.
+                producers.close()
+                producers.join()
 
     def _execute_ansys_labs(
         self, progress_updates_mgr, progress_updates_queue, blade_row_settings, num_producers
     ):
+        from multiprocessing import Pool, Process
+
         if self._write_tginit_first:
             tginit_name_list = progress_updates_mgr.list()
             ndf_reader_proc = Process(
@@ -400,12 +430,15 @@ class MultiBladeRow:
                         self.report_mesh_quality_measures,
                         self.max_file_transfer_attempts,
                         self.tg_container_key_file,
+                        self.recycle_sessions,
                     ]
                 )
             with Pool(num_producers) as producers:
                 producers.starmap(execute_tginit_blade_row_ansys_labs, work_details)
-            producers.close()
-            producers.join()
+                # Closing the pool before leaving the block lets the producers exit normally,
+                # which quits the sessions they kept, if any, rather than be terminated.
+                producers.close()
+                producers.join()
         else:
             work_details = []
             for blade_row in self._blade_rows_to_mesh:
@@ -422,12 +455,15 @@ class MultiBladeRow:
                         self.report_mesh_quality_measures,
                         self.max_file_transfer_attempts,
                         self.tg_container_key_file,
+                        self.recycle_sessions,
                     ]
                 )
             with Pool(num_producers) as producers:
                 producers.starmap(execute_ndf_blade_row_ansys_labs, work_details)
-            producers.close()
-            producers.join()
+                # Closing the pool before leaving the block lets the producers exit normally,
+                # which quits the sessions they kept, if any, rather than be terminated.
+                producers.close()
+                producers.join()
 
     def _set_working_directory(self, working_dir: str):
         if not os.path.isdir(working_dir):
@@ -556,6 +592,7 @@ class MultiBladeRow:
             pyturbogrid_instance = launch_turbogrid(
                 log_level=pyturbogrid_core.PyTurboGrid.TurboGridLogLevel.CRITICAL,
                 log_filename_suffix="_" + ndf_name,
+                admission_control=self.admission_control,
             )
             progress_updates_queue.put([ndf_name, f"pyturbogrid instance created"])
 
@@ -564,6 +601,7 @@ class MultiBladeRow:
                 ndffilename=ndf_file, cadfilename=ndf_name + ".x_b", bladerow=blade_row
             )
             pyturbogrid_instance.quit()
+            release_session_resources(pyturbogrid_instance)
         except Exception as e:
             progress_updates_queue.put([ndf_name, f"Reader error {e}"])
         stop_dt = dt.now()
@@ -584,6 +622,61 @@ class MultiBladeRow:
 # Global methods in the module
 #####################################
 
+# The TG session kept by this producer process, with its blank state, as
+# (session, blank state file name, blank CCL state).
+# With recycle_sessions, it is recycled from one blade row to the next instead of launching
+# TG for each blade row.
+_producer_session = None
+_producer_session_finalizer = None
+
+
+def get_producer_session(pyturbogrid_instance_creator, log_suffix, state_directory=None):
+    """
+    Get a blank TG session for the next blade row of this producer process.
+
+    The session kept from the previous blade row is recycled if it can be verified to be blank.
+    Otherwise it is quit, and a new session is launched with ``pyturbogrid_instance_creator``.
+    """
+    global _producer_session, _producer_session_finalizer
+    if _producer_session is not None:
+        if recycle_session(*_producer_session):
+            return _producer_session[0]
+        quit_producer_session()
+
+    pyturbogrid_instance = pyturbogrid_instance_creator(log_suffix)
+    pyturbogrid_instance.block_each_message = True
+    _producer_session = (pyturbogrid_instance, None, None)
+    if _producer_session_finalizer is None:
+        from multiprocessing.util import Finalize
+
+        # Unlike atexit, finalizers also run when a pool process exits
+        _producer_session_finalizer = Finalize(None, quit_producer_session, exitpriority=10)
+    try:
+        blank_state_filename = get_blank_state_filename(state_directory)
+        _producer_session = (
+            pyturbogrid_instance,
+            blank_state_filename,
+            capture_blank_state(pyturbogrid_instance, blank_state_filename),
+        )
+    except Exception as e:
+        # The session is still used for this blade row, and replaced for the next one
+        print(f"{pyturbogrid_instance} exception on capture_blank_state: {e}")
+    return pyturbogrid_instance
+
+
+def quit_producer_session():
+    """Quit the TG session kept by this producer process, if there is one."""
+    global _producer_session
+    if _producer_session is None:
+        return
+    pyturbogrid_instance, blank_state_filename, blank_ccl_state = _producer_session
+    _producer_session = None
+    report = shutdown_session(pyturbogrid_instance)
+    if report.outcome != ShutdownOutcome.CLEAN:
+        print(f"{pyturbogrid_instance} shutdown: {report}")
+    if blank_state_filename and os.path.isfile(blank_state_filename):
+        os.remove(blank_state_filename)
+
 
 def execute_ndf_bladerow(
     ndf_file,
@@ -594,11 +687,14 @@ def execute_ndf_bladerow(
     report_stats_angle_unit,
     report_stats_decimal_places,
     report_mesh_quality_measures,
+    admission_control=None,
+    recycle_sessions=False,
 ):
     def pyturbogrid_instance_creator(log_suffix):
         return launch_turbogrid(
             log_level=pyturbogrid_core.PyTurboGrid.TurboGridLogLevel.CRITICAL,
             log_filename_suffix="_" + log_suffix,
+            admission_control=admission_control,
         )
 
     def file_reader(pyturbogrid_instance):
@@ -623,6 +719,7 @@ def execute_ndf_bladerow(
         0,
         None,
         None,
+        recycle_sessions,
     )
 
 
@@ -635,11 +732,14 @@ def execute_tginit_bladerow(
     report_stats_angle_unit,
     report_stats_decimal_places,
     report_mesh_quality_measures,
+    admission_control=None,
+    recycle_sessions=False,
 ):
     def pyturbogrid_instance_creator(log_suffix):
         return launch_turbogrid(
             log_level=pyturbogrid_core.PyTurboGrid.TurboGridLogLevel.CRITICAL,
             log_filename_suffix="_" + log_suffix,
+            admission_control=admission_control,
         )
 
     def file_reader(pyturbogrid_instance):
@@ -662,6 +762,7 @@ def execute_tginit_bladerow(
         0,
         None,
         None,
+        recycle_sessions,
     )
 
 
@@ -687,12 +788,11 @@ def container_connection_creator(
     progress_updates_queue,
     progress_updates_header,
 ):
+    from ansys.turbogrid.core.launcher.container_helpers import container_helpers
+
     progress_updates_queue.put([progress_updates_header, f"Connection"])
-    container_connection = Connection(
-        host=pyturbogrid_instance.ftp_ip,
-        user="root",
-        port=pyturbogrid_instance.ftp_port,
-        connect_kwargs={"key_filename": container_key_file},
+    container_connection = container_helpers.get_container_connection(
+        pyturbogrid_instance.ftp_port, container_key_file, pyturbogrid_instance.ftp_ip
     )
     progress_updates_queue.put(
         [
@@ -701,9 +801,8 @@ def container_connection_creator(
         ]
     )
     for file in files_to_transfer:
-        local_filepath = file
-        progress_updates_queue.put([progress_updates_header, f"To container->{local_filepath}"])
-        container_connection.put(remote="/", local=local_filepath)
+        progress_updates_queue.put([progress_updates_header, f"To container->{file}"])
+    container_helpers.transfer_files_to_container(container_connection, None, files_to_transfer)
     return container_connection
 
 
@@ -714,15 +813,16 @@ def container_connection_files_getter(
     progress_updates_header,
     files_to_get,
 ):
+    from ansys.turbogrid.core.launcher.container_helpers import container_helpers
+
+    # Each file is fetched once, as soon as TurboGrid has finished writing it
     for file in files_to_get:
-        attempts = 0
-        while attempts == 0 or (
-            os.path.isfile(file) is False and attempts <= max_file_transfer_attempts
-        ):
-            progress_updates_queue.put([progress_updates_header, f"Get {file} attempt {attempts}"])
-            time.sleep(0.5)
-            container_connection.get(remote=f"/{file}", local=f"{file}")
-            attempts += 1
+        size = container_helpers.wait_for_file_in_container(
+            container_connection, file, max_checks=max_file_transfer_attempts
+        )
+        progress_updates_queue.put([progress_updates_header, f"Get {file} ({size} bytes)"])
+        # Large results come compressed (see container_helpers.transfer_compression)
+        container_helpers.transfer_file_from_container(container_connection, file, ".")
 
 
 def execute_ndf_blade_row_ansys_labs(
@@ -736,6 +836,7 @@ def execute_ndf_blade_row_ansys_labs(
     report_mesh_quality_measures,
     max_file_transfer_attempts,
     container_key_file,
+    recycle_sessions=False,
 ):
     def file_reader(pyturbogrid_instance):
         pyturbogrid_instance.read_ndf(
@@ -759,6 +860,7 @@ def execute_ndf_blade_row_ansys_labs(
         max_file_transfer_attempts,
         container_connection_files_getter,
         [blade + ".tst", blade + ".def"],
+        recycle_sessions,
     )
 
 
@@ -828,6 +930,7 @@ def execute_tginit_blade_row_ansys_labs(
     report_mesh_quality_measures,
     max_file_transfer_attempts,
     container_key_file,
+    recycle_sessions=False,
 ):
     def file_reader(pyturbogrid_instance):
         pyturbogrid_instance.read_tginit(path=os.path.split(tginit_file)[1], bladerow=blade_row)
@@ -849,6 +952,7 @@ def execute_tginit_blade_row_ansys_labs(
         max_file_transfer_attempts,
         container_connection_files_getter,
         [blade + ".tst", blade + ".def"],
+        recycle_sessions,
     )
 
 
@@ -869,15 +973,25 @@ def execute_blade_row_common(
     max_file_transfer_attempts,
     container_connection_files_getter,
     files_to_get_from_connection,
+    recycle_sessions=False,
 ):
     try:
         start_dt = dt.now()
         progress_updates_queue.put([blade_row + "/" + blade, f"Starting {blade_row} producer"])
         progress_updates_queue.put([blade_row + "/" + blade, f"Start time: {start_dt}"])
 
-        pyturbogrid_instance = pyturbogrid_instance_creator(blade)
-        progress_updates_queue.put([blade_row + "/" + blade, f"pyturbogrid instance created"])
-        pyturbogrid_instance.block_each_message = True
+        if recycle_sessions:
+            # Sessions run in containers see the blank state files in their own file system
+            pyturbogrid_instance = get_producer_session(
+                pyturbogrid_instance_creator,
+                blade,
+                None if container_connection_creator is None else "/tmp",
+            )
+            progress_updates_queue.put([blade_row + "/" + blade, f"pyturbogrid instance ready"])
+        else:
+            pyturbogrid_instance = pyturbogrid_instance_creator(blade)
+            progress_updates_queue.put([blade_row + "/" + blade, f"pyturbogrid instance created"])
+            pyturbogrid_instance.block_each_message = True
 
         if container_connection_creator is not None:
             container_connection = container_connection_creator(
@@ -916,7 +1030,9 @@ def execute_blade_row_common(
                 blade_row + "/" + blade,
                 files_to_get_from_connection,
             )
-        pyturbogrid_instance.quit()
+        # A recycled session is kept for the next blade row handled by this process
+        if not recycle_sessions:
+            pyturbogrid_instance.quit()
 
     except Exception as e:
         progress_updates_queue.put([blade, f"Producer Error {e}"])
@@ -1013,6 +1129,8 @@ def write_mesh_report(
             show=False,
         )
         hist_dict[var] = file_name
+    from jinja2 import Environment, FileSystemLoader
+
     environment = Environment(loader=FileSystemLoader(os.path.dirname(__file__)))
     html_template = environment.get_template("report_template.html")
     html_context = {
@@ -1085,6 +1203,8 @@ def publish_progress_updates(progress_updates_queue, num_prods, ndf_file_name):
         blade_count_infos["Total"] = {"verts": str(total_verts), "elems": str(total_elems)}
     if len(blade_errors) == 0:
         blade_errors.append(f"No errors reported.")
+    from jinja2 import Environment, FileSystemLoader
+
     environment = Environment(loader=FileSystemLoader(os.path.dirname(__file__)))
     html_template = environment.get_template("summary_template.html")
     html_context = {
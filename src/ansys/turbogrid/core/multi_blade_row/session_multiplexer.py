@@ -0,0 +1,334 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-FileCopyrightText: 2023 ANSYS, Inc. All rights reserved
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+# The multiplexer lets a few TurboGrid sessions serve many blade rows.
+# Each blade row gets a multiplexed_session standing in for its own PyTurboGrid.
+# A call on it is run on a session where the blade row is resident, swapping the state
+# of the least recently used blade row out (save_state) and its own in (read_state) if needed.
+
+from collections import OrderedDict
+from contextlib import contextmanager
+import itertools
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Hashable, Optional
+
+from ansys.turbogrid.api.pyturbogrid_core import PyTurboGrid
+
+from ansys.turbogrid.core.launcher.session_pool import (
+    capture_blank_state,
+    get_blank_state_filename,
+    is_session_alive,
+    reset_session,
+)
+from ansys.turbogrid.core.launcher.session_shutdown import shutdown_concurrently, shutdown_report
+
+_swap_ids = itertools.count()
+
+
+class _multiplexer_slot:
+    """
+    :meta private:
+    """
+
+    def __init__(self, index: int):
+        self.index = index
+        self.pytg = None
+        self.blank_state = None
+        # The blade row resident in the session, and whether a forgotten one is left in it
+        self.row = None
+        self.dirty = False
+        # The thread using the session, and how many times it entered it
+        self.owner = None
+        self.depth = 0
+
+
+class session_multiplexer:
+    """
+    Serve many blade rows from at most ``max_sessions`` TurboGrid sessions.
+
+    Sessions are launched on demand, up to ``max_sessions``. When a blade row that is not
+    resident is used and all the sessions are taken, the least recently used blade row that
+    is not in use is swapped out to a state file, and the blade row is swapped in, from its
+    own state file or from the blank state of the session. Calls on different blade rows
+    run concurrently as long as they are resident in different sessions.
+    """
+
+    max_sessions: int
+    state_directory: str
+    swap_count: int
+    swap_time: float
+
+    def __init__(
+        self,
+        session_launcher: Callable[[int], PyTurboGrid],
+        max_sessions: int,
+        state_directory: str = None,
+        session_quitter: Callable[[PyTurboGrid, Optional[float]], shutdown_report] = None,
+    ):
+        """
+        Parameters
+        ----------
+        session_launcher : Callable[[int], PyTurboGrid]
+            Callable launching a session, given its index.
+        max_sessions : int
+            Maximum number of sessions launched.
+        state_directory : str, default: ``None``
+            Directory of the state files, as seen by the sessions. The default is ``None``,
+            in which case the system temporary directory is used.
+        session_quitter : Callable[[PyTurboGrid, float], shutdown_report], default: ``None``
+            Callable quitting a session within a timeout, such as
+            ``session_shutdown.shutdown_session``. The default is ``None``, in which case
+            ``shutdown_session`` is used.
+        """
+        if max_sessions < 1:
+            raise ValueError(f"A multiplexer needs at least one session, not {max_sessions}")
+        self.session_launcher = session_launcher
+        self.max_sessions = max_sessions
+        self.state_directory = state_directory if state_directory else tempfile.gettempdir()
+        self.session_quitter = session_quitter
+        self.swap_count = 0
+        self.swap_time = 0.0
+        self._condition = threading.Condition()
+        self._slots: list[_multiplexer_slot] = []
+        # Resident blade rows, least recently used first
+        self._resident: OrderedDict[Hashable, _multiplexer_slot] = OrderedDict()
+        self._swapped: dict[Hashable, str] = {}
+        # Blade rows that were resident in a session that died
+        self._lost: set[Hashable] = set()
+
+    def session(self, row: Hashable) -> "multiplexed_session":
+        """Get the stand-in session of a blade row."""
+        return multiplexed_session(self, row)
+
+    def get_resident_rows(self) -> list[Hashable]:
+        """Get the resident blade rows, least recently used first."""
+        with self._condition:
+            return list(self._resident)
+
+    @contextmanager
+    def acquire(self, row: Hashable):
+        """
+        Make a blade row resident, and keep it in its session for the body of a ``with``
+        statement, which gets the session. The same thread can acquire it again meanwhile.
+        """
+        slot = self.__claim__(row)
+        try:
+            if slot.row != row or not is_session_alive(slot.pytg):
+                self.__swap__(slot, row)
+            yield slot.pytg
+        finally:
+            with self._condition:
+                slot.depth -= 1
+                if slot.depth == 0:
+                    slot.owner = None
+                    self._condition.notify_all()
+
+    def forget(self, row: Hashable):
+        """
+        Forget a blade row, so that its session can serve others without swapping it out.
+        Calls that are in progress on the blade row finish first.
+        """
+        with self._condition:
+            slot = self._resident.get(row)
+            while slot is not None and slot.owner not in (None, threading.current_thread()):
+                self._condition.wait()
+                slot = self._resident.get(row)
+            if slot is not None:
+                del self._resident[row]
+                slot.row = None
+                slot.dirty = True
+            swap_filename = self._swapped.pop(row, None)
+            self._lost.discard(row)
+            self._condition.notify_all()
+        if swap_filename and os.path.isfile(swap_filename):
+            os.remove(swap_filename)
+
+    def close(self, timeout: float = None) -> dict[str, shutdown_report]:
+        """
+        Quit the sessions, and forget all the blade rows.
+
+        Returns how each session ended, by ``"multiplexed_<index>"``.
+        """
+        from ansys.turbogrid.core.launcher.session_shutdown import shutdown_session
+
+        quitter = self.session_quitter if self.session_quitter else shutdown_session
+        with self._condition:
+            slots = [slot for slot in self._slots if slot.pytg is not None]
+            self._slots = []
+            self._resident.clear()
+            swapped = list(self._swapped.values())
+            self._swapped.clear()
+            self._lost.clear()
+        for filename in swapped + [slot.blank_state[0] for slot in slots if slot.blank_state]:
+            if os.path.isfile(filename):
+                os.remove(filename)
+        return shutdown_concurrently(
+            {
+                f"multiplexed_{slot.index}": (lambda pytg=slot.pytg: quitter(pytg, timeout))
+                for slot in slots
+            }
+        )
+
+    def __claim__(self, row: Hashable) -> _multiplexer_slot:
+        """
+        :meta private:
+        """
+        me = threading.current_thread()
+        with self._condition:
+            while True:
+                slot = self._resident.get(row)
+                if slot is not None:
+                    if slot.owner in (None, me):
+                        self._resident.move_to_end(row)
+                        break
+                else:
+                    slot = self.__free_slot__()
+                    if slot is not None:
+                        break
+                self._condition.wait()
+            slot.owner = me
+            slot.depth += 1
+            return slot
+
+    def __free_slot__(self) -> Optional[_multiplexer_slot]:
+        """
+        :meta private:
+        """
+        # A session without a blade row, then a new session, then the least recently used one
+        for slot in self._slots:
+            if slot.row is None and slot.owner is None:
+                return slot
+        if len(self._slots) < self.max_sessions:
+            slot = _multiplexer_slot(len(self._slots))
+            self._slots.append(slot)
+            return slot
+        for slot in self._resident.values():
+            if slot.owner is None:
+                return slot
+        return None
+
+    def __swap__(self, slot: _multiplexer_slot, row: Hashable):
+        """
+        :meta private:
+        """
+        start = time.perf_counter()
+        if slot.pytg is None or not is_session_alive(slot.pytg):
+            self.__launch__(slot)
+        if slot.row is not None:
+            swap_filename = os.path.join(
+                self.state_directory, f"pyturbogrid_swap_{os.getpid()}_{next(_swap_ids)}.tst"
+            ).replace("\\", "/")
+            slot.pytg.save_state(filename=swap_filename)
+            with self._condition:
+                self._swapped[slot.row] = swap_filename
+                del self._resident[slot.row]
+                slot.row = None
+                slot.dirty = True
+        with self._condition:
+            if row in self._lost:
+                raise RuntimeError(f"The state of {row} was lost with the session it was in")
+            swap_filename = self._swapped.get(row)
+        if swap_filename:
+            slot.pytg.read_state(filename=swap_filename)
+        elif slot.dirty and not reset_session(slot.pytg, *slot.blank_state):
+            raise RuntimeError(f"{slot.pytg} could not be reset to a blank state")
+        with self._condition:
+            self._swapped.pop(row, None)
+            slot.row = row
+            slot.dirty = False
+            self._resident[row] = slot
+            self.swap_count += 1
+            self.swap_time += time.perf_counter() - start
+        if swap_filename and os.path.isfile(swap_filename):
+            os.remove(swap_filename)
+
+    def __launch__(self, slot: _multiplexer_slot):
+        """
+        :meta private:
+        """
+        # The blade row that was resident in a dead session is lost
+        with self._condition:
+            if slot.row is not None:
+                del self._resident[slot.row]
+                self._lost.add(slot.row)
+                slot.row = None
+        slot.pytg = self.session_launcher(slot.index)
+        blank_state_filename = (
+            slot.blank_state[0]
+            if slot.blank_state
+            else get_blank_state_filename(self.state_directory)
+        )
+        slot.blank_state = (
+            blank_state_filename,
+            capture_blank_state(slot.pytg, blank_state_filename),
+        )
+        slot.dirty = False
+
+
+class multiplexed_session:
+    """
+    Stand-in for the ``PyTurboGrid`` session of a blade row served by a ``session_multiplexer``.
+
+    Calling a method runs it on a session where the blade row is resident. Use ``pinned``
+    to keep the blade row in its session across several calls. Only methods are forwarded.
+    Quitting forgets the blade row, and leaves the session to the multiplexer.
+    """
+
+    already_exited: bool = False
+    # Looked up by the session helpers, which have nothing to do with a stand-in
+    engine_proc = None
+    resource_sampler = None
+    session_resources = None
+    read_message_process = None
+    send_message_process = None
+    block_each_message: bool = True
+
+    def __init__(self, multiplexer: session_multiplexer, row: Hashable):
+        self.multiplexer = multiplexer
+        self.row = row
+
+    def pinned(self):
+        """Keep the blade row in its session for the body of a ``with`` statement."""
+        return self.multiplexer.acquire(self.row)
+
+    def quit(self):
+        """Forget the blade row."""
+        self.already_exited = True
+        self.multiplexer.forget(self.row)
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def call(*args, **kwargs):
+            with self.multiplexer.acquire(self.row) as pytg:
+                return getattr(pytg, name)(*args, **kwargs)
+
+        return call
+
+    def __repr__(self):
+        return f"multiplexed_session({self.row})"
@@ -32,12 +32,69 @@
 # Since SBRs are threads launched by the parent, they inherit from threading.Thread
 # Note that SBRs collect the public methods from the underlying PyTurboGrid objects
 
+import threading
+from typing import Callable
+
 from ansys.turbogrid.api.pyturbogrid_core import PyTurboGrid
 
+from ansys.turbogrid.core.launcher.launch_timings import launch_timings
+
 
 class single_blade_row:
     pytg: PyTurboGrid
+    # The job that launched this SBR and read its init source (tginit, inf, tst...),
+    # given the SBR to launch. It can be run again to bring up a replacement if the
+    # application dies.
+    launch_job: Callable[["single_blade_row"], None]
+    # Changes made since the launch job, to be replayed on a replacement, as (kind, action).
+    history: list[tuple[str, Callable[["single_blade_row"], None]]]
+    relaunch_count: int
+    # The blank state captured right after launch, as (file name, CCL state),
+    # used to recycle the application for another init. None if it cannot be recycled.
+    blank_state: tuple[str, str]
+    # Seconds the last launch was queued for a host slot or a license seat.
+    launch_wait: float
+    # The error of the last launch job, None if it succeeded.
+    launch_error: str
+    # The time spent in each phase of the last launch and init.
+    launch_timings: launch_timings
+    # Held while this SBR is checked or relaunched by the watchdog, so that a relaunch
+    # only holds up the callers of this SBR.
+    relaunch_lock: threading.Lock
 
     def __init__(self):
-        pass
+        self.pytg = None
+        self.launch_job = None
+        self.launch_wait = 0.0
+        self.launch_error = None
+        self.launch_timings = launch_timings()
+        self.blank_state = None
+        self.history = []
+        self.relaunch_count = 0
+        self.relaunch_lock = threading.Lock()
+        self._history_lock = threading.Lock()
         # setattr(self, key, getattr(self.data_driven_storage, key))
+
+    def record(self, kind: str, action: Callable[["single_blade_row"], None]):
+        """
+        Remember a change so that it can be replayed after a relaunch.
+
+        Changes of the same kind, apart from ``"set_br_state"`` changes, replace each other,
+        since only the latest one matters (for example the size factor).
+        """
+        with self._history_lock:
+            if kind != "set_br_state":
+                self.history = [entry for entry in self.history if entry[0] != kind]
+            self.history.append((kind, action))
+
+    def replay(self, target: "single_blade_row" = None):
+        """
+        Apply the recorded changes again, in the order they were made.
+
+        The changes are applied to ``target`` if given, for example a replacement that is
+        being brought up, and to this SBR otherwise.
+        """
+        with self._history_lock:
+            history = list(self.history)
+        for kind, action in history:
+            action(target if target else self)
@@ -0,0 +1,226 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-FileCopyrightText: 2023 ANSYS, Inc. All rights reserved
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""Module for relaunching the blade rows of a multi_blade_row whose TurboGrid died."""
+
+# The watchdog keeps the SBRs of an MBR alive.
+# Each SBR is checked periodically, and one whose TurboGrid application died
+# (rather than was quit) is replaced by running its launch job again,
+# then replaying the changes it had received since.
+
+import concurrent.futures
+import threading
+import traceback
+from typing import Callable, Optional
+
+from ansys.turbogrid.api.pyturbogrid_core import PyTurboGrid
+
+from ansys.turbogrid.core.launcher.session_pool import is_session_alive
+from ansys.turbogrid.core.multi_blade_row.single_blade_row import single_blade_row
+
+
+def is_worker_dead(tg_worker_instance: single_blade_row) -> bool:
+    """
+    Check whether the TurboGrid application of an SBR died.
+
+    Sessions that were quit on purpose are not considered dead.
+    """
+    pytg = getattr(tg_worker_instance, "pytg", None)
+    if pytg is None:
+        return True
+    if getattr(pytg, "already_exited", False):
+        return False
+    return not is_session_alive(pytg)
+
+
+class worker_watchdog:
+    """
+    Heartbeat the SBRs of an MBR in the background, and relaunch the ones that die.
+
+    Only SBRs with a ``launch_job`` are watched. A relaunched SBR gets its launch job run
+    again, which launches TurboGrid and reads the init source, and then its recorded
+    history (size factors, ``set_br_state`` changes...) replayed. Both are done on a
+    replacement, whose session is swapped in once it is ready, so that callers using the
+    SBR meanwhile get the error of the dead session rather than a half-initialized one.
+    """
+
+    interval: float
+    max_relaunches: int
+
+    def __init__(
+        self,
+        tg_workers_getter: Callable[[], Optional[dict[str, single_blade_row]]],
+        interval: float = 2.0,
+        max_relaunches: int = 3,
+        dead_session_handler: Callable[[PyTurboGrid], None] = None,
+    ):
+        """
+        Parameters
+        ----------
+        tg_workers_getter : Callable[[], dict[str, single_blade_row]]
+            Callable returning the SBRs to watch, by blade row name.
+        interval : float, default: ``2.0``
+            Seconds between heartbeats.
+        max_relaunches : int, default: ``3``
+            Number of times a single SBR is relaunched before it is given up on.
+        dead_session_handler : Callable[[PyTurboGrid], None], default: ``None``
+            Optional callable that receives the dead sessions, for example to return them
+            to a session pool.
+        """
+        self.tg_workers_getter = tg_workers_getter
+        self.interval = interval
+        self.max_relaunches = max_relaunches
+        self.dead_session_handler = dead_session_handler
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the heartbeats in a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.__run__, daemon=True)
+        self._thread.start()
+
+    def is_running(self) -> bool:
+        """Check whether the heartbeats are running."""
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def stop(self):
+        """Stop the heartbeats, waiting for a relaunch in progress to finish."""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def check_workers(self) -> list[str]:
+        """
+        Check all the SBRs once, and relaunch the dead ones.
+
+        Several dead SBRs are relaunched concurrently.
+        Returns the names of the SBRs that were relaunched.
+        """
+        tg_workers = list((self.tg_workers_getter() or {}).items())
+        dead_tg_workers = [
+            (tg_worker_name, tg_worker_instance)
+            for tg_worker_name, tg_worker_instance in tg_workers
+            if tg_worker_instance.launch_job is not None and is_worker_dead(tg_worker_instance)
+        ]
+        if len(dead_tg_workers) < 2:
+            relaunched = [self.check_worker(*tg_worker) for tg_worker in dead_tg_workers]
+        else:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=len(dead_tg_workers)
+            ) as executor:
+                relaunched = list(
+                    executor.map(lambda tg_worker: self.check_worker(*tg_worker), dead_tg_workers)
+                )
+        return [
+            tg_worker_name
+            for (tg_worker_name, tg_worker_instance), was_relaunched in zip(
+                dead_tg_workers, relaunched
+            )
+            if was_relaunched
+        ]
+
+    def check_worker(self, tg_worker_name: str, tg_worker_instance: single_blade_row) -> bool:
+        """
+        Check one SBR, and relaunch it if it is dead.
+
+        Returns ``True`` if the SBR was relaunched and is alive again, including by a
+        relaunch that was in progress when this was called.
+        """
+        pytg = getattr(tg_worker_instance, "pytg", None)
+        # Serialized per SBR, so that the background thread and a caller that noticed a
+        # failure do not both relaunch it, while the other SBRs are checked meanwhile.
+        with tg_worker_instance.relaunch_lock:
+            if tg_worker_instance.launch_job is None:
+                return False
+            if not is_worker_dead(tg_worker_instance):
+                return tg_worker_instance.pytg is not pytg
+            if tg_worker_instance.relaunch_count >= self.max_relaunches:
+                return False
+            return self.__relaunch__(tg_worker_name, tg_worker_instance)
+
+    def __relaunch__(self, tg_worker_name: str, tg_worker_instance: single_blade_row) -> bool:
+        """
+        :meta private:
+        """
+        tg_worker_instance.relaunch_count += 1
+        print(
+            f"{tg_worker_name} TurboGrid died, relaunching "
+            f"({tg_worker_instance.relaunch_count} of {self.max_relaunches})"
+        )
+        # The dead session and container stay with the SBR until the replacement is ready,
+        # but are let go of first, so that a pool can launch the replacement session
+        dead_pytg = getattr(tg_worker_instance, "pytg", None)
+        if dead_pytg is not None and self.dead_session_handler:
+            try:
+                self.dead_session_handler(dead_pytg)
+            except Exception as e:
+                print(f"{tg_worker_instance} exception on dead_session_handler: {e}")
+        dead_container = getattr(tg_worker_instance, "tg_execution_control", None)
+        if dead_container is not None:
+            dead_container.dispose(wait=False)
+        replacement = single_blade_row()
+        # The launch job forgets the blank state of the dead session
+        replacement.blank_state = tg_worker_instance.blank_state
+        try:
+            # Launch jobs report their own errors, so check the result rather than catch
+            tg_worker_instance.launch_job(replacement)
+            if is_worker_dead(replacement):
+                print(f"{tg_worker_name} could not be relaunched")
+                self.__swap_in__(tg_worker_instance, replacement)
+                return False
+            tg_worker_instance.replay(replacement)
+        except Exception as e:
+            print(f"{tg_worker_instance} exception on __relaunch__: {e}")
+            print(f"{tg_worker_instance} traceback: {traceback.extract_tb(e.__traceback__)}")
+            self.__swap_in__(tg_worker_instance, replacement)
+            return False
+        self.__swap_in__(tg_worker_instance, replacement)
+        print(f"{tg_worker_name} relaunched")
+        return True
+
+    # Gives an SBR the session (or lack of one) brought up by a relaunch, with its container
+    def __swap_in__(self, tg_worker_instance: single_blade_row, replacement: single_blade_row):
+        """
+        :meta private:
+        """
+        tg_worker_instance.tg_execution_control = getattr(replacement, "tg_execution_control", None)
+        tg_worker_instance.launch_wait = replacement.launch_wait
+        tg_worker_instance.launch_error = replacement.launch_error
+        tg_worker_instance.launch_timings = replacement.launch_timings
+        tg_worker_instance.blank_state = replacement.blank_state
+        # Last, so that the SBR is complete as soon as it has its new session
+        tg_worker_instance.pytg = replacement.pytg
+
+    def __run__(self):
+        """
+        :meta private:
+        """
+        while not self._stop.wait(self.interval):
+            try:
+                self.check_workers()
+            except Exception as e:
+                print(f"worker_watchdog exception on check_workers: {e}")
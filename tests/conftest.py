@@ -201,9 +201,10 @@ def get_enum_value_from_env(
 # run before the method definition.
 @pytest.fixture
 def pyturbogrid(pytestconfig, request) -> pyturbogrid_core.PyTurboGrid:
-    from ansys.turbogrid.core.launcher.container_helpers import get_open_port
+    from ansys.turbogrid.core.launcher.container_helpers import reserve_open_port
 
-    pytest.socket_port = get_open_port()
+    port_reservation = reserve_open_port()
+    pytest.socket_port = port_reservation.ports[0]
 
     pytest.turbogrid_log_level = pyturbogrid_core.PyTurboGrid.TurboGridLogLevel[
         pytestconfig.getoption("client_log_level")
@@ -298,6 +299,8 @@ def pyturbogrid(pytestconfig, request) -> pyturbogrid_core.PyTurboGrid:
         turbogrid_location_type=pytest.turbogrid_install_type,
         log_filename_suffix=request.node.name,
     )
+    # TurboGrid has bound the port by now, or a container was launched with its own ports
+    port_reservation.release()
 
     yield pyturbogrid
     # Because of conf-testy things, we can't rely on the proper lifetime management here
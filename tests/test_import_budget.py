@@ -0,0 +1,77 @@
+# Copyright (C) 2023 - 2026 ANSYS, Inc. and/or its affiliates.
+# SPDX-FileCopyrightText: 2023 ANSYS, Inc. All rights reserved
+# SPDX-License-Identifier: MIT
+#
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import os
+import subprocess
+import sys
+
+# Budgets for a bare "import ansys.turbogrid.core", in seconds and in MB of allocations.
+# They can be overridden for slow machines.
+IMPORT_TIME_BUDGET = float(os.getenv("PYTURBOGRID_IMPORT_TIME_BUDGET", "0.25"))
+IMPORT_MEMORY_BUDGET = float(os.getenv("PYTURBOGRID_IMPORT_MEMORY_BUDGET", "5"))
+
+# Measured in a fresh interpreter, because the test session has imported everything already
+MEASURE_IMPORT = """
+import json, sys, time, tracemalloc
+tracemalloc.start()
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+peak = tracemalloc.get_traced_memory()[1]
+print(json.dumps({{"time": elapsed, "memory": peak / 2**20, "modules": list(sys.modules)}}))
+"""
+
+
+def measure_import(module: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE_IMPORT.format(module=module)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def test_import_budget():
+    # Take the best of a few runs, to keep a busy machine from failing the test
+    runs = [measure_import("ansys.turbogrid.core") for i in range(3)]
+    assert min(run["time"] for run in runs) < IMPORT_TIME_BUDGET
+    assert min(run["memory"] for run in runs) < IMPORT_MEMORY_BUDGET
+
+
+def test_parsers_do_not_import_heavy_modules():
+    modules = measure_import(
+        "ansys.turbogrid.core.ndf_parser.ndf_parser, ansys.turbogrid.core.inf_parser.inf_parser"
+    )["modules"]
+    for heavy_module in ["ansys.turbogrid.api.pyturbogrid_core", "fabric", "jinja2", "grpc"]:
+        assert heavy_module not in modules
+
+
+def test_lazy_attributes():
+    import ansys.turbogrid.core as pytg_core
+    from ansys.turbogrid.core.launcher.launcher import launch_turbogrid
+
+    assert pytg_core.launch_turbogrid is launch_turbogrid
+    assert isinstance(pytg_core.__version__, str)
+    assert "launch_turbogrid" in dir(pytg_core)
@@ -27,6 +27,10 @@
 import os
 from pathlib import Path
 import platform
+import shutil
+import subprocess
+import time
+import types
 
 import pytest
 
@@ -99,3 +103,1402 @@ def test_launch_turbogrid():
     # Error conditions only; successful usage is covered in other tests
     with pytest.raises(TypeError, match="got an unexpected keyword argument"):
         tg = launcher.launch_turbogrid(bad_arg="value")
+
+
+class StubTurboGrid:
+    """A stand-in for PyTurboGrid that keeps its CCL state as a string."""
+
+    def __init__(self):
+        self.already_exited = False
+        self.state = "blank"
+
+    def save_state(self, filename):
+        with open(filename, "w") as f:
+            f.write(self.state)
+
+    def read_state(self, filename):
+        with open(filename) as f:
+            self.state = f.read()
+
+    def get_state(self):
+        return self.state
+
+    def set_obj_param(self, object, param_val_pairs):
+        self.state += f"\n{object}: {param_val_pairs}"
+
+    def quit(self):
+        self.already_exited = True
+
+
+class StubConnection:
+    """
+    A stand-in for a connection to a container, whose root is a local folder.
+
+    Its commands are run here, with the absolute paths in them moved under the root.
+    """
+
+    transport = None
+    is_connected = False
+
+    def __init__(self, root, **kwargs):
+        self.root = root
+        self.commands = []
+        self.client = self
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def put(self, remote, local):
+        if remote.endswith("/"):
+            remote += os.path.basename(local)
+        self.commands.append(f"put {remote}")
+        shutil.copy(local, f"{self.root}{remote}")
+
+    def get(self, remote, local):
+        self.commands.append(f"get {remote}")
+        shutil.copy(f"{self.root}{remote}", local)
+
+    def sftp(self):
+        return types.SimpleNamespace(stat=lambda path: os.stat(f"{self.root}{path}"))
+
+    def exec_command(self, command):
+        self.commands.append(command)
+        proc = subprocess.Popen(
+            command.replace(" /", f" {self.root}/"),
+            shell=True,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        channel = types.SimpleNamespace(shutdown_write=proc.stdin.close, recv_exit_status=proc.wait)
+        return (
+            types.SimpleNamespace(write=proc.stdin.write, channel=channel),
+            types.SimpleNamespace(read=proc.stdout.read, channel=channel),
+            proc.stderr,
+        )
+
+
+def test_session_pool(tmp_path):
+    from ansys.turbogrid.core.launcher.session_pool import tg_session_pool
+
+    launched = []
+
+    def stub_factory():
+        launched.append(StubTurboGrid())
+        return launched[-1]
+
+    with tg_session_pool(
+        2, session_factory=stub_factory, state_directory=str(tmp_path), health_check_interval=0.05
+    ) as pool:
+        with pool.session(timeout=5) as pytg:
+            pytg.set_obj_param("/MESH DATA", "Global Size Factor = 2")
+            assert pytg.get_state() != "blank"
+        assert pytg.get_state() == "blank"
+        assert pool.checked_out_count() == 0
+
+        # Sessions that die while idle or checked out are replaced.
+        first = pool.checkout(timeout=5)
+        second = pool.checkout(timeout=5)
+        with pytest.raises(TimeoutError):
+            pool.checkout(timeout=0.1)
+        first.quit()
+        pool.checkin(first)
+        pool.checkin(second)
+        deadline = time.time() + 5
+        while pool.idle_count() < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert pool.idle_count() == 2
+        assert len(launched) == 3
+        sessions = [pool.checkout(timeout=5), pool.checkout(timeout=5)]
+        assert first not in sessions
+        for pytg in sessions:
+            pool.checkin(pytg)
+
+    assert all(pytg.already_exited for pytg in launched)
+    with pytest.raises(RuntimeError, match="closed"):
+        pool.checkout(timeout=0.1)
+
+
+def test_session_pool_concurrent_refill(tmp_path):
+    import threading
+
+    from ansys.turbogrid.core.launcher.session_pool import tg_session_pool
+
+    launched = []
+
+    def stub_factory():
+        launched.append(StubTurboGrid())
+        return launched[-1]
+
+    with tg_session_pool(
+        2, session_factory=stub_factory, state_directory=str(tmp_path), health_check_interval=0.001
+    ) as pool:
+        stop = threading.Event()
+
+        def keep_refilling():
+            while not stop.is_set():
+                pool.refill()
+
+        refillers = [threading.Thread(target=keep_refilling) for i in range(2)]
+        for refiller in refillers:
+            refiller.start()
+        try:
+            for i in range(500):
+                with pool.session(timeout=5):
+                    pass
+        finally:
+            stop.set()
+            for refiller in refillers:
+                refiller.join()
+        # None of the sessions died, so none was ever launched beyond the size of the pool
+        assert len(launched) == 2
+
+    # Refills racing a close neither fail nor leave launches pending
+    pool = tg_session_pool(
+        2, session_factory=stub_factory, state_directory=str(tmp_path), health_check_interval=0.05
+    )
+    errors = []
+
+    def refill_until_closed():
+        try:
+            while not pool._closed:
+                pool.checkin(pool.checkout(timeout=5))
+        except RuntimeError as e:
+            if "closed" not in str(e):
+                errors.append(e)
+        except Exception as e:
+            errors.append(e)
+
+    refillers = [threading.Thread(target=refill_until_closed) for i in range(2)]
+    for refiller in refillers:
+        refiller.start()
+    time.sleep(0.05)
+    pool.close()
+    for refiller in refillers:
+        refiller.join()
+    assert errors == []
+    assert pool._pending == 0
+
+    # A closed pool is not kept alive by the exit handler
+    import gc
+    import weakref
+
+    pool._monitor.join()
+    pool_ref = weakref.ref(pool)
+    del pool, refillers
+    gc.collect()
+    assert pool_ref() is None
+
+
+def test_recycle_session(tmp_path, monkeypatch):
+    import queue
+
+    from ansys.turbogrid.core.launcher.session_pool import (
+        capture_blank_state,
+        get_blank_state_filename,
+        recycle_session,
+    )
+    from ansys.turbogrid.core.multi_blade_row import multi_blade_row_batch
+
+    pytg = StubTurboGrid()
+    blank_state_filename = get_blank_state_filename(str(tmp_path))
+    assert blank_state_filename != get_blank_state_filename(str(tmp_path))
+    blank_ccl_state = capture_blank_state(pytg, blank_state_filename)
+    pytg.set_obj_param("/MESH DATA", "Global Size Factor = 2")
+    assert recycle_session(pytg, blank_state_filename, blank_ccl_state)
+    assert pytg.get_state() == "blank"
+
+    # A session that cannot be verified clean, or is dead, must not be reused
+    assert not recycle_session(pytg, blank_state_filename, "another state")
+    pytg.quit()
+    assert not recycle_session(pytg, blank_state_filename, blank_ccl_state)
+
+    # A batch producer keeps its session from one blade row to the next
+    launched = []
+
+    def stub_creator(log_suffix):
+        launched.append(StubTurboGrid())
+        return launched[-1]
+
+    try:
+        first = multi_blade_row_batch.get_producer_session(stub_creator, "rotor", str(tmp_path))
+        first.set_obj_param("/MESH DATA", "Global Size Factor = 2")
+        second = multi_blade_row_batch.get_producer_session(stub_creator, "stator", str(tmp_path))
+        assert second is first and second.get_state() == "blank"
+        first.quit()
+        third = multi_blade_row_batch.get_producer_session(stub_creator, "stator", str(tmp_path))
+        assert third is not first and len(launched) == 2
+    finally:
+        multi_blade_row_batch.quit_producer_session()
+    assert launched[-1].already_exited
+    assert list(tmp_path.iterdir()) == [Path(blank_state_filename)]
+
+    # Unless it opts in, a batch producer launches a session per blade row and quits it
+    class StubBatchTurboGrid(StubTurboGrid):
+        def unsuspend(self, object):
+            pass
+
+        def save_mesh(self, filename):
+            pass
+
+    def stub_batch_creator(log_suffix):
+        launched.append(StubBatchTurboGrid())
+        return launched[-1]
+
+    def execute_blade_row(recycle_sessions):
+        progress_updates = queue.Queue()
+        multi_blade_row_batch.execute_blade_row_common(
+            "machine.tginit",
+            "rotor",
+            "rotor",
+            [],
+            progress_updates,
+            "deg",
+            3,
+            [],
+            stub_batch_creator,
+            lambda pytg: None,
+            None,
+            None,
+            None,
+            0,
+            None,
+            None,
+            recycle_sessions,
+        )
+        assert not any("Error" in update[1] for update in progress_updates.queue)
+
+    assert multi_blade_row_batch.MultiBladeRow.recycle_sessions is False
+    monkeypatch.setattr(multi_blade_row_batch, "write_mesh_report", lambda *args: None)
+    monkeypatch.chdir(tmp_path)
+    launched.clear()
+    for i in range(2):
+        execute_blade_row(False)
+    assert len(launched) == 2 and all(pytg.already_exited for pytg in launched)
+    try:
+        for i in range(2):
+            execute_blade_row(True)
+        assert len(launched) == 3 and not launched[-1].already_exited
+    finally:
+        multi_blade_row_batch.quit_producer_session()
+
+
+@pytest.mark.skipif(platform.system() != "Linux", reason="Process trees are read from /proc")
+def test_session_shutdown():
+    import threading
+
+    from ansys.turbogrid.core.launcher.session_shutdown import (
+        ShutdownOutcome,
+        get_process_tree,
+        kill_process_tree,
+        parse_process_parents,
+        shutdown_session,
+    )
+
+    assert parse_process_parents(
+        {12: "12 (cfx (tg) 5) S 7 12 12 0", 13: "13 (sleep) S 12 12 12 0"}
+    ) == {12: 7, 13: 12}
+
+    def is_gone(pid):
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                return f.read().rsplit(")", 1)[1].split()[0] == "Z"
+        except OSError:
+            return True
+
+    # Children are killed along with their parent rather than left behind
+    proc = subprocess.Popen(["sh", "-c", "sleep 60 & sleep 60 & wait"])
+    deadline = time.time() + 5
+    while len(get_process_tree(proc.pid)) < 3:
+        assert time.time() < deadline
+        time.sleep(0.01)
+    tree = get_process_tree(proc.pid)
+    assert kill_process_tree(proc.pid) == tree
+    proc.wait(5)
+    deadline = time.time() + 5
+    while not all(is_gone(pid) for pid in tree):
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+    class HungTurboGrid(StubTurboGrid):
+        def __init__(self, engine_proc=None):
+            super().__init__()
+            self.engine_proc = engine_proc
+            self.release = threading.Event()
+
+        def quit(self):
+            self.release.wait()
+
+    pytg = StubTurboGrid()
+    report = shutdown_session(pytg, timeout=5)
+    assert report.outcome == ShutdownOutcome.CLEAN and pytg.already_exited
+
+    pytg = HungTurboGrid(subprocess.Popen(["sleep", "60"]))
+    report = shutdown_session(pytg, timeout=0.1)
+    assert report.outcome == ShutdownOutcome.KILLED
+    assert "within 0.1 s" in report.error and report.elapsed < 5
+    assert pytg.engine_proc.returncode is not None and pytg.already_exited
+    pytg.release.set()
+
+    # Dead sessions are not quit, and sessions without a process can only be killed by a callable
+    assert shutdown_session(HungTurboGrid(pytg.engine_proc)).outcome == ShutdownOutcome.EXITED
+    pytg = HungTurboGrid()
+    assert shutdown_session(pytg, timeout=0.1).outcome == ShutdownOutcome.TIMED_OUT
+    killed = []
+    pytg = HungTurboGrid()
+    report = shutdown_session(pytg, timeout=0.1, kill=lambda: killed.append(pytg))
+    assert report.outcome == ShutdownOutcome.KILLED and killed == [pytg]
+
+
+@pytest.mark.skipif(platform.system() != "Linux", reason="Resources are read from /proc")
+def test_resource_sampler(tmp_path):
+    import json
+    import sys
+
+    from ansys.turbogrid.core.launcher.resource_sampler import (
+        RESOURCE_SAMPLE_FIELDS,
+        attach_resource_sampler,
+        export_resource_samples,
+        parse_proc_io,
+        parse_proc_stat,
+    )
+
+    stat = "42 (cfx (tg)) S 1 42 42 0 -1 0 0 0 0 0 7 3 2 1 20 0 5 0 100 1000 250"
+    assert parse_proc_stat(stat) == (13, 5, 250)
+    assert parse_proc_io("rchar: 10\nread_bytes: 4096\nwrite_bytes: 8192\n") == (4096, 8192)
+
+    # A process with a child, like cfxtg and its engine
+    proc = subprocess.Popen(
+        [sys.executable, "-c", "import subprocess, sys; subprocess.run(['sleep', '60'])"]
+    )
+    try:
+        pytg = StubTurboGrid()
+        pytg.engine_proc = proc
+        sampler = attach_resource_sampler(pytg, interval=0.01, capacity=5)
+        assert pytg.resource_sampler is sampler
+        deadline = time.time() + 5
+        while len(sampler.samples()) < 5 or sampler.samples()[-1]["processes"] < 2:
+            assert time.time() < deadline
+            time.sleep(0.01)
+        samples = sampler.samples()
+        # Only the latest samples are kept, oldest first
+        assert len(samples) == 5
+        assert [sample["time"] for sample in samples] == sorted(
+            sample["time"] for sample in samples
+        )
+        assert samples[-1]["rss"] > 0 and samples[-1]["threads"] >= 2
+        assert json.loads(sampler.to_json())[0].keys() == set(RESOURCE_SAMPLE_FIELDS)
+        assert sampler.to_csv().splitlines()[0] == ",".join(RESOURCE_SAMPLE_FIELDS)
+
+        export_resource_samples({"rotor": samples}, str(tmp_path / "samples.csv"))
+        lines = (tmp_path / "samples.csv").read_text().splitlines()
+        assert len(lines) == 6 and lines[1].startswith("rotor,")
+        with pytest.raises(ValueError, match=".json or .csv"):
+            export_resource_samples({"rotor": samples}, str(tmp_path / "samples.txt"))
+    finally:
+        proc.kill()
+        proc.wait()
+    # Sampling stops with the process
+    sampler._thread.join(5)
+    assert not sampler._thread.is_alive()
+    assert attach_resource_sampler(StubTurboGrid()) is None
+
+
+def test_admission_control(tmp_path, monkeypatch):
+    import sys
+
+    from ansys.turbogrid.core.launcher import admission_control
+    from ansys.turbogrid.core.launcher.session_shutdown import ShutdownOutcome, shutdown_session
+
+    assert admission_control.parse_meminfo("MemTotal: 16 kB\nMemAvailable: 8 kB\n") == 8192
+    assert admission_control.parse_meminfo("MemTotal: 16 kB\n") is None
+
+    controller = admission_control.admission_controller(
+        max_sessions=2,
+        memory_per_session=0,
+        cores_per_session=0,
+        lock_directory=str(tmp_path),
+        poll_interval=0.01,
+    )
+    first = controller.acquire()
+    second = controller.acquire()
+    assert {first.slot, second.slot} == {0, 1}
+    assert controller.try_acquire() is None
+    assert controller.get_usage()["sessions"] == 2
+    with pytest.raises(TimeoutError, match="No TurboGrid launch slot"):
+        controller.acquire(timeout=0.05)
+    first.release()
+    first.release()
+    assert first.released
+
+    # Another process of the host takes the free slot, and its death frees it
+    holder = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "import sys, time\n"
+            "from ansys.turbogrid.core.launcher.admission_control import admission_controller\n"
+            f"ticket = admission_controller(2, 0, 0, {str(tmp_path)!r}).acquire()\n"
+            "print(ticket.slot, flush=True)\n"
+            "time.sleep(60)\n",
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        assert int(holder.stdout.readline()) == first.slot
+        assert controller.try_acquire() is None
+    finally:
+        holder.kill()
+        holder.wait()
+    third = controller.acquire(timeout=5)
+    assert third.slot == first.slot
+
+    # A session holds its slot until it is shut down
+    pytg = StubTurboGrid()
+    admission_control.attach_session_resource(pytg, third)
+    assert shutdown_session(pytg).outcome == ShutdownOutcome.CLEAN
+    assert third.released and pytg.session_resources is None
+    second.release()
+
+    # Launches admitted recently count as using their memory already
+    monkeypatch.setattr(admission_control, "get_available_memory", lambda: 3 * 1024**3)
+    controller.memory_per_session = 2 * 1024**3
+    first = controller.try_acquire()
+    assert first is not None
+    assert controller.try_acquire() is None
+    controller.warmup_time = 0
+    second = controller.try_acquire()
+    assert second is not None
+    first.release()
+    second.release()
+    monkeypatch.setattr(admission_control, "get_available_memory", lambda: 1024**3)
+    assert controller.try_acquire() is None
+
+
+def test_license_seats():
+    import threading
+
+    from ansys.turbogrid.core.launcher.admission_control import attach_session_resource
+    from ansys.turbogrid.core.launcher.license_seats import (
+        license_seat_scheduler,
+        local_seat_provider,
+        parse_lmstat_seats,
+    )
+    from ansys.turbogrid.core.launcher.session_shutdown import shutdown_session
+
+    lmstat = "Users of cfd_base:  (Total of 25 licenses issued;  Total of 3 licenses in use)\n"
+    assert parse_lmstat_seats(lmstat, "cfd_base") == 22
+    assert parse_lmstat_seats(lmstat, "cfd_preppost") is None
+
+    provider = local_seat_provider(2)
+    scheduler = license_seat_scheduler(provider, settle_time=0, initial_backoff=0.01)
+
+    def start():
+        # Like TurboGrid, which fails when the license server has no seat for it
+        if not provider.checkout():
+            raise RuntimeError("No license seat")
+        return "session"
+
+    first = scheduler.launch(start)[1]
+    second = scheduler.launch(start)[1]
+    assert scheduler.held == 2
+    with pytest.raises(TimeoutError, match="No license seat became available"):
+        scheduler.acquire(timeout=0.05)
+
+    # Launches queued meanwhile get the seats in the order they asked for them
+    served = []
+
+    def queued_launch(name):
+        served.append((name, scheduler.launch(start)[1]))
+
+    threads = []
+    for name in ["a", "b"]:
+        threads.append(threading.Thread(target=queued_launch, args=(name,)))
+        threads[-1].start()
+        while scheduler.queued < len(threads):
+            time.sleep(0.01)
+    for grant in [first, second]:
+        provider.checkin()
+        grant.release()
+        while len(served) < [first, second].index(grant) + 1:
+            time.sleep(0.01)
+    for thread in threads:
+        thread.join()
+    assert [name for name, grant in served] == ["a", "b"]
+    assert all(grant.waited > 0 for name, grant in served)
+    assert first.released and scheduler.held == 2
+
+    # A seat taken on the server by somebody else meanwhile fails the launch,
+    # which is queued again
+    for name, grant in served:
+        provider.checkin()
+        grant.release()
+    attempts = []
+
+    def start_after_somebody_else():
+        attempts.append(time.perf_counter())
+        if len(attempts) == 1:
+            raise RuntimeError("No license seat")
+        return "session"
+
+    session, grant = scheduler.launch(start_after_somebody_else)
+    assert session == "session" and len(attempts) == 2
+    assert grant.waited >= 0.01 and scheduler.held == 1
+    attempts.clear()
+    with pytest.raises(RuntimeError, match="No license seat"):
+        scheduler.launch(start_after_somebody_else, max_attempts=1)
+    assert scheduler.held == 1
+
+    # A session holds its seat until it is shut down
+    pytg = StubTurboGrid()
+    attach_session_resource(pytg, grant)
+    shutdown_session(pytg)
+    assert grant.released and scheduler.held == 0
+
+
+@pytest.mark.skipif(platform.system() != "Linux", reason="listening ports are read from /proc")
+def test_remote_hosts(tmp_path):
+    import json
+    import sys
+
+    from ansys.turbogrid.core.launcher.deploy_tg_container import dispose_tg_containers
+    from ansys.turbogrid.core.launcher.port_helpers import get_listening_ports
+    from ansys.turbogrid.core.launcher.remote_hosts import (
+        PlacementPolicy,
+        host_inventory,
+        remote_tg_process,
+        tg_host,
+    )
+
+    # A cfxtg that only listens on its control port
+    cfxtg = tmp_path / "cfxtg"
+    cfxtg.write_text(
+        f"#!{sys.executable}\n"
+        "import socket, sys, time\n"
+        "port = int(sys.argv[sys.argv.index('-control-port') + 1])\n"
+        "server = socket.create_server(('127.0.0.1', port))\n"
+        "print('listening', flush=True)\n"
+        "time.sleep(60)\n"
+    )
+    cfxtg.chmod(0o755)
+
+    # Several local hosts, with their own working directories, stand in for remote ones
+    hosts = [
+        tg_host(f"host_{i}", str(cfxtg), str(tmp_path / f"host_{i}"), ssh_port=None, max_sessions=2)
+        for i in range(3)
+    ]
+    with pytest.raises(ValueError):
+        host_inventory([])
+    with pytest.raises(ValueError):
+        host_inventory(hosts + hosts[:1])
+
+    inventory = host_inventory(hosts)
+    assert [inventory.place().name for i in range(4)] == ["host_0", "host_1", "host_2", "host_0"]
+    inventory.release(hosts[1])
+    assert inventory.place().name == "host_1"
+    # Full hosts are skipped
+    assert [inventory.place().name for i in range(2)] == ["host_2", "host_1"]
+    with pytest.raises(RuntimeError, match="full"):
+        inventory.place()
+
+    inventory = host_inventory(hosts, PlacementPolicy.LEAST_LOADED)
+    hosts[2].max_sessions = 4
+    assert [inventory.place().name for i in range(4)] == ["host_0", "host_1", "host_2", "host_2"]
+    inventory.release(hosts[0])
+    assert inventory.place().name == "host_0"
+    assert inventory.get_loads() == {"host_0": 1, "host_1": 1, "host_2": 2}
+
+    inventory_file = tmp_path / "hosts.json"
+    inventory_file.write_text(
+        json.dumps(
+            {
+                "policy": "least_loaded",
+                "hosts": [
+                    {
+                        "name": host.name,
+                        "cfxtg_path": str(cfxtg),
+                        "working_directory": host.working_directory,
+                        "ssh_port": None,
+                    }
+                    for host in hosts
+                ],
+            }
+        )
+    )
+    inventory = host_inventory.from_file(str(inventory_file))
+    assert inventory.policy == PlacementPolicy.LEAST_LOADED
+    assert [host.name for host in inventory.hosts] == ["host_0", "host_1", "host_2"]
+    assert inventory.hosts[0].is_local
+
+    # Files are routed to the working directory of a host, and back
+    input_file = tmp_path / "row.tginit"
+    input_file.write_text("tginit")
+    (remote_path,) = hosts[1].put_files([str(input_file)])
+    assert remote_path == f"{hosts[1].working_directory}/row.tginit"
+    assert Path(remote_path).read_text() == "tginit"
+    output_directory = tmp_path / "output"
+    output_directory.mkdir()
+    hosts[1].get_files(["row.tginit"], str(output_directory))
+    assert (output_directory / "row.tginit").read_text() == "tginit"
+
+    inventory = host_inventory(hosts)
+    processes = [remote_tg_process(inventory, f"_row_{i}") for i in range(2)]
+    try:
+        assert [process.host.name for process in processes] == ["host_0", "host_1"]
+        assert {process.socket_port for process in processes} <= get_listening_ports()
+        assert all(process.is_alive() for process in processes)
+        assert (Path(hosts[1].working_directory) / "TurboGridProcessLog_row_1.txt").is_file()
+    finally:
+        dispose_tg_containers(processes)
+    assert not any(process.is_alive() for process in processes)
+    assert all(process.disposed for process in processes)
+    assert inventory.get_loads() == {"host_0": 0, "host_1": 0, "host_2": 0}
+
+    # A cfxtg that exits is reported without waiting for the deadline, and its place released
+    broken_host = tg_host("broken", sys.executable, str(tmp_path / "broken"), ssh_port=None)
+    inventory = host_inventory([broken_host])
+    start = time.perf_counter()
+    with pytest.raises(RuntimeError):
+        remote_tg_process(inventory, ready_timeout=30)
+    assert time.perf_counter() - start < 10
+    assert inventory.get_loads() == {"broken": 0}
+
+
+@pytest.mark.skipif(platform.system() == "Windows", reason="the fake docker is a script")
+def test_image_cache(tmp_path, monkeypatch):
+    import sys
+    import threading
+
+    from ansys.turbogrid.core.launcher.image_cache import image_cache, parse_image_digest
+
+    assert parse_image_digest("sha256:abc\n") == "sha256:abc"
+    assert parse_image_digest("") is None
+    assert parse_image_digest("Error: No such image: tg") is None
+
+    # A docker that logs its pulls, and keeps the digest of each image in a file
+    images = tmp_path / "images"
+    images.mkdir()
+    pulls = tmp_path / "pulls.txt"
+    docker = tmp_path / "bin" / "docker"
+    docker.parent.mkdir()
+    docker.write_text(
+        f"#!{sys.executable}\n"
+        "import pathlib, sys, time\n"
+        f"images = pathlib.Path({str(images)!r})\n"
+        "image = sys.argv[-1]\n"
+        "digest_file = images / image.replace(':', '_').replace('/', '_')\n"
+        "if sys.argv[1] == 'pull':\n"
+        f"    with open({str(pulls)!r}, 'a') as f:\n"
+        "        f.write(image + '\\n')\n"
+        "    time.sleep(0.2)\n"
+        "    if not image.startswith('registry/'):\n"
+        "        sys.exit('pull access denied for ' + image)\n"
+        "    if not digest_file.exists():\n"
+        "        digest_file.write_text('sha256:' + image)\n"
+        "elif digest_file.exists():\n"
+        "    print(digest_file.read_text())\n"
+        "else:\n"
+        "    sys.exit('Error: No such image: ' + image)\n"
+    )
+    docker.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{docker.parent}{os.pathsep}{os.environ['PATH']}")
+
+    def pulled() -> list[str]:
+        return pulls.read_text().splitlines() if pulls.exists() else []
+
+    cache = image_cache(prepend_command="")
+    # Concurrent launches wait for the one pull in flight
+    digests = []
+    threads = [
+        threading.Thread(target=lambda: digests.append(cache.prepare("registry/tg:1")))
+        for i in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert digests == ["sha256:registry/tg:1"] * 4
+    assert pulled() == ["registry/tg:1"]
+
+    # Other processes use the local image without pulling it, even if the tag has moved on
+    (images / "registry_tg_1").write_text("sha256:other")
+    assert image_cache(prepend_command="").prepare("registry/tg:1") == "sha256:other"
+    assert pulled() == ["registry/tg:1"]
+    # Only a refresh pulls an image that is on the host already
+    assert cache.prepare("registry/tg:1", refresh=True) == "sha256:other"
+    assert len(pulled()) == 2
+
+    # Images built locally are used without trying to pull them
+    (images / "tg_local").write_text("sha256:local")
+    assert cache.prepare("tg:local") == "sha256:local"
+    assert "tg:local" not in pulled()
+    with pytest.raises(RuntimeError, match="pull access denied"):
+        cache.prepare("tg:missing")
+    # A failed preparation is tried again
+    with pytest.raises(RuntimeError):
+        cache.prepare("tg:missing")
+    assert pulled().count("tg:missing") == 2
+
+
+def test_launch_scheduler():
+    import threading
+
+    from ansys.turbogrid.core.launcher.launch_scheduler import staggered_launch_scheduler
+
+    scheduler = staggered_launch_scheduler(stagger=1.0, jitter=0.0)
+    assert scheduler.get_start_delays(3) == [0.0, 1.0, 2.0]
+    scheduler = staggered_launch_scheduler(stagger=1.0, jitter=0.0, ramp_up=2)
+    assert scheduler.get_start_delays(4) == [0.0, 1.0, 1.0, 1.0]
+    delays = staggered_launch_scheduler(stagger=1.0, jitter=0.5, seed=3).get_start_delays(3)
+    assert delays == staggered_launch_scheduler(stagger=1.0, jitter=0.5, seed=3).get_start_delays(3)
+    for i, delay in enumerate(delays):
+        assert i <= delay <= i + 0.5
+    with pytest.raises(ValueError):
+        staggered_launch_scheduler(stagger=-1.0)
+    with pytest.raises(ValueError):
+        staggered_launch_scheduler(contended_concurrency=0)
+
+    # The launches run concurrently, except in the contended phase
+    scheduler = staggered_launch_scheduler(stagger=0.01, jitter=0.0)
+    lock = threading.Lock()
+    running = {"launch": 0, "read": 0}
+    most = {"launch": 0, "read": 0}
+
+    def step(phase):
+        with lock:
+            running[phase] += 1
+            most[phase] = max(most[phase], running[phase])
+        time.sleep(0.05)
+        with lock:
+            running[phase] -= 1
+
+    def launch():
+        step("launch")
+        with scheduler.contended("read"):
+            step("read")
+
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=scheduler.delayed(launch, delay))
+        for delay in scheduler.get_start_delays(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert most == {"launch": 4, "read": 1}
+    # Below the 0.4 s of running the launches one after the other
+    assert time.perf_counter() - start < 0.4
+
+    # Without contention, nothing is held back
+    scheduler = staggered_launch_scheduler(stagger=0.0, jitter=0.0, contended_concurrency=None)
+    running["read"] = most["read"] = 0
+    threads = [threading.Thread(target=launch) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert most["read"] == 3
+
+
+def test_container_connection_pool():
+
+    from ansys.turbogrid.core.launcher.container_helpers import container_connection_pool
+
+    pool = container_connection_pool(idle_timeout=60.0)
+    connection = pool.get(2222, "key")
+    assert pool.get(2222, "key") is connection
+    assert pool.get(2222, "other_key") is not connection
+    assert pool.get(2223, "key", "tg_host") is not connection
+    assert len(pool) == 3
+    assert pool.close_idle() == 0
+
+    # A connection in use is not closed as idle
+    pool.idle_timeout = 0.0
+    with pool.using(connection):
+        assert pool.close_idle() == 2
+        assert pool.get(2222, "key") is connection
+    assert pool.close_idle() == 1
+    assert len(pool) == 0
+
+    # A dropped connection is replaced
+    connection = pool.get(2222, "key")
+    connection.transport = types.SimpleNamespace(active=False)
+    assert pool.get(2222, "key") is not connection
+
+    # The idle connections are closed in the background
+    pool = container_connection_pool(idle_timeout=0.05)
+    pool.get(2222, "key")
+    deadline = time.time() + 5.0
+    while len(pool) and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(pool) == 0
+    pool.get(2222, "key")
+    pool.close()
+    assert len(pool) == 0
+
+
+def test_bulk_transfer_to_container(tmp_path):
+    import io
+    import tarfile
+
+    from ansys.turbogrid.core.launcher.container_helpers import (
+        container_helpers,
+        write_file_archive,
+    )
+
+    local = tmp_path / "local"
+    local.mkdir()
+    filenames = ["row.inf", "row_hub.crv", "row_shroud.crv", "row_profile.crv"]
+    for filename in filenames:
+        (local / filename).write_text(filename * 100)
+    output = io.BytesIO()
+    size = write_file_archive([str(local / filename) for filename in filenames], output)
+    assert size == len(output.getvalue())
+    with tarfile.open(fileobj=io.BytesIO(output.getvalue())) as archive:
+        assert archive.getnames() == filenames
+
+    remote = tmp_path / "remote"
+    remote.mkdir()
+    connection = StubConnection(remote)
+    container_helpers.transfer_files_to_container(connection, str(local), filenames)
+    # One round trip, however many files
+    assert len(connection.commands) == 1
+    for filename in filenames:
+        assert (remote / filename).read_text() == filename * 100
+
+    with pytest.raises(RuntimeError):
+        container_helpers.transfer_archive_to_container(
+            StubConnection(tmp_path / "missing"), [str(local / filenames[0])]
+        )
+
+
+def test_upload_dedup(tmp_path, monkeypatch):
+    import functools
+
+    from ansys.turbogrid.core.launcher import container_helpers as container_helpers_module
+    from ansys.turbogrid.core.launcher.container_helpers import (
+        container_connection_pool,
+        container_helpers,
+        get_file_hash,
+    )
+
+    remote = tmp_path / "remote"
+    remote.mkdir()
+    monkeypatch.setattr(
+        container_helpers_module, "Connection", functools.partial(StubConnection, remote)
+    )
+    monkeypatch.setattr(container_helpers_module, "_connection_pool", container_connection_pool())
+
+    local = tmp_path / "local"
+    local.mkdir()
+    (local / "machine.tginit").write_text("tginit")
+    (local / "machine.x_b").write_bytes(b"parasolid" * 1000)
+    assert get_file_hash(str(local / "machine.tginit")) == get_file_hash(
+        str(local / "machine.tginit")
+    )
+
+    connection = container_helpers.get_container_connection(2222, "key")
+    filenames = ["machine.tginit", "machine.x_b"]
+
+    def uploads():
+        return [command for command in connection.commands if "stat" not in command]
+
+    container_helpers.transfer_files_to_container(connection, str(local), filenames)
+    assert connection.commands == ["tar -xf - -C /"]
+    # Unchanged files are not uploaded again, and are all checked in one round trip
+    connection.sftp = None
+    container_helpers.transfer_files_to_container(connection, str(local), filenames)
+    assert len(connection.commands) == 2
+    assert "/machine.tginit /machine.x_b" in connection.commands[-1]
+    container_helpers.transfer_file_to_container(connection, str(local / "machine.x_b"))
+    assert uploads() == ["tar -xf - -C /"]
+
+    # Changed files are
+    (local / "machine.tginit").write_text("changed tginit")
+    container_helpers.transfer_files_to_container(connection, str(local), filenames)
+    assert uploads() == ["tar -xf - -C /", "put /machine.tginit"]
+    assert (remote / "machine.tginit").read_text() == "changed tginit"
+
+    # So are files that are not in the container anymore, or not from the manifest
+    (remote / "machine.x_b").unlink()
+    container_helpers.transfer_files_to_container(connection, str(local), filenames)
+    assert uploads() == ["tar -xf - -C /", "put /machine.tginit", "put /machine.x_b"]
+    container_helpers.transfer_file_to_container(connection, str(local / "machine.x_b"), False)
+    assert uploads()[-1] == "put /machine.x_b"
+    other = container_helpers.get_container_connection(2223, "key")
+    container_helpers.transfer_files_to_container(other, str(local), filenames)
+    assert other.commands == ["tar -xf - -C /"]
+
+
+def test_wait_for_file_in_container(tmp_path):
+    import threading
+
+    from ansys.turbogrid.core.launcher.container_helpers import container_helpers
+
+    # Stands in for a connection to a container, whose root is tmp_path
+    connection = types.SimpleNamespace(
+        sftp=lambda: types.SimpleNamespace(stat=lambda path: os.stat(str(tmp_path) + path))
+    )
+    with pytest.raises(TimeoutError, match="does not exist"):
+        container_helpers.wait_for_file_in_container(connection, "rotor.def", max_checks=3)
+
+    # The file is only returned once it stops growing
+    def write_mesh():
+        with open(tmp_path / "rotor.def", "wb") as f:
+            for _ in range(5):
+                f.write(b"mesh" * 1000)
+                f.flush()
+                time.sleep(0.01)
+
+    writer = threading.Thread(target=write_mesh)
+    writer.start()
+    size = container_helpers.wait_for_file_in_container(
+        connection, "rotor.def", initial_delay=0.05, max_delay=0.05
+    )
+    writer.join()
+    assert size == 20000
+
+    # Neither an empty file nor a writer that pauses is taken for done
+    (tmp_path / "rotor.tst").write_bytes(b"")
+    with pytest.raises(TimeoutError, match="still empty"):
+        container_helpers.wait_for_file_in_container(
+            connection, "rotor.tst", max_checks=5, initial_delay=0.001
+        )
+
+    def write_state():
+        with open(tmp_path / "rotor.tst", "wb") as f:
+            f.write(b"state")
+            f.flush()
+            time.sleep(0.3)
+            f.write(b"state")
+
+    writer = threading.Thread(target=write_state)
+    writer.start()
+    size = container_helpers.wait_for_file_in_container(
+        connection, "rotor.tst", initial_delay=0.05, max_delay=0.05
+    )
+    writer.join()
+    assert size == 10
+
+    # A file that keeps growing is not transferred
+    sizes = iter(range(100))
+    growing = types.SimpleNamespace(
+        sftp=lambda: types.SimpleNamespace(
+            stat=lambda path: os.stat_result([0] * 6 + [next(sizes)] + [0] * 3)
+        )
+    )
+    with pytest.raises(TimeoutError, match="still growing"):
+        container_helpers.wait_for_file_in_container(
+            growing, "rotor.tst", max_checks=5, initial_delay=0.001
+        )
+
+
+def test_transfer_compression(tmp_path, monkeypatch):
+    import io
+
+    from ansys.turbogrid.core.launcher import container_helpers as container_helpers_module
+    from ansys.turbogrid.core.launcher.container_helpers import (
+        container_helpers,
+        transfer_compression,
+        write_file_archive,
+    )
+
+    compression = transfer_compression(level=6, min_size=1000)
+    assert compression.should_compress("machine.X_B", 1000)
+    assert not compression.should_compress("machine.x_b", 999)
+    assert not compression.should_compress("machine.png", 1000)
+    assert not transfer_compression(level=0).should_compress("machine.x_b", 1 << 30)
+    monkeypatch.setenv("PYTURBOGRID_TRANSFER_COMPRESSION", "9")
+    assert transfer_compression().level == 9
+    with pytest.raises(ValueError):
+        transfer_compression(level=10)
+
+    local = tmp_path / "local"
+    local.mkdir()
+    (local / "machine.x_b").write_bytes(b"parasolid body " * 10000)
+    (local / "machine.tginit").write_text("tginit")
+    filepaths = [str(local / "machine.x_b"), str(local / "machine.tginit")]
+    plain, compressed = io.BytesIO(), io.BytesIO()
+    assert write_file_archive(filepaths, compressed, 6) < write_file_archive(filepaths, plain) / 10
+
+    remote = tmp_path / "remote"
+    remote.mkdir()
+
+    monkeypatch.setattr(container_helpers_module, "_transfer_compression", compression)
+    connection = StubConnection(remote)
+    commands = connection.commands
+    container_helpers.transfer_files_to_container(connection, None, filepaths, dedup=False)
+    # The small tginit goes in a plain archive, and the CAD file in a gzipped one
+    assert commands == ["tar -xf - -C /", "tar -xzf - -C /"]
+    container_helpers.transfer_file_to_container(connection, filepaths[0], dedup=False)
+    assert commands[-1] == "gzip -dc > /machine.x_b"
+    assert (remote / "machine.x_b").read_bytes() == (local / "machine.x_b").read_bytes()
+    assert (remote / "machine.tginit").read_text() == "tginit"
+
+    (remote / "rotor.def").write_bytes(b"mesh " * 10000)
+    (remote / "rotor.tst").write_text("state")
+    results = tmp_path / "results"
+    results.mkdir()
+    container_helpers.transfer_files_from_container(
+        connection, str(results), ["rotor.def", "rotor.tst"]
+    )
+    assert commands[-2:] == ["gzip -c -6 /rotor.def", "get /rotor.tst"]
+    assert (results / "rotor.def").read_bytes() == (remote / "rotor.def").read_bytes()
+
+    # Without gzip in the container, files are transferred as is
+    connection.exec_command = lambda command: StubConnection.exec_command(connection, "exit 127")
+    container_helpers.transfer_file_from_container(connection, "rotor.def", str(results))
+    assert commands[-2:] == ["exit 127", "get /rotor.def"]
+    container_helpers.transfer_file_to_container(connection, filepaths[0], dedup=False)
+    assert commands[-2:] == ["exit 127", "put /machine.x_b"]
+
+
+def test_shared_work_dir(tmp_path, monkeypatch):
+    import warnings
+
+    from ansys.turbogrid.core.launcher import deploy_tg_container
+    from ansys.turbogrid.core.launcher import shared_work_dir as shared_work_dir_module
+    from ansys.turbogrid.core.launcher.shared_work_dir import is_local_docker, shared_work_dir
+
+    work_dir = shared_work_dir(str(tmp_path / "work"), subdirectory="mbr")
+    files = tmp_path / "work" / "mbr"
+    assert os.path.isdir(files)
+    inputs = tmp_path / "inputs"
+    inputs.mkdir()
+    (inputs / "case.tginit").write_text("tginit")
+    (inputs / "case.x_b").write_bytes(b"cad" * 1000)
+    paths = work_dir.put_files([str(inputs / "case.tginit"), str(inputs / "case.x_b")])
+    assert paths == ["/pytg_work/mbr/case.tginit", "/pytg_work/mbr/case.x_b"]
+    assert (files / "case.x_b").read_bytes() == b"cad" * 1000
+    # Copies, so that TG writing in the directory leaves the originals alone
+    (files / "case.tginit").write_text("written by TG")
+    assert (inputs / "case.tginit").read_text() == "tginit"
+    # A file already in the directory is not copied again
+    os.utime(inputs / "case.x_b", ns=(1, 1))
+    work_dir.put_files([str(inputs / "case.x_b")])
+    copied = os.stat(files / "case.x_b")
+    (files / "case.x_b").write_bytes(b"CAD" * 1000)
+    os.utime(files / "case.x_b", ns=(copied.st_atime_ns, copied.st_mtime_ns))
+    work_dir.put_files([str(inputs / "case.x_b")])
+    assert (files / "case.x_b").read_bytes() == b"CAD" * 1000
+    assert not [name for name in os.listdir(files) if name.endswith(".tmp")]
+
+    # Files written by TG are read from the directory
+    outputs = tmp_path / "outputs"
+    outputs.mkdir()
+    assert work_dir.get_files(["case.tginit"], str(outputs)) == [str(outputs / "case.tginit")]
+    assert (outputs / "case.tginit").read_text() == "written by TG"
+    with pytest.raises(FileNotFoundError, match="missing.def"):
+        work_dir.get_files(["missing.def"], str(outputs))
+
+    # Users of the same directory with inputs of the same name do not replace each other's
+    other_inputs = tmp_path / "other_inputs"
+    other_inputs.mkdir()
+    for model in [inputs, other_inputs]:
+        (model / "hub.crv").write_text(f"hub of {model.name}")
+    first, second = shared_work_dir(str(tmp_path / "work")), shared_work_dir(str(tmp_path / "work"))
+    assert first.get_volumes() == second.get_volumes() == work_dir.get_volumes()
+    first_path = first.put_files([str(inputs / "hub.crv")])[0]
+    second_path = second.put_files([str(other_inputs / "hub.crv")])[0]
+    assert first_path != second_path
+    assert Path(first.get_host_path("hub.crv")).read_text() == "hub of inputs"
+    assert Path(second.get_host_path("hub.crv")).read_text() == "hub of other_inputs"
+    first.remove()
+    assert not os.path.exists(first.get_host_path(""))
+    assert os.path.isfile(second.get_host_path("hub.crv"))
+
+    # The directory is mounted in the container, and only reused with the same mount
+    container = deploy_tg_container.deployed_tg_container(
+        "tg_image",
+        40002,
+        40001,
+        "cfxtg",
+        "license_server",
+        "tg_test",
+        start=False,
+        log_filename=str(tmp_path / "tg_testLog.txt"),
+        shared_work_dir=work_dir,
+    )
+    container.disposed = True
+    assert f'-v "{work_dir.host_path}:/pytg_work" ' in container.docker_command
+    assert container.shared_work_dir is work_dir
+    signature = deploy_tg_container.get_tg_container_signature(
+        "tg_image", "cfxtg", "252", "1055@license", {}
+    )
+    assert signature != deploy_tg_container.get_tg_container_signature(
+        "tg_image", "cfxtg", "252", "1055@license", {}, work_dir.get_volumes()
+    )
+
+    # A remote docker daemon cannot mount a directory of this host, which is warned about once
+    monkeypatch.setenv("DOCKER_HOST", "unix:///var/run/docker.sock")
+    assert is_local_docker(warn=True)
+    monkeypatch.setenv("DOCKER_HOST", "tcp://build-server:2376")
+    monkeypatch.setattr(shared_work_dir_module, "_remote_docker_warned", False)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        assert not is_local_docker(warn=True)
+        assert not is_local_docker(warn=True)
+    assert [str(warning.message) for warning in caught] == [
+        "Docker runs the containers on tcp://build-server:2376, which cannot mount a directory "
+        "of this host, so files are copied to the containers over SSH instead"
+    ]
+
+
+def test_wait_for_ports():
+    from ansys.turbogrid.core.launcher import port_helpers
+
+    proc_net_tcp = (
+        "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt\n"
+        "   0: 00000000:1F90 00000000:0000 0A 00000000:00000000 00:00000000 00000000\n"
+        "   1: 0100007F:1F91 0100007F:9C40 01 00000000:00000000 00:00000000 00000000\n"
+    )
+    assert port_helpers.parse_listening_ports(proc_net_tcp) == {8080}
+
+    polls = []
+
+    def listening_after_three_polls():
+        polls.append(time.perf_counter())
+        return {8080, 8081} if len(polls) >= 3 else {8080}
+
+    elapsed = port_helpers.wait_for_ports(
+        [8080, 8081], listening_after_three_polls, deadline=5, initial_delay=0.01
+    )
+    assert len(polls) == 3
+    assert 0.03 <= elapsed < 1
+
+    with pytest.raises(TimeoutError, match=r"\[8081\] were not ready"):
+        port_helpers.wait_for_ports([8080, 8081], lambda: {8080}, deadline=0.1)
+
+    with pytest.raises(RuntimeError, match="exited"):
+        port_helpers.wait_for_ports([8081], lambda: set(), is_alive=lambda: False)
+
+
+def test_port_allocator():
+    import concurrent.futures
+    import socket
+
+    from ansys.turbogrid.core.launcher import port_helpers
+
+    allocator = port_helpers.port_allocator()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        reservations = list(executor.map(allocator.reserve, [3] * 8))
+    ports = [port for reservation in reservations for port in reservation.ports]
+    assert len(ports) == len(set(ports)) == 24
+    assert allocator.reserved_ports() == set(ports)
+
+    # Reserved ports are held until the sockets are released
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        with pytest.raises(OSError):
+            s.bind(("", ports[0]))
+    reservations[0].release_sockets()
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("", ports[0]))
+    assert ports[0] in allocator.reserved_ports()
+
+    for reservation in reservations:
+        reservation.release()
+    assert allocator.reserved_ports() == set()
+
+    # A reservation that is dropped without being released gives its ports back
+    dropped = allocator.reserve(2)
+    assert len(allocator.reserved_ports()) == 2
+    del dropped
+    assert allocator.reserved_ports() == set()
+
+    # Ports for TurboGrid are reserved until they are bound, and not held after that
+    from ansys.turbogrid.core.launcher import container_helpers
+
+    reserved = port_helpers.get_port_allocator().reserved_ports()
+    reservation = container_helpers.reserve_open_port()
+    port = reservation.ports[0]
+    assert port in port_helpers.get_port_allocator().reserved_ports()
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("", port))
+    reservation.release()
+    with pytest.warns(DeprecationWarning, match="reserve_open_port"):
+        container_helpers.get_open_port()
+    assert port_helpers.get_port_allocator().reserved_ports() == reserved
+
+
+def test_launch_turbogrid_async(monkeypatch):
+    import asyncio
+
+    with pytest.raises(TypeError, match="got an unexpected keyword argument"):
+        asyncio.run(launcher.launch_turbogrid_async(bad_arg="value"))
+
+    # The launch goes through launch_turbogrid, off the event loop
+    import threading
+
+    launched = []
+
+    def stub_launch_turbogrid(**launch_kwargs):
+        launched.append((threading.current_thread(), launch_kwargs))
+        return StubTurboGrid()
+
+    monkeypatch.setattr(launcher, "launch_turbogrid", stub_launch_turbogrid)
+    admission_control = object()
+    pytg = asyncio.run(
+        launcher.launch_turbogrid_async(
+            turbogrid_path="cfxtg", admission_control=admission_control, log_filename_suffix="_1"
+        )
+    )
+    assert isinstance(pytg, StubTurboGrid)
+    assert launched[0][0] is not threading.main_thread()
+    assert launched[0][1] == {
+        "turbogrid_path": "cfxtg",
+        "admission_control": admission_control,
+        "log_filename_suffix": "_1",
+    }
+
+    async def stub_launcher(delay, log_filename_suffix):
+        index = int(log_filename_suffix.rsplit("_", 1)[1])
+        await asyncio.sleep(delay * (3 - index))
+        if index == 1:
+            raise RuntimeError("no license")
+        return StubTurboGrid()
+
+    async def collect():
+        return [
+            result
+            async for result in launcher.launch_turbogrid_sessions_async(
+                3, session_launcher=stub_launcher, delay=0.05
+            )
+        ]
+
+    results = asyncio.run(collect())
+    assert [result.index for result in results] == [2, 1, 0]
+    assert [result.ok for result in results] == [True, False, True]
+    assert isinstance(results[1].error, RuntimeError)
+    assert isinstance(results[0].session, StubTurboGrid)
+
+
+def test_dispose_tg_containers(tmp_path):
+    from ansys.turbogrid.core.launcher.deploy_tg_container import (
+        deployed_tg_container,
+        dispose_tg_containers,
+    )
+    from ansys.turbogrid.core.launcher.port_helpers import get_port_allocator
+
+    containers = []
+    for i, keep_stopped_container in enumerate([False, False, True]):
+        reservation = get_port_allocator().reserve(2)
+        container = deployed_tg_container(
+            "tg_image",
+            reservation.ports[1],
+            reservation.ports[0],
+            "cfxtg",
+            "license_server",
+            f"tg_test_{i}",
+            keep_stopped_container,
+            port_reservation=reservation,
+            start=False,
+            log_filename=str(tmp_path / f"tg_test_{i}Log.txt"),
+        )
+        # Print the docker commands instead of running them
+        container.prepend_command = "echo"
+        containers.append(container)
+    ports = {container.socket_port for container in containers}
+
+    docker_procs = dispose_tg_containers(containers + [None])
+    assert [docker_proc.args for docker_proc in docker_procs] == [
+        "echo docker container rm -fv tg_test_0 tg_test_1",
+        "echo docker container stop -t 1 tg_test_2",
+    ]
+    assert all(docker_proc.returncode == 0 for docker_proc in docker_procs)
+    assert all(container.disposed for container in containers)
+    assert not ports & get_port_allocator().reserved_ports()
+    # Disposing again, or on garbage collection, does nothing
+    assert dispose_tg_containers(containers) == []
+
+
+def test_stopped_tg_containers():
+    import socket
+
+    from ansys.turbogrid.core.launcher import deploy_tg_container, port_helpers
+
+    signature = deploy_tg_container.get_tg_container_signature(
+        "tg_image", "cfxtg", "252", "1055@license", {"A": "1", "B": "2"}
+    )
+    assert signature == deploy_tg_container.get_tg_container_signature(
+        "tg_image", "cfxtg", 252, "1055@license", {"B": "2", "A": "1"}
+    )
+    assert signature != deploy_tg_container.get_tg_container_signature(
+        "tg_image", "cfxtg", "252", "1055@license", {"A": "1"}
+    )
+
+    docker_ps_output = (
+        f"tg_1 pyturbogrid.ftp_port=40001,pyturbogrid.signature={signature},"
+        f"pyturbogrid.socket_port=40002\n"
+        f"not_tg maintainer=someone\n"
+    )
+    assert deploy_tg_container.parse_tg_container_list(docker_ps_output) == [("tg_1", 40001, 40002)]
+
+    # A stopped container can only be brought back if its ports are free
+    allocator = port_helpers.port_allocator()
+    reservation = allocator.reserve(2)
+    reservation.release_sockets()
+    with pytest.raises(OSError, match="reserved already"):
+        allocator.reserve_ports(reservation.ports)
+    reservation.release()
+    reservation = allocator.reserve_ports(reservation.ports)
+    assert allocator.reserved_ports() == set(reservation.ports)
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("", 0))
+        with pytest.raises(OSError):
+            allocator.reserve_ports([s.getsockname()[1]])
+    reservation.release()
+    assert allocator.reserved_ports() == set()
+
+
+def test_install_discovery(tmp_path, monkeypatch):
+    from ansys.turbogrid.core.launcher import discovery
+
+    bin_dir = tmp_path / "v252" / "TurboGrid" / "bin"
+    bin_dir.mkdir(parents=True)
+    for command in ["cfxtg", "cfxtgpynoviewer"]:
+        (bin_dir / command).write_text("")
+        (bin_dir / command).chmod(0o755)
+    exe_path = str(bin_dir / "cfxtg")
+    cache_path = tmp_path / "installs.json"
+
+    # The file cache is opt-in, and never used for an explicit path
+    monkeypatch.delenv("PYTURBOGRID_DISCOVERY_CACHE", raising=False)
+    assert discovery.get_discovery_cache_path() is None
+    install = discovery.install_discovery(cache_path).get_install(turbogrid_path=exe_path)
+    assert install.exe_path == Path(exe_path)
+    assert install.version == "25.2.0"
+    assert install.features == {"cfxtg", "cfxtgpynoviewer"}
+    assert install.supports("cfxtgpynoviewer")
+    assert not cache_path.exists()
+
+    monkeypatch.setenv("PYTURBOGRID_TURBOGRID_ROOT", str(bin_dir.parent))
+    install = discovery.install_discovery(cache_path).get_install()
+    assert install.exe_path == Path(exe_path)
+    assert cache_path.is_file()
+
+    # Another process finds the install in the cache file without validating it again
+    def validate_install(exe_path):
+        raise AssertionError("The install was validated again")
+
+    monkeypatch.setattr(discovery, "validate_install", validate_install)
+    other_process_discovery = discovery.install_discovery(cache_path)
+    assert other_process_discovery.get_install().version == "25.2.0"
+
+    # A reinstall is noticed through the modification time
+    os.utime(exe_path, ns=(0, 0))
+    with pytest.raises(AssertionError, match="validated again"):
+        discovery.install_discovery(cache_path).get_install()
+    monkeypatch.undo()
+
+    # Invalid installs fail before anything is spawned
+    monkeypatch.setenv("PYTURBOGRID_DISCOVERY_CACHE", str(cache_path))
+    with pytest.raises(FileNotFoundError, match="does not exist"):
+        launcher.launch_turbogrid(turbogrid_path=str(tmp_path / "missing" / "cfxtg"))
+    (bin_dir / "cfxtg").chmod(0o644)
+    with pytest.raises(FileNotFoundError, match="cannot be run"):
+        discovery.install_discovery(cache_path).get_install(turbogrid_path=exe_path)
@@ -25,6 +25,7 @@
 import json
 import os
 import pathlib
+import time
 
 from ansys.turbogrid.api.pyturbogrid_core import PyTurboGrid
 import pytest
@@ -274,3 +275,423 @@ def test_multi_blade_row_save(pytestconfig):
     diff = DeepDiff(original_mesh_stats, from_state_mesh_stats)
     print(diff)
     machine2.quit()
+
+
+def test_worker_watchdog():
+    import concurrent.futures
+    import threading
+
+    from ansys.turbogrid.core.multi_blade_row.single_blade_row import single_blade_row
+    from ansys.turbogrid.core.multi_blade_row.worker_watchdog import worker_watchdog
+
+    class StubProcess:
+        returncode = None
+
+        def poll(self):
+            return self.returncode
+
+    class StubTurboGrid:
+        def __init__(self):
+            self.already_exited = False
+            self.engine_proc = StubProcess()
+            self.size_factor = 1.0
+            self.params = []
+
+    launches = []
+    launch_delay = 0.0
+
+    def launch_job(tg_worker_instance):
+        launches.append(tg_worker_instance)
+        tg_worker_instance.pytg = StubTurboGrid()
+        time.sleep(launch_delay)
+
+    tg_workers = {key: single_blade_row() for key in ["rotor", "stator"]}
+    for val in tg_workers.values():
+        launch_job(val)
+        val.launch_job = launch_job
+
+    def set_size_factor(size_factor, tg_worker_instance):
+        tg_worker_instance.pytg.size_factor = size_factor
+
+    def set_param(param, tg_worker_instance):
+        tg_worker_instance.pytg.params.append(param)
+
+    rotor = tg_workers["rotor"]
+    for size_factor in [1.5, 2.0]:
+        rotor.record("size", lambda w, sf=size_factor: set_size_factor(sf, w))
+    for param in ["a", "b"]:
+        rotor.record("set_br_state", lambda w, p=param: set_param(p, w))
+
+    dead_sessions = []
+    watchdog = worker_watchdog(
+        lambda: tg_workers,
+        interval=0.01,
+        max_relaunches=1,
+        dead_session_handler=dead_sessions.append,
+    )
+    assert watchdog.check_workers() == []
+
+    # Sessions that are quit on purpose are left alone
+    tg_workers["stator"].pytg.already_exited = True
+    assert watchdog.check_workers() == []
+
+    # The dead session stays with the blade row until its replacement is launched and
+    # has its history replayed, so that callers meanwhile never find it without a session
+    dead_pytg = rotor.pytg
+    dead_pytg.engine_proc.returncode = -9
+    launch_delay = 0.1
+    watchdog.start()
+    assert watchdog.is_running()
+    deadline = time.time() + 5
+    while rotor.pytg is dead_pytg:
+        assert time.time() < deadline
+        time.sleep(0.001)
+    watchdog.stop()
+    assert not watchdog.is_running()
+    assert dead_sessions == [dead_pytg]
+    assert rotor.pytg.size_factor == 2.0
+    assert rotor.pytg.params == ["a", "b"]
+    assert rotor.relaunch_count == 1
+
+    # A caller that noticed the failure while a relaunch was under way gets to retry
+    watchdog.max_relaunches = 2
+    dead_pytg = rotor.pytg
+    dead_pytg.engine_proc.returncode = -9
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        relaunched = list(executor.map(watchdog.check_worker, ["rotor"] * 2, [rotor] * 2))
+    assert relaunched == [True, True]
+    assert rotor.relaunch_count == 2 and len(launches) == 4
+
+    # Relaunches are limited
+    launch_delay = 0.0
+    rotor.pytg.engine_proc.returncode = -9
+    assert watchdog.check_workers() == []
+    assert len(launches) == 4
+
+    # A relaunch only holds up its own blade row, and dead rows are relaunched together
+    watchdog.max_relaunches = 10
+    stator = tg_workers["stator"]
+    launch_job(stator)
+    launch_delay = 0.3
+    for val in tg_workers.values():
+        val.pytg.engine_proc.returncode = -9
+    start = time.perf_counter()
+    assert sorted(watchdog.check_workers()) == ["rotor", "stator"]
+    assert time.perf_counter() - start < 0.55
+    rotor.pytg.engine_proc.returncode = -9
+    relauncher = threading.Thread(target=watchdog.check_worker, args=("rotor", rotor))
+    relauncher.start()
+    while not rotor.relaunch_lock.locked():
+        time.sleep(0.001)
+    start = time.perf_counter()
+    assert not watchdog.check_worker("stator", stator)
+    assert time.perf_counter() - start < 0.1
+    relauncher.join()
+    assert not rotor.relaunch_lock.locked()
+
+    # quit_tg_workers stops the watchdog of an MBR, and the next init starts it again
+    mbr = MBR(
+        turbogrid_location_type=PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER,
+        saas_server=False,
+        watchdog_interval=0.01,
+    )
+    assert mbr.watchdog.is_running()
+    mbr.quit_tg_workers()
+    assert not mbr.watchdog.is_running()
+    mbr.tg_worker_instances = {"rotor": single_blade_row()}
+    mbr.tg_worker_instances["rotor"].launch_error = "no license"
+    mbr.__check_launches__()
+    assert mbr.watchdog.is_running()
+    mbr.tg_worker_instances = None
+    mbr.quit()
+
+
+def test_shared_work_dir_cleanup(tmp_path):
+    # The subdirectory of an MBR goes with it, unless it is kept or named
+    work_dir = tmp_path / "work"
+    for extra_settings, kept in [
+        ({}, False),
+        ({"keep_shared_work_dir": "True"}, True),
+        ({"shared_work_dir_subdirectory": "rotor_study"}, True),
+    ]:
+        mbr = MBR(
+            turbogrid_location_type=PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER,
+            saas_server=False,
+            tg_container_launch_settings={"shared_work_dir": str(work_dir), **extra_settings},
+        )
+        mesh = pathlib.Path(mbr.shared_work_dir.get_host_path("rotor.def"))
+        mesh.write_text("mesh")
+        mbr.quit()
+        assert mesh.is_file() == kept
+        assert work_dir.is_dir()
+    assert (work_dir / "rotor_study" / "rotor.def").is_file()
+
+
+def test_recycle_workers(tmp_path):
+    from ansys.turbogrid.core.launcher.session_pool import (
+        capture_blank_state,
+        get_blank_state_filename,
+    )
+    from ansys.turbogrid.core.multi_blade_row.single_blade_row import single_blade_row
+
+    class StubTurboGrid:
+        def __init__(self):
+            self.already_exited = False
+            self.state = "blank"
+
+        def save_state(self, filename):
+            pathlib.Path(filename).write_text(self.state)
+
+        def read_state(self, filename):
+            self.state = pathlib.Path(filename).read_text()
+
+        def get_state(self):
+            return self.state
+
+        def quit(self):
+            self.already_exited = True
+
+    mbr = MBR(
+        turbogrid_location_type=PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER,
+        saas_server=False,
+        recycle_sessions=True,
+    )
+    mbr.tg_worker_instances = {key: single_blade_row() for key in ["rotor", "stator", "igv"]}
+    for val in mbr.tg_worker_instances.values():
+        val.pytg = StubTurboGrid()
+        blank_state_filename = get_blank_state_filename(str(tmp_path))
+        val.blank_state = (
+            blank_state_filename,
+            capture_blank_state(val.pytg, blank_state_filename),
+        )
+        val.pytg.state = "read tginit"
+    sessions = {key: val.pytg for key, val in mbr.tg_worker_instances.items()}
+    # A session whose reset cannot be verified is quit rather than reused
+    mbr.tg_worker_instances["igv"].blank_state = (blank_state_filename, "unexpected")
+
+    mbr.__recycle_workers__()
+    assert mbr.tg_worker_instances is None
+    assert sessions["igv"].already_exited
+    assert mbr.recycled_workers.qsize() == 2
+
+    tg_worker_instance = single_blade_row()
+    mbr.__start_worker__(tg_worker_instance)
+    assert tg_worker_instance.pytg in (sessions["rotor"], sessions["stator"])
+    assert tg_worker_instance.pytg.get_state() == "blank"
+    assert tg_worker_instance.blank_state is not None
+
+    # Sessions the next init did not need are quit
+    mbr.tg_worker_instances = {"rotor": tg_worker_instance}
+    mbr.quit()
+    assert all(pytg.already_exited for pytg in sessions.values())
+    assert mbr.recycled_workers.qsize() == 0
+    assert list(tmp_path.iterdir()) == []
+
+    # Recycling is opt-in, the next init launches new sessions by default
+    mbr = MBR(
+        turbogrid_location_type=PyTurboGrid.TurboGridLocationType.TURBOGRID_RUNNING_CONTAINER,
+        saas_server=False,
+    )
+    mbr.tg_worker_instances = {"rotor": single_blade_row()}
+    mbr.tg_worker_instances["rotor"].pytg = pytg = StubTurboGrid()
+    mbr.__recycle_workers__()
+    assert pytg.already_exited
+    assert mbr.recycled_workers.qsize() == 0
+
+
+def test_launch_timings(tmp_path, monkeypatch):
+    import sys
+
+    from ansys.turbogrid.core.launcher.launch_timings import LaunchPhase, launch_timings
+
+    timings = launch_timings()
+    with timings.phase(LaunchPhase.READ):
+        time.sleep(0.002)
+    with pytest.raises(RuntimeError):
+        with timings.phase(LaunchPhase.READ):
+            raise RuntimeError("read failed")
+    timings.add(LaunchPhase.QUEUED, 0.5)
+    assert 0.002 <= timings.get(LaunchPhase.READ) < 0.5
+    assert timings.get(LaunchPhase.FIRST_MESH) == 0.0
+    assert list(timings.to_dict()) == ["queued", "read", "total"]
+    assert timings.total == pytest.approx(0.5 + timings.get(LaunchPhase.READ))
+
+    class StubTurboGrid:
+        def __init__(self):
+            self.already_exited = False
+            self.state = "blank"
+
+        def save_state(self, filename):
+            pathlib.Path(filename).write_text(self.state)
+
+        def read_state(self, filename):
+            time.sleep(0.01)
+            self.state = pathlib.Path(filename).read_text()
+
+        def get_state(self):
+            return self.state
+
+        def unsuspend(self, object):
+            time.sleep(0.005)
+
+        def quit(self):
+            self.already_exited = True
+
+    monkeypatch.setenv("PYTURBOGRID_DISCOVERY_CACHE", str(tmp_path / "installs.json"))
+    mbr = MBR(
+        turbogrid_location_type=PyTurboGrid.TurboGridLocationType.TURBOGRID_INSTALL,
+        turbogrid_path=sys.executable,
+        saas_server=False,
+        recycle_sessions=True,
+    )
+    mbr.__launch_turbogrid__ = lambda **launch_kwargs: StubTurboGrid()
+    file_dict = {}
+    for key in ["rotor", "stator"]:
+        file_dict[key] = str(tmp_path / f"{key}.tst")
+        pathlib.Path(file_dict[key]).write_text(key)
+    state_filename = tmp_path / "machine.json"
+    state_filename.write_text(
+        json.dumps(
+            {
+                "TGInit Path": "machine.tginit",
+                "Blade Rows": ["rotor", "stator"],
+                "Base Size Factors": {"rotor": 1.0, "stator": 1.0},
+                "File Dict": file_dict,
+            }
+        )
+    )
+    mbr.init_from_state(str(state_filename))
+    launch_timings_by_row = mbr.get_launch_timings()
+    assert list(launch_timings_by_row) == ["rotor", "stator"]
+    for timings in launch_timings_by_row.values():
+        assert list(timings.to_dict()) == [
+            "queued",
+            "process_spawn",
+            "read",
+            "first_mesh",
+            "total",
+        ]
+        assert timings.get(LaunchPhase.READ) >= 0.01
+        assert timings.get(LaunchPhase.FIRST_MESH) >= 0.005
+
+    # Recycled sessions only have the phases of their init
+    mbr.init_from_state(str(state_filename))
+    for timings in mbr.get_launch_timings().values():
+        assert list(timings.to_dict()) == ["read", "first_mesh", "total"]
+    mbr.quit()
+
+
+def test_session_multiplexer(tmp_path, monkeypatch):
+    import sys
+    import threading
+
+    from ansys.turbogrid.core.multi_blade_row.session_multiplexer import session_multiplexer
+
+    class StubTurboGrid:
+        def __init__(self):
+            self.already_exited = False
+            self.state = "blank"
+
+        def save_state(self, filename):
+            pathlib.Path(filename).write_text(self.state)
+
+        def read_state(self, filename):
+            self.state = pathlib.Path(filename).read_text()
+
+        def set_state(self, state):
+            self.state = state
+
+        def get_state(self):
+            return self.state
+
+        def unsuspend(self, object):
+            pass
+
+        def quit(self):
+            self.already_exited = True
+
+    sessions = []
+
+    def launch(index):
+        sessions.append(StubTurboGrid())
+        return sessions[-1]
+
+    multiplexer = session_multiplexer(launch, 2, state_directory=str(tmp_path))
+    rows = {key: multiplexer.session(key) for key in ["rotor", "stator", "igv"]}
+    for key, val in rows.items():
+        assert val.get_state() == "blank"
+        val.set_state(key)
+    assert len(sessions) == 2
+    # The least recently used blade row was swapped out to make room for igv
+    assert multiplexer.get_resident_rows() == ["stator", "igv"]
+    assert rows["rotor"].get_state() == "rotor"
+    assert multiplexer.get_resident_rows() == ["igv", "rotor"]
+    assert [val.get_state() for val in rows.values()] == ["rotor", "stator", "igv"]
+
+    # A pinned blade row is not swapped out, and the others wait for it
+    with rows["rotor"].pinned() as pytg:
+        assert rows["stator"].get_state() == "stator"
+        assert rows["igv"].get_state() == "igv"
+        assert pytg.get_state() == "rotor"
+        assert "rotor" in multiplexer.get_resident_rows()
+    assert multiplexer.get_resident_rows() == ["rotor", "igv"]
+    with rows["rotor"].pinned(), rows["igv"].pinned():
+        other = threading.Thread(target=rows["stator"].get_state)
+        other.start()
+        other.join(0.1)
+        assert other.is_alive()
+    other.join()
+
+    # A forgotten blade row leaves its session, and the next one starts blank
+    rows["stator"].quit()
+    assert rows["stator"].already_exited
+    assert "stator" not in multiplexer.get_resident_rows()
+    assert multiplexer.session("stator").get_state() == "blank"
+    assert len(sessions) == 2
+
+    # The state of a blade row in a session that died is lost
+    with rows["igv"].pinned() as pytg:
+        pytg.already_exited = True
+    with pytest.raises(RuntimeError):
+        rows["igv"].get_state()
+    assert len(sessions) == 3
+    rows["igv"].quit()
+    assert rows["igv"].get_state() == "blank"
+
+    reports = multiplexer.close(timeout=1.0)
+    assert sorted(reports) == ["multiplexed_0", "multiplexed_1"]
+    assert all(val.already_exited for val in sessions)
+    assert not [name for name in os.listdir(tmp_path) if name.startswith("pyturbogrid_")]
+
+    # An MBR serves all its blade rows from the multiplexed sessions
+    monkeypatch.setenv("PYTURBOGRID_DISCOVERY_CACHE", str(tmp_path / "installs.json"))
+    mbr = MBR(
+        turbogrid_location_type=PyTurboGrid.TurboGridLocationType.TURBOGRID_INSTALL,
+        turbogrid_path=sys.executable,
+        saas_server=False,
+        multiplexed_sessions=2,
+    )
+    sessions.clear()
+    mbr.__launch_turbogrid__ = lambda **launch_kwargs: launch(len(sessions))
+    file_dict = {}
+    for key in ["rotor", "stator", "igv"]:
+        file_dict[key] = str(tmp_path / f"{key}.tst")
+        pathlib.Path(file_dict[key]).write_text(key)
+    state_filename = tmp_path / "machine.json"
+    state_filename.write_text(
+        json.dumps(
+            {
+                "TGInit Path": "machine.tginit",
+                "Blade Rows": ["rotor", "stator", "igv"],
+                "Base Size Factors": {key: 1.0 for key in file_dict},
+                "File Dict": file_dict,
+            }
+        )
+    )
+    mbr.init_from_state(str(state_filename))
+    assert len(sessions) == 2
+    for key, val in mbr.tg_worker_instances.items():
+        assert val.pytg.get_state() == key
+    reports = mbr.quit()
+    assert {"rotor", "stator", "igv", "multiplexed_0", "multiplexed_1"} <= set(reports)
+    assert all(val.already_exited for val in sessions)